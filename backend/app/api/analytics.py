@@ -3,13 +3,17 @@ from __future__ import annotations
 
 from dataclasses import asdict
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.core.security import get_current_active_user
 from app.db.session import get_session
-from app.schemas import AnalyticsSummaryResponse
-from app.services import AnalyticsService
+from app.schemas import (
+    AnalyticsSummaryResponse,
+    StandardCoverageCountRead,
+    StandardsCoverageSummaryResponse,
+)
+from app.services import AnalyticsService, StandardsCoverageService, StandardsService
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -23,3 +27,32 @@ def analytics_summary(
     service = AnalyticsService(db)
     summary = service.get_summary(current_user.tenant_id, days=days)
     return AnalyticsSummaryResponse(**asdict(summary))
+
+
+@router.get("/standards-coverage", response_model=StandardsCoverageSummaryResponse)
+def standards_coverage_summary(
+    framework: str = Query(min_length=1, max_length=50, description="Framework code"),
+    jurisdiction: str | None = Query(default=None),
+    grade: str | None = Query(default=None, max_length=20, description="Lesson grade level"),
+    uncovered_only: bool = Query(default=False),
+    current_user=Depends(get_current_active_user),
+    db: Session = Depends(get_session),
+) -> StandardsCoverageSummaryResponse:
+    """Lesson counts per standard and grade, read from the incremental summary."""
+
+    try:
+        framework_row = StandardsService(db).get_framework(framework, jurisdiction)
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+    counts = StandardsCoverageService(db).report(
+        current_user.tenant_id, framework_row.id, grade_level=grade
+    )
+    listed = [entry for entry in counts if not (uncovered_only and entry.lesson_count)]
+    return StandardsCoverageSummaryResponse(
+        framework_id=framework_row.id,
+        framework_code=framework_row.code,
+        total_standards=len(counts),
+        covered_standards=sum(1 for entry in counts if entry.lesson_count),
+        standards=[StandardCoverageCountRead.model_validate(entry) for entry in listed],
+    )
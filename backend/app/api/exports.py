@@ -0,0 +1,176 @@
+"""Endpoints for asynchronous export jobs."""
+from __future__ import annotations
+
+from uuid import UUID
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.security import get_current_active_user
+from app.core.signing import create_download_token, verify_download_token
+from app.db.session import get_session, get_session_factory
+from app.models import ExportJob
+from app.schemas import ExportJobRead, LessonExportJobRequest, PacketExportRequest
+from app.services import EventService, LessonService
+from app.services.export_job_service import ExportJobService, run_export_job
+from app.services.export_service import FILE_EXTENSIONS, MEDIA_TYPES
+
+router = APIRouter(tags=["exports"])
+
+
+def _job_read(request: Request, job: ExportJob) -> ExportJobRead:
+    """Serialize a job, attaching a signed, expiring download URL once it has finished."""
+
+    result = ExportJobRead.model_validate(job)
+    if job.status == "completed":
+        url = request.url_for("fetch_export_file", job_id=job.id)
+        result.download_url = str(url.include_query_params(token=create_download_token(job.id)))
+    return result
+
+
+def _file_response(service: ExportJobService, job: ExportJob) -> FileResponse:
+    path = service.result_path(job)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Export is not available")
+    title = job.params.get("title") or f"lesson-export-{job.id.hex[:8]}"
+    filename = str(title).lower().replace(" ", "-")
+    extension = FILE_EXTENSIONS.get(job.format, job.format)
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES[job.format],
+        headers={"Content-Disposition": f"attachment; filename=\"{filename}.{extension}\""},
+    )
+
+
+@router.post("/exports/packet", response_model=ExportJobRead, status_code=status.HTTP_202_ACCEPTED)
+def create_packet_export(
+    payload: PacketExportRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user=Depends(get_current_active_user),
+    db: Session = Depends(get_session),
+    session_factory: sessionmaker[Session] = Depends(get_session_factory),
+) -> ExportJobRead:
+    """Queue a printable PDF packet of several lessons with a cover and contents page."""
+
+    service = ExportJobService(db)
+    try:
+        job = service.create_packet_job(current_user, payload.lesson_ids, payload.title)
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+    EventService(db).log_event(
+        tenant_id=current_user.tenant_id,
+        user_id=current_user.id,
+        action="lesson_packet_exported",
+        metadata={"job_id": str(job.id), "lessons": len(payload.lesson_ids)},
+    )
+    db.commit()
+    if settings.export_jobs_in_process:
+        background_tasks.add_task(run_export_job, session_factory, job.id)
+    return _job_read(request, job)
+
+
+@router.post(
+    "/lessons/{lesson_id}/exports",
+    response_model=ExportJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def create_lesson_export(
+    lesson_id: UUID,
+    payload: LessonExportJobRequest,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    current_user=Depends(get_current_active_user),
+    db: Session = Depends(get_session),
+    session_factory: sessionmaker[Session] = Depends(get_session_factory),
+) -> ExportJobRead:
+    """Queue an export of the lesson's current version to be fetched once ready."""
+
+    lesson_service = LessonService(db)
+    try:
+        lesson = lesson_service.get_lesson(lesson_id=lesson_id, tenant_id=current_user.tenant_id)
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found") from exc
+    version = lesson_service.get_current_version(lesson)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lesson has no versions")
+
+    try:
+        job = ExportJobService(db).create_lesson_job(current_user, lesson, version, payload.format)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    EventService(db).log_event(
+        tenant_id=current_user.tenant_id,
+        user_id=current_user.id,
+        action="lesson_exported",
+        metadata={"lesson_id": str(lesson.id), "format": job.format, "job_id": str(job.id)},
+    )
+    db.commit()
+    if settings.export_jobs_in_process:
+        background_tasks.add_task(run_export_job, session_factory, job.id)
+    response.headers["Location"] = str(request.url_for("read_export_job", job_id=job.id))
+    return _job_read(request, job)
+
+
+@router.get("/exports/{job_id}", response_model=ExportJobRead)
+def read_export_job(
+    job_id: UUID,
+    request: Request,
+    current_user=Depends(get_current_active_user),
+    db: Session = Depends(get_session),
+) -> ExportJobRead:
+    """Return an export job's status and progress."""
+
+    try:
+        job = ExportJobService(db).get_job(job_id, current_user.tenant_id)
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    return _job_read(request, job)
+
+
+@router.get("/exports/{job_id}/download", name="download_export_job")
+def download_export_job(
+    job_id: UUID,
+    current_user=Depends(get_current_active_user),
+    db: Session = Depends(get_session),
+) -> FileResponse:
+    """Send the finished export file."""
+
+    service = ExportJobService(db)
+    try:
+        job = service.get_job(job_id, current_user.tenant_id)
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+    return _file_response(service, job)
+
+
+@router.get("/exports/{job_id}/file", name="fetch_export_file")
+def fetch_export_file(
+    job_id: UUID,
+    token: str = Query(...),
+    db: Session = Depends(get_session),
+) -> FileResponse:
+    """Send a finished export to holders of a signed download link; no session needed."""
+
+    if not verify_download_token(token, job_id, settings.export_download_url_ttl_seconds):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid or expired link")
+    service = ExportJobService(db)
+    job = db.get(ExportJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    return _file_response(service, job)
@@ -1,11 +1,11 @@
 """Endpoints for lesson generation jobs."""
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.security import get_current_active_user
-from app.db.session import get_session
+from app.db.session import get_session, get_session_factory
 from app.models import GenerationJob, Lesson
 from app.schemas import (
     GenerationJobRead,
@@ -18,9 +18,11 @@ from app.services import (
     EventService,
     GenerationInput,
     GenerationService,
+    LessonLoad,
     LessonService,
     StandardsService,
 )
+from app.services.prerender_service import schedule_prerender
 
 router = APIRouter(prefix="/gen-jobs", tags=["generation"])
 
@@ -34,9 +36,11 @@ def get_generation_service(db: Session = Depends(get_session)) -> GenerationServ
 @router.post("/", response_model=GenerationResponse, status_code=status.HTTP_201_CREATED)
 def create_generation_job(
     payload: GenerationRequest,
+    background_tasks: BackgroundTasks,
     generation_service: GenerationService = Depends(get_generation_service),
     current_user=Depends(get_current_active_user),
     db: Session = Depends(get_session),
+    session_factory: sessionmaker[Session] = Depends(get_session_factory),
 ) -> GenerationResponse:
     generation_input = GenerationInput(
         subject=payload.subject,
@@ -46,6 +50,7 @@ def create_generation_job(
         teaching_style=payload.teaching_style,
         focus_keywords=payload.focus_keywords,
         standard_codes=payload.standard_codes,
+        standard_framework=payload.standard_framework,
     )
 
     job, lesson, version, standards = generation_service.generate_lesson(current_user, generation_input)
@@ -57,7 +62,10 @@ def create_generation_job(
     )
     db.commit()
     db.refresh(job)
-    db.refresh(lesson)
+    schedule_prerender(background_tasks, session_factory, current_user.tenant_id, version.id)
+    lesson = generation_service.lesson_service.get_lesson(
+        lesson_id=lesson.id, tenant_id=current_user.tenant_id, options=LessonLoad.DETAIL
+    )
 
     return GenerationResponse(
         job=GenerationJobRead.model_validate(job),
@@ -1,50 +1,107 @@
 """API endpoints for lesson management."""
 from __future__ import annotations
 
-import io
+import logging
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime, timezone
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import JSONResponse, StreamingResponse
-from sqlalchemy.orm import Session
-
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.etag import etag_matches
 from app.core.security import get_current_active_user
-from app.db.session import get_session
+from app.db.session import get_session, get_session_factory
 from app.models.user import User
 from app.schemas import (
     LessonCreate,
     LessonDetail,
     LessonDifferentiateRequest,
+    LessonImportError,
+    LessonImportResponse,
     LessonRestoreResponse,
+    LessonStandardsAlignRequest,
     LessonSummary,
     LessonVersionCreate,
     LessonVersionRead,
+    StandardRead,
 )
-from app.services import EventService, ExportService, LessonFilters, LessonService
+from app.services import (
+    EventService,
+    ExportCacheService,
+    ExportService,
+    LessonFilters,
+    LessonLoad,
+    LessonService,
+    StandardsService,
+)
+from app.services.export_cache import CACHEABLE_FORMATS, PREVIEW_FORMATS, negotiate_encoding
+from app.services.prerender_service import schedule_prerender
+from app.services.render_pool import RenderPoolBusy, RenderTimeout, get_render_pool
+from app.services.export_service import ARCHIVE_FORMATS
 
 router = APIRouter(prefix="/lessons", tags=["lessons"])
 
+logger = logging.getLogger(__name__)
+
 
 def _build_service(db: Session) -> LessonService:
     return LessonService(session=db)
 
 
+# Clients may cache lesson payloads but must revalidate them with If-None-Match.
+_REVALIDATE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, **_REVALIDATE_HEADERS},
+    )
+
+
 @router.get("/", response_model=List[LessonSummary])
 def list_lessons(
+    response: Response,
     subject: str | None = Query(default=None),
     grade_level: str | None = Query(default=None),
     tags: List[str] | None = Query(default=None),
+    standard: str | None = Query(
+        default=None, description="Standard code on the current version, or a domain/cluster code"
+    ),
+    if_none_match: str | None = Header(default=None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_session),
-) -> List[LessonSummary]:
+) -> List[LessonSummary] | Response:
     """Return a filtered list of lessons for the current tenant."""
 
     service = _build_service(db)
-    lessons = service.list_lessons(
-        tenant_id=current_user.tenant_id,
-        filters=LessonFilters(subject=subject, grade_level=grade_level, tags=tags),
+    filters = LessonFilters(
+        subject=subject, grade_level=grade_level, tags=tags, standard=standard
     )
+    etag = service.list_etag(tenant_id=current_user.tenant_id, filters=filters)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+
+    lessons = service.list_lessons(tenant_id=current_user.tenant_id, filters=filters)
+    response.headers["ETag"] = etag
+    response.headers.update(_REVALIDATE_HEADERS)
     return [LessonSummary.model_validate(lesson) for lesson in lessons]
 
 
@@ -75,23 +132,203 @@ def create_lesson(
         metadata={"lesson_id": str(lesson.id)},
     )
     db.commit()
-    db.refresh(lesson)
+    lesson = service.get_lesson(
+        lesson_id=lesson.id, tenant_id=current_user.tenant_id, options=LessonLoad.DETAIL
+    )
     return LessonDetail.model_validate(lesson)
 
 
+def _filename_base(title: str) -> str:
+    return title.lower().replace(" ", "-") or "lesson"
+
+
+@router.get("/export-archive")
+def export_archive(
+    format: str = Query(..., description="Member format: pdf, docx, json"),
+    subject: str | None = Query(default=None),
+    grade_level: str | None = Query(default=None),
+    tags: List[str] | None = Query(default=None),
+    standard: str | None = Query(
+        default=None, description="Standard code on the current version, or a domain/cluster code"
+    ),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_session),
+    session_factory: sessionmaker[Session] = Depends(get_session_factory),
+) -> StreamingResponse:
+    """Stream a ZIP of the tenant's lessons (optionally filtered), one file per lesson."""
+
+    format_name = format.lower()
+    if format_name not in ARCHIVE_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported archive format")
+
+    # The request session closes before the body streams, so the rows live in a
+    # session of their own that the body closes once the archive is written.
+    archive_session = session_factory()
+    try:
+        rows = _build_service(archive_session).list_current_versions(
+            tenant_id=current_user.tenant_id,
+            filters=LessonFilters(
+                subject=subject, grade_level=grade_level, tags=tags, standard=standard
+            ),
+        )
+    except BaseException:
+        archive_session.close()
+        raise
+
+    EventService(db).log_event(
+        tenant_id=current_user.tenant_id,
+        user_id=current_user.id,
+        action="lesson_archive_exported",
+        metadata={"format": format_name, "lessons": len(rows)},
+    )
+    db.commit()
+
+    def body() -> Iterator[bytes]:
+        export_service = ExportService(archive_session)
+        # Content is built per member as the render window advances, not up front.
+        members = (
+            (
+                f"{index:04d}-{_filename_base(lesson.title)}",
+                export_service.build_content(lesson, version),
+            )
+            for index, (lesson, version) in enumerate(rows, start=1)
+        )
+        try:
+            yield from export_service.iter_archive(members, format_name)
+        finally:
+            archive_session.close()
+
+    return StreamingResponse(
+        body(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=\"lessons-{format_name}.zip\""},
+    )
+
+
+# Only the first errors are echoed back so a malformed upload cannot bloat the response.
+MAX_REPORTED_IMPORT_ERRORS = 1000
+
+
+async def _ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    """Yield ``(line_number, line)`` pairs from a streamed body, skipping blank lines."""
+
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, line
+    if buffer.strip():
+        yield line_no + 1, buffer
+
+
+def _describe_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in exc.errors()
+    )
+
+
+@router.post("/import", response_model=LessonImportResponse)
+async def import_lessons(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_session),
+) -> LessonImportResponse:
+    """Bulk import lessons from a streamed NDJSON body, one ``LessonCreate`` per line.
+
+    Valid lines are inserted and committed in batches as the body arrives, so
+    memory stays flat regardless of upload size; invalid lines are reported.
+    Each batch is written in its own savepoint: a batch the database rejects
+    is rolled back on its own and its lines are reported as failed, while
+    batches committed before it stay imported.
+    """
+
+    service = _build_service(db)
+
+    def write_batch(batch: list[tuple[int, dict[str, object]]]) -> str | None:
+        try:
+            with db.begin_nested():
+                service.bulk_create_lessons(
+                    owner=current_user, payloads=[payload for _, payload in batch]
+                )
+        except SQLAlchemyError as exc:
+            logger.warning("Lesson import batch at line %s failed", batch[0][0], exc_info=exc)
+            return f"Not imported: its batch was rejected by the database ({type(exc).__name__})"
+        db.commit()
+        return None
+
+    imported = failed = 0
+    errors: list[LessonImportError] = []
+    batch: list[tuple[int, dict[str, object]]] = []
+
+    async def save_batch(batch: list[tuple[int, dict[str, object]]]) -> None:
+        nonlocal imported, failed
+        error = await run_in_threadpool(write_batch, batch)
+        if error is None:
+            imported += len(batch)
+            return
+        failed += len(batch)
+        for line_no, _ in batch[: max(MAX_REPORTED_IMPORT_ERRORS - len(errors), 0)]:
+            errors.append(LessonImportError(line=line_no, error=error))
+
+    async for line_no, line in _ndjson_lines(request.stream()):
+        try:
+            payload = LessonCreate.model_validate_json(line)
+        except ValidationError as exc:
+            failed += 1
+            if len(errors) < MAX_REPORTED_IMPORT_ERRORS:
+                errors.append(LessonImportError(line=line_no, error=_describe_validation_error(exc)))
+            continue
+        batch.append((line_no, payload.model_dump()))
+        if len(batch) >= settings.lesson_import_batch_size:
+            await save_batch(batch)
+            batch = []
+    if batch:
+        await save_batch(batch)
+
+    def log_import() -> None:
+        EventService(db).log_event(
+            tenant_id=current_user.tenant_id,
+            user_id=current_user.id,
+            action="lessons_imported",
+            metadata={"imported": imported, "failed": failed},
+        )
+        db.commit()
+
+    await run_in_threadpool(log_import)
+    return LessonImportResponse(imported=imported, failed=failed, errors=errors)
+
+
 @router.get("/{lesson_id}", response_model=LessonDetail)
 def read_lesson(
     lesson_id: UUID,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_session),
-) -> LessonDetail:
+) -> LessonDetail | Response:
     """Fetch a single lesson with its versions."""
 
     service = _build_service(db)
     try:
-        lesson = service.get_lesson(lesson_id=lesson_id, tenant_id=current_user.tenant_id)
+        etag = service.detail_etag(lesson_id=lesson_id, tenant_id=current_user.tenant_id)
     except LookupError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found") from exc
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+
+    try:
+        lesson = service.get_lesson(
+            lesson_id=lesson_id, tenant_id=current_user.tenant_id, options=LessonLoad.DETAIL
+        )
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found") from exc
+    response.headers["ETag"] = etag
+    response.headers.update(_REVALIDATE_HEADERS)
     return LessonDetail.model_validate(lesson)
 
 
@@ -99,8 +336,10 @@ def read_lesson(
 def create_lesson_version(
     lesson_id: UUID,
     payload: LessonVersionCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_session),
+    session_factory: sessionmaker[Session] = Depends(get_session_factory),
 ) -> LessonVersionRead:
     """Create a new version of a lesson and mark it current."""
 
@@ -113,6 +352,7 @@ def create_lesson_version(
     version = service.create_new_version(lesson=lesson, creator=current_user, payload=payload.model_dump())
     db.commit()
     db.refresh(version)
+    schedule_prerender(background_tasks, session_factory, current_user.tenant_id, version.id)
     return LessonVersionRead.model_validate(version)
 
 
@@ -144,10 +384,79 @@ def restore_version(
     )
 
 
+@router.get("/{lesson_id}/versions/{version_id}/preview")
+def preview_lesson_version(
+    lesson_id: UUID,
+    version_id: UUID,
+    format: str = Query(default="html", description="Preview format: html, markdown"),
+    accept_encoding: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_session),
+) -> Response:
+    """Serve a lightweight HTML or Markdown rendering of a lesson version.
+
+    Aligning standards changes a version's rendering, so clients revalidate
+    against the content-derived ETag; renders and their precompressed variants
+    are kept in the export cache.
+    """
+
+    format_name = format.lower()
+    media_type = PREVIEW_FORMATS.get(format_name)
+    if media_type is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported preview format")
+
+    service = _build_service(db)
+    try:
+        lesson = service.get_lesson(lesson_id=lesson_id, tenant_id=current_user.tenant_id)
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found") from exc
+    version = service.get_version(lesson, version_id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Version not found")
+
+    export_service = ExportService(db)
+    content = export_service.build_content(lesson, version)
+    cache = ExportCacheService(db)
+    encoding = negotiate_encoding(accept_encoding)
+    base_key = cache.cache_key(version.id, format_name, content)
+    cache_key = cache.variant_key(base_key, encoding)
+    headers = {
+        "ETag": f'"{cache_key}"',
+        **_REVALIDATE_HEADERS,
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+
+    cached_path = cache.get(cache_key)
+    payload: bytes | None = None
+    if cached_path is None:
+        rendered = export_service.render(content, format_name)
+        variants = cache.put_variants(base_key, version.id, format_name, rendered)
+        payload = variants[encoding]
+    db.commit()
+    if cached_path is not None:
+        return FileResponse(cached_path, media_type=media_type, headers=headers)
+    return Response(content=payload, media_type=media_type, headers=headers)
+
+
+def _log_export(db: Session, user: User, lesson_id: UUID, format_name: str) -> None:
+    EventService(db).log_event(
+        tenant_id=user.tenant_id,
+        user_id=user.id,
+        action="lesson_exported",
+        metadata={"lesson_id": str(lesson_id), "format": format_name},
+    )
+
+
 @router.get("/{lesson_id}/export")
 def export_lesson(
     lesson_id: UUID,
     format: str = Query(..., description="Export format: pdf, docx, gdoc"),
+    if_none_match: str | None = Header(default=None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_session),
 ):
@@ -159,41 +468,53 @@ def export_lesson(
     except LookupError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found") from exc
 
-    version = lesson.versions[-1] if lesson.versions else None
-    if not version:
+    version = service.get_current_version(lesson)
+    if version is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lesson has no versions")
 
+    format_name = format.lower()
     export_service = ExportService(db)
+    content = export_service.build_content(lesson, version)
+    filename_base = _filename_base(lesson.title)
+
+    media_type = CACHEABLE_FORMATS.get(format_name)
+    if media_type is not None:
+        cache = ExportCacheService(db)
+        cache_key = cache.cache_key(version.id, format_name, content)
+        etag = f'"{cache_key}"'
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "private, max-age=0, must-revalidate",
+            "Content-Disposition": f"attachment; filename=\"{filename_base}.{format_name}\"",
+        }
+        cached_path = cache.get(cache_key)
+        payload: bytes | None = None
+        if cached_path is None:
+            try:
+                payload = get_render_pool().render(content, format_name)
+            except (RenderPoolBusy, RenderTimeout) as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=str(exc),
+                    headers={"Retry-After": str(settings.export_render_retry_after_seconds)},
+                ) from exc
+            cache.put(cache_key, version.id, format_name, payload)
+        _log_export(db, current_user, lesson.id, format_name)
+        db.commit()
+        if cached_path is not None:
+            return FileResponse(cached_path, media_type=media_type, headers=headers)
+        return Response(content=payload, media_type=media_type, headers=headers)
+
     try:
-        export_payload = export_service.export(lesson, version, format)
+        export_payload = export_service.render(content, format_name)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
-    filename_base = lesson.title.lower().replace(" ", "-") or "lesson"
-    EventService(db).log_event(
-        tenant_id=current_user.tenant_id,
-        user_id=current_user.id,
-        action="lesson_exported",
-        metadata={"lesson_id": str(lesson.id), "format": format.lower()},
-    )
+    _log_export(db, current_user, lesson.id, format_name)
     db.commit()
-    if format.lower() == "pdf":
-        return StreamingResponse(
-            io.BytesIO(export_payload),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=\"{filename_base}.pdf\""
-            },
-        )
-    if format.lower() == "docx":
-        return StreamingResponse(
-            io.BytesIO(export_payload),
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={
-                "Content-Disposition": f"attachment; filename=\"{filename_base}.docx\""
-            },
-        )
-
     return JSONResponse(status_code=status.HTTP_200_OK, content=export_payload)
 
 
@@ -205,8 +526,10 @@ def export_lesson(
 def differentiate_lesson(
     lesson_id: UUID,
     payload: LessonDifferentiateRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_session),
+    session_factory: sessionmaker[Session] = Depends(get_session_factory),
 ) -> LessonVersionRead:
     """Create a differentiated version of a lesson for a target audience."""
 
@@ -216,7 +539,7 @@ def differentiate_lesson(
     except LookupError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found") from exc
 
-    base_version = lesson.versions[-1] if lesson.versions else None
+    base_version = service.get_current_version(lesson)
     if base_version is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lesson has no versions")
 
@@ -276,4 +599,34 @@ def differentiate_lesson(
     )
     db.commit()
     db.refresh(version)
+    schedule_prerender(background_tasks, session_factory, current_user.tenant_id, version.id)
     return LessonVersionRead.model_validate(version)
+
+
+@router.post("/{lesson_id}/standards", response_model=List[StandardRead])
+def align_standards(
+    lesson_id: UUID,
+    payload: LessonStandardsAlignRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_session),
+) -> List[StandardRead]:
+    """Align the current version to extra standards (e.g. picked via /standards/search).
+
+    Already-aligned and unknown ids are ignored; returns the version's standards.
+    """
+
+    service = _build_service(db)
+    try:
+        lesson = service.get_lesson(lesson_id=lesson_id, tenant_id=current_user.tenant_id)
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found") from exc
+    if lesson.current_version_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lesson has no versions")
+
+    StandardsService(db).attach_standards(lesson.current_version_id, payload.standard_ids)
+    # Alignment is part of the detail payload, so move the lesson's validators on.
+    lesson.updated_at = datetime.now(timezone.utc)
+    db.commit()
+
+    version = service.get_current_version(lesson)
+    return [StandardRead.model_validate(standard) for standard in version.standards] if version else []
@@ -97,7 +97,7 @@ def push_google_classroom(
     except LookupError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found") from exc
 
-    version = lesson.versions[-1] if lesson.versions else None
+    version = lesson_service.get_current_version(lesson)
     push = lms_service.push_google_classroom_assignment(
         connection=connection,
         lesson=lesson,
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from fastapi import APIRouter
 
-from . import analytics, auth, gen_jobs, health, lessons, lms, profile, shares, users
+from . import analytics, auth, exports, gen_jobs, health, lessons, lms, profile, shares, standards, users
 
 api_router = APIRouter()
 api_router.include_router(health.router, tags=["health"])
@@ -15,3 +15,5 @@ api_router.include_router(gen_jobs.router)
 api_router.include_router(lms.router)
 api_router.include_router(analytics.router)
 api_router.include_router(shares.router)
+api_router.include_router(exports.router)
+api_router.include_router(standards.router)
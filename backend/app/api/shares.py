@@ -29,7 +29,7 @@ def create_share(
     except LookupError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found") from exc
 
-    version = lesson.versions[-1] if lesson.versions else None
+    version = lesson_service.get_current_version(lesson)
     if version is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lesson has no versions")
 
@@ -0,0 +1,175 @@
+"""Endpoints for browsing the standards catalog."""
+from __future__ import annotations
+
+import io
+import tempfile
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.etag import etag_matches, make_etag
+from app.core.security import get_current_active_user, require_admin
+from app.db.session import get_session
+from app.models.user import User
+from app.schemas import (
+    CacheStats,
+    CoverageLesson,
+    StandardCoverage,
+    StandardSearchHit,
+    StandardSearchPage,
+    StandardsCacheStats,
+    StandardsCoverageReport,
+    StandardsImportReport,
+)
+from app.services import EventService, StandardsService
+from app.services.standards_import import FrameworkSpec, StandardsImporter, StandardsImportError
+from app.services.standards_service import suggestion_cache
+
+router = APIRouter(prefix="/standards", tags=["standards"])
+
+
+@router.get("/search", response_model=StandardSearchPage)
+def search_standards(
+    response: Response,
+    q: str = Query(min_length=1, max_length=100),
+    subject: str | None = Query(default=None),
+    grade: str | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=50),
+    offset: int = Query(default=0, ge=0, le=1000),
+    if_none_match: str | None = Header(default=None),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_session),
+) -> StandardSearchPage | Response:
+    """Typeahead search for the manual standards picker."""
+
+    # Fetch one extra row to learn whether another page exists.
+    standards = StandardsService(db).search_standards(
+        q, subject=subject, grade_level=grade, limit=limit + 1, offset=offset
+    )
+    page = StandardSearchPage(
+        items=[StandardSearchHit.model_validate(standard) for standard in standards[:limit]],
+        next_offset=offset + limit if len(standards) > limit else None,
+    )
+
+    # Each hit's last edit is part of the tag, so an edited hit is served fresh.
+    versions = ((standard.id, standard.updated_at) for standard in standards[:limit])
+    headers = {
+        "ETag": make_etag(*versions, page.next_offset),
+        "Cache-Control": f"private, max-age={settings.standards_search_max_age_seconds}",
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return page
+
+
+@router.get("/coverage", response_model=StandardsCoverageReport)
+def standards_coverage(
+    framework: str = Query(min_length=1, max_length=50, description="Framework code"),
+    jurisdiction: str | None = Query(default=None),
+    root: str | None = Query(
+        default=None, max_length=100, description="Domain or cluster code to report on"
+    ),
+    rollup: bool = Query(default=False, description="Count lessons aligned to descendants"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_session),
+) -> StandardsCoverageReport:
+    """Lessons aligned to each standard of a framework (current versions only)."""
+
+    service = StandardsService(db)
+    try:
+        framework_row = service.get_framework(framework, jurisdiction)
+    except LookupError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+    entries = [
+        StandardCoverage(
+            standard_id=standard.id,
+            parent_id=standard.parent_id,
+            code=standard.code,
+            grade_band=standard.grade_band,
+            description=standard.description,
+            lesson_count=len(lessons),
+            lessons=[CoverageLesson(id=lesson_id, title=title) for lesson_id, title in lessons],
+        )
+        for standard, lessons in service.coverage(
+            framework_row.id, current_user.tenant_id, root=root, rollup=rollup
+        )
+    ]
+    return StandardsCoverageReport(
+        framework_id=framework_row.id,
+        framework_code=framework_row.code,
+        total_standards=len(entries),
+        covered_standards=sum(1 for entry in entries if entry.lesson_count),
+        standards=entries,
+    )
+
+
+@router.get("/cache-stats", response_model=StandardsCacheStats)
+def standards_cache_stats(current_user: User = Depends(require_admin)) -> StandardsCacheStats:
+    """Hit rates of this worker's standards caches."""
+
+    return StandardsCacheStats(suggestions=CacheStats(**suggestion_cache.stats()))
+
+
+# Uploads larger than this spill from memory to a temporary file while streaming in.
+_IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+@router.post("/import", response_model=StandardsImportReport)
+async def import_standards(
+    request: Request,
+    format: Literal["csv", "case"] = Query(default="csv"),
+    framework_code: str = Query(min_length=1, max_length=50),
+    framework_name: str | None = Query(default=None, max_length=255),
+    jurisdiction: str | None = Query(default=None, max_length=100),
+    subject: str | None = Query(default=None, max_length=100),
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_session),
+) -> StandardsImportReport:
+    """Upsert a standards framework from a CSV or CASE-JSON request body.
+
+    The body is streamed to a spool file and then imported in batches, so
+    memory stays flat for large frameworks.
+    """
+
+    with tempfile.SpooledTemporaryFile(max_size=_IMPORT_SPOOL_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+
+        def run_import() -> StandardsImportReport:
+            stream = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+            try:
+                result = StandardsImporter(db).import_file(
+                    stream,
+                    format,
+                    FrameworkSpec(
+                        code=framework_code, name=framework_name or "", jurisdiction=jurisdiction
+                    ),
+                    default_subject=subject,
+                )
+            finally:
+                stream.detach()
+            EventService(db).log_event(
+                tenant_id=current_user.tenant_id,
+                user_id=current_user.id,
+                action="standards_imported",
+                metadata={
+                    "framework_code": result.framework_code,
+                    "created": result.created,
+                    "updated": result.updated,
+                    "failed": result.failed,
+                },
+            )
+            db.commit()
+            return StandardsImportReport.model_validate(result)
+
+        try:
+            return await run_in_threadpool(run_import)
+        except (StandardsImportError, UnicodeDecodeError) as exc:
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -60,6 +60,57 @@ class Settings(BaseSettings):
         default="app/ai/prompts/lesson_v1.md", env="GENERATION_PROMPT_TEMPLATE"
     )
 
+    lesson_version_snapshot_interval: int = Field(
+        default=10, env="LESSON_VERSION_SNAPSHOT_INTERVAL"
+    )
+    lesson_version_cache_size: int = Field(default=2048, env="LESSON_VERSION_CACHE_SIZE")
+    lesson_import_batch_size: int = Field(default=500, env="LESSON_IMPORT_BATCH_SIZE")
+    export_archive_concurrency: int = Field(default=4, env="EXPORT_ARCHIVE_CONCURRENCY")
+    export_render_processes: int = Field(default=0, env="EXPORT_RENDER_PROCESSES")
+    export_render_queue_depth: int = Field(default=8, env="EXPORT_RENDER_QUEUE_DEPTH")
+    export_render_timeout_seconds: float = Field(
+        default=30.0, env="EXPORT_RENDER_TIMEOUT_SECONDS"
+    )
+    export_render_retry_after_seconds: int = Field(
+        default=5, env="EXPORT_RENDER_RETRY_AFTER_SECONDS"
+    )
+    export_docx_template: str = Field(default="", env="EXPORT_DOCX_TEMPLATE")
+    export_prerender_enabled: bool = Field(default=False, env="EXPORT_PRERENDER_ENABLED")
+    export_prerender_max_formats: int = Field(default=2, env="EXPORT_PRERENDER_MAX_FORMATS")
+    export_prerender_lookback_days: int = Field(
+        default=30, env="EXPORT_PRERENDER_LOOKBACK_DAYS"
+    )
+    export_job_ttl_hours: int = Field(default=24, env="EXPORT_JOB_TTL_HOURS")
+    # Run export jobs as API background tasks; disable when app.scripts.export_worker runs them.
+    export_jobs_in_process: bool = Field(default=True, env="EXPORT_JOBS_IN_PROCESS")
+    export_job_stale_seconds: int = Field(default=15 * 60, env="EXPORT_JOB_STALE_SECONDS")
+    export_job_max_attempts: int = Field(default=3, env="EXPORT_JOB_MAX_ATTEMPTS")
+    export_job_recover_on_startup: bool = Field(
+        default=True, env="EXPORT_JOB_RECOVER_ON_STARTUP"
+    )
+    export_worker_poll_seconds: float = Field(default=2.0, env="EXPORT_WORKER_POLL_SECONDS")
+    export_download_url_ttl_seconds: int = Field(
+        default=60 * 60, env="EXPORT_DOWNLOAD_URL_TTL_SECONDS"
+    )
+    standards_index_ttl_seconds: int = Field(default=300, env="STANDARDS_INDEX_TTL_SECONDS")
+    standards_index_warm_on_startup: bool = Field(
+        default=True, env="STANDARDS_INDEX_WARM_ON_STARTUP"
+    )
+    standards_suggestion_cache_size: int = Field(
+        default=4096, env="STANDARDS_SUGGESTION_CACHE_SIZE"
+    )
+    standards_suggestion_cache_ttl_seconds: int = Field(
+        default=600, env="STANDARDS_SUGGESTION_CACHE_TTL_SECONDS"
+    )
+    standards_search_max_age_seconds: int = Field(
+        default=300, env="STANDARDS_SEARCH_MAX_AGE_SECONDS"
+    )
+    standards_import_batch_size: int = Field(default=1000, env="STANDARDS_IMPORT_BATCH_SIZE")
+    blob_storage_dir: str = Field(default="var/blobs", env="BLOB_STORAGE_DIR")
+    export_cache_max_bytes: int = Field(
+        default=1024 * 1024 * 1024, env="EXPORT_CACHE_MAX_BYTES"
+    )
+
     class Config:
         case_sensitive = False
         env_file = ".env"
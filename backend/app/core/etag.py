@@ -0,0 +1,26 @@
+"""Helpers for HTTP entity tags and conditional requests."""
+from __future__ import annotations
+
+import hashlib
+
+
+def make_etag(*parts: object) -> str:
+    """Build a quoted strong ETag from the given validator parts."""
+
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return True when an If-None-Match header matches ``etag``.
+
+    Uses the weak comparison RFC 9110 requires for If-None-Match, so ``W/``
+    prefixed tags sent back by proxies still match.
+    """
+
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
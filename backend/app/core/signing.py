@@ -0,0 +1,30 @@
+"""Signed, expiring tokens for unauthenticated download links."""
+from __future__ import annotations
+
+import uuid
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from app.core.config import settings
+
+_DOWNLOAD_SALT = "export-download"
+
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(settings.secret_key, salt=_DOWNLOAD_SALT)
+
+
+def create_download_token(job_id: uuid.UUID) -> str:
+    """Return a token granting download access to one export job's result."""
+
+    return _serializer().dumps(str(job_id))
+
+
+def verify_download_token(token: str, job_id: uuid.UUID, max_age: int) -> bool:
+    """Return True when ``token`` was issued for ``job_id`` within ``max_age`` seconds."""
+
+    try:
+        signed_job_id = _serializer().loads(token, max_age=max_age)
+    except BadSignature:
+        return False
+    return signed_job_id == str(job_id)
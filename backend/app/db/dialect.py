@@ -0,0 +1,60 @@
+"""Dialect-specific statement helpers shared by services.
+
+Both helpers build on ``INSERT ... ON CONFLICT``, which Postgres and SQLite
+support. Callers rely on conflicts being skipped or merged, so other dialects
+get :class:`UnsupportedDialectError` rather than a statement that would fail
+on, or silently duplicate, existing rows.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class UnsupportedDialectError(RuntimeError):
+    """Raised when a helper is used on a database without ``ON CONFLICT``."""
+
+
+def _conflict_insert(session: Session, target: Any) -> postgresql.Insert | sqlite.Insert:
+    dialect = session.get_bind().dialect.name
+    insert = _INSERTS.get(dialect)
+    if insert is None:
+        raise UnsupportedDialectError(
+            f"INSERT ... ON CONFLICT is not available on {dialect}; use Postgres or SQLite"
+        )
+    return insert(target)
+
+
+def insert_ignore(session: Session, target: Any) -> postgresql.Insert | sqlite.Insert:
+    """Return an INSERT for ``target`` that skips rows conflicting on a unique key.
+
+    Emits ``ON CONFLICT DO NOTHING``.
+    """
+
+    return _conflict_insert(session, target).on_conflict_do_nothing()
+
+
+def upsert(
+    session: Session,
+    target: Any,
+    index_elements: Sequence[str],
+    update_columns: Sequence[str] = (),
+    increment_columns: Sequence[str] = (),
+) -> postgresql.Insert | sqlite.Insert:
+    """Return an INSERT for ``target`` that updates ``update_columns`` on conflict.
+
+    Emits ``ON CONFLICT (...) DO UPDATE`` using the incoming (``excluded``)
+    values. ``increment_columns`` are added to the stored value instead of
+    replacing it, for counters.
+    """
+
+    stmt = _conflict_insert(session, target)
+    set_ = {column: stmt.excluded[column] for column in update_columns}
+    for column in increment_columns:
+        set_[column] = stmt.table.c[column] + stmt.excluded[column]
+    return stmt.on_conflict_do_update(index_elements=list(index_elements), set_=set_)
@@ -18,3 +18,9 @@ def get_session() -> Session:
         yield session
     finally:
         session.close()
+
+
+def get_session_factory() -> sessionmaker[Session]:
+    """Return the session factory for work that outlives the request session."""
+
+    return SessionLocal
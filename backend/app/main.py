@@ -7,6 +7,9 @@ from starlette.middleware.sessions import SessionMiddleware
 
 from app.api.routes import api_router
 from app.core.config import settings
+from app.services.export_job_service import recover_export_jobs
+from app.services.render_pool import shutdown_render_pool
+from app.services.standards_index import warm_standards_index
 
 
 def create_application() -> FastAPI:
@@ -32,6 +35,9 @@ def create_application() -> FastAPI:
     )
 
     application.include_router(api_router)
+    application.add_event_handler("startup", warm_standards_index)
+    application.add_event_handler("startup", recover_export_jobs)
+    application.add_event_handler("shutdown", shutdown_render_pool)
 
     return application
 
@@ -1,11 +1,13 @@
 """SQLAlchemy models for LessonGen."""
 from .district import District
 from .event import Event
+from .export_cache import ExportCacheEntry, ExportCacheUsage
+from .export_job import ExportJob
 from .lesson import Lesson, LessonBlock, LessonVersion
 from .lms import LMSConnection, LMSPush
-from .metrics import MetricsDaily
+from .metrics import MetricsDaily, StandardsCoverage
 from .share import Share
-from .standard import LessonStandard, Standard, StandardsFramework
+from .standard import LessonStandard, Standard, StandardClosure, StandardsFramework
 from .school import School
 from .tenant import Tenant
 from .user import User
@@ -17,6 +19,9 @@ __all__ = [
     "District",
     "School",
     "Event",
+    "ExportCacheEntry",
+    "ExportCacheUsage",
+    "ExportJob",
     "Lesson",
     "LessonVersion",
     "LessonBlock",
@@ -25,8 +30,10 @@ __all__ = [
     "Share",
     "LessonStandard",
     "Standard",
+    "StandardClosure",
     "StandardsFramework",
     "MetricsDaily",
+    "StandardsCoverage",
     "GenerationJob",
     "User",
     "UserRole",
@@ -0,0 +1,49 @@
+"""Index of rendered export files held in the blob store."""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class ExportCacheEntry(Base):
+    """A cached render of a lesson version, keyed by a hash of everything it depends on."""
+
+    __tablename__ = "export_cache_entries"
+    __table_args__ = (
+        Index("ix_export_cache_entries_last_accessed_at", "last_accessed_at"),
+    )
+
+    cache_key: Mapped[str] = mapped_column(String(length=64), primary_key=True)
+    lesson_version_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("lesson_versions.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    format: Mapped[str] = mapped_column(String(length=20), nullable=False)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    last_accessed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class ExportCacheUsage(Base):
+    """Running total of ``export_cache_entries.size_bytes``, in a single row.
+
+    Writes add to it so the size bound can be checked without summing the
+    index; eviction reconciles it with the real sum whenever it trips.
+    """
+
+    __tablename__ = "export_cache_usage"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    total_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -3,9 +3,9 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import DateTime, ForeignKey, Integer, JSON, String, Text, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, JSON, String, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -40,17 +40,28 @@ class LessonVersion(Base):
     version_no: Mapped[int] = mapped_column(Integer, nullable=False)
     objective: Mapped[str | None] = mapped_column(Text, nullable=True)
     duration_minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    teacher_script_md: Mapped[str | None] = mapped_column(Text, nullable=True)
-    materials: Mapped[list[dict[str, object]]] = mapped_column(JSON, default=list, nullable=False)
-    flow: Mapped[list[dict[str, object]]] = mapped_column(JSON, default=list, nullable=False)
-    differentiation: Mapped[list[dict[str, object]]] = mapped_column(
-        JSON, default=list, nullable=False
+    # Content columns hold a full snapshot, or stay empty when ``content_delta``
+    # is set; read content through the properties below, never these columns.
+    stored_teacher_script_md: Mapped[str | None] = mapped_column(
+        "teacher_script_md", Text, nullable=True
     )
-    assessments: Mapped[list[dict[str, object]]] = mapped_column(
-        JSON, default=list, nullable=False
+    stored_materials: Mapped[list[dict[str, object]]] = mapped_column(
+        "materials", JSON, default=list, nullable=False
     )
-    accommodations: Mapped[list[dict[str, object]]] = mapped_column(
-        JSON, default=list, nullable=False
+    stored_flow: Mapped[list[dict[str, object]]] = mapped_column(
+        "flow", JSON, default=list, nullable=False
+    )
+    stored_differentiation: Mapped[list[dict[str, object]]] = mapped_column(
+        "differentiation", JSON, default=list, nullable=False
+    )
+    stored_assessments: Mapped[list[dict[str, object]]] = mapped_column(
+        "assessments", JSON, default=list, nullable=False
+    )
+    stored_accommodations: Mapped[list[dict[str, object]]] = mapped_column(
+        "accommodations", JSON, default=list, nullable=False
+    )
+    content_delta: Mapped[dict[str, object] | None] = mapped_column(
+        JSON(none_as_null=True), nullable=True
     )
     source: Mapped[dict[str, object]] = mapped_column(JSON, default=dict, nullable=False)
     created_by_user_id: Mapped[uuid.UUID | None] = mapped_column(
@@ -98,6 +109,41 @@ class LessonVersion(Base):
         back_populates="lesson_version",
     )
 
+    @property
+    def content(self) -> dict[str, Any]:
+        """Full teacher script and section lists, rebuilt from deltas if needed.
+
+        The returned structures are shared with the content cache; copy before mutating.
+        """
+
+        from app.services.version_content import resolve_content
+
+        return resolve_content(self)
+
+    @property
+    def teacher_script_md(self) -> str | None:
+        return self.content["teacher_script_md"]
+
+    @property
+    def materials(self) -> list[dict[str, object]]:
+        return self.content["materials"]
+
+    @property
+    def flow(self) -> list[dict[str, object]]:
+        return self.content["flow"]
+
+    @property
+    def differentiation(self) -> list[dict[str, object]]:
+        return self.content["differentiation"]
+
+    @property
+    def assessments(self) -> list[dict[str, object]]:
+        return self.content["assessments"]
+
+    @property
+    def accommodations(self) -> list[dict[str, object]]:
+        return self.content["accommodations"]
+
 
 class LessonBlock(Base):
     """Fine-grained content block within a lesson version."""
@@ -127,6 +173,10 @@ class Lesson(Base):
     """Represents a lesson owned by a user within a tenant."""
 
     __tablename__ = "lessons"
+    __table_args__ = (
+        # Joins from lesson_standards land on the current version of each lesson.
+        Index("ix_lessons_current_version_id", "current_version_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -145,6 +195,8 @@ class Lesson(Base):
     current_version_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True), nullable=True
     )
+    # Next version_no to hand out; bumped atomically with current_version_id.
+    next_version_no: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     visibility: Mapped[str] = mapped_column(String(length=20), nullable=False, default="private")
     tags: Mapped[list[str]] = mapped_column(JSON, default=list, nullable=False)
     metadata_json: Mapped[dict[str, object]] = mapped_column(
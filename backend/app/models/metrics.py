@@ -1,4 +1,4 @@
-"""Daily metrics aggregates."""
+"""Daily metrics and standards coverage aggregates."""
 from __future__ import annotations
 
 import uuid
@@ -32,3 +32,22 @@ class MetricsDaily(Base):
     )
 
     tenant: Mapped["Tenant"] = relationship(back_populates="metrics_daily")
+
+
+class StandardsCoverage(Base):
+    """Per-tenant count of lessons whose current version is aligned to a standard, by grade.
+
+    Maintained incrementally by :mod:`app.services.standards_coverage` as links
+    are added and current versions move; rows may hold zero.
+    """
+
+    __tablename__ = "standards_coverage"
+
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True
+    )
+    standard_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("standards.id", ondelete="CASCADE"), primary_key=True
+    )
+    grade_level: Mapped[str] = mapped_column(String(length=20), primary_key=True)
+    lesson_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -2,10 +2,19 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, JSON, String, Text, UniqueConstraint
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -16,6 +25,10 @@ if TYPE_CHECKING:
     from .lesson import LessonVersion
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class StandardsFramework(Base):
     """Catalog of academic standards frameworks (e.g., CCSS, NGSS)."""
 
@@ -50,6 +63,8 @@ class Standard(Base):
     __tablename__ = "standards"
     __table_args__ = (
         UniqueConstraint("framework_id", "code", name="ux_standard_framework_code"),
+        Index("ix_standards_code", "code"),
+        Index("ix_standards_parent_id", "parent_id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -60,6 +75,12 @@ class Standard(Base):
         ForeignKey("standards_frameworks.id", ondelete="CASCADE"),
         nullable=False,
     )
+    # Domain/cluster this standard belongs to; the closure table holds the full ancestry.
+    parent_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("standards.id", ondelete="SET NULL"),
+        nullable=True,
+    )
     code: Mapped[str] = mapped_column(String(length=100), nullable=False)
     grade_band: Mapped[str | None] = mapped_column(String(length=20), nullable=True)
     subject: Mapped[str] = mapped_column(String(length=100), nullable=False)
@@ -71,6 +92,14 @@ class Standard(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+    # Set from Python for sub-second precision: the standards index snapshot is keyed on it.
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=_utcnow,
+        onupdate=_utcnow,
+        server_default=func.now(),
+    )
 
     framework: Mapped["StandardsFramework"] = relationship(back_populates="standards")
     lesson_links: Mapped[list["LessonStandard"]] = relationship(
@@ -78,10 +107,41 @@ class Standard(Base):
     )
 
 
+class StandardClosure(Base):
+    """Transitive closure of the standards hierarchy.
+
+    One row per (ancestor, descendant) pair, including each standard paired
+    with itself at depth 0, so "this code and everything under it" is a single
+    join. Maintained by :mod:`app.services.standards_hierarchy`.
+    """
+
+    __tablename__ = "standard_closure"
+    __table_args__ = (
+        # Ancestor lookups (descendant -> ancestors); the primary key leads with the ancestor.
+        Index("ix_standard_closure_descendant", "descendant_id", "ancestor_id"),
+    )
+
+    ancestor_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("standards.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    descendant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("standards.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
 class LessonStandard(Base):
     """Association between lesson versions and aligned standards."""
 
     __tablename__ = "lesson_standards"
+    __table_args__ = (
+        # Reverse lookup (standard -> versions); the primary key leads with the version.
+        Index("ix_lesson_standards_standard_version", "standard_id", "lesson_version_id"),
+    )
 
     lesson_version_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -11,22 +11,43 @@ from .user import (
 from .lesson import (
     LessonCreate,
     LessonDetail,
+    LessonImportError,
+    LessonImportResponse,
     LessonRestoreResponse,
+    LessonStandardsAlignRequest,
     LessonSummary,
     LessonVersionCreate,
     LessonVersionRead,
 )
 from .generation import GenerationJobRead, GenerationRequest, GenerationResponse
-from .standard import StandardRead, StandardsFrameworkRead
+from .standard import (
+    CacheStats,
+    CoverageLesson,
+    StandardChangeRead,
+    StandardCoverage,
+    StandardImportRowError,
+    StandardRead,
+    StandardSearchHit,
+    StandardSearchPage,
+    StandardsCacheStats,
+    StandardsCoverageReport,
+    StandardsFrameworkRead,
+    StandardsImportReport,
+)
 from .lms import (
     ClassroomConnectRequest,
     ClassroomConnectResponse,
     ClassroomPushRequest,
     ClassroomPushResponse,
 )
-from .analytics import AnalyticsSummaryResponse
+from .analytics import (
+    AnalyticsSummaryResponse,
+    StandardCoverageCountRead,
+    StandardsCoverageSummaryResponse,
+)
 from .share import ShareCreateRequest, ShareCreateResponse, SharedLessonResponse
 from .lesson import LessonDifferentiateRequest
+from .export import ExportJobRead, LessonExportJobRequest, PacketExportRequest
 
 __all__ = [
     "AuthSessionResponse",
@@ -37,22 +58,40 @@ __all__ = [
     "UserUpdateRequest",
     "LessonCreate",
     "LessonDetail",
+    "LessonImportError",
+    "LessonImportResponse",
     "LessonRestoreResponse",
+    "LessonStandardsAlignRequest",
     "LessonSummary",
     "LessonVersionCreate",
     "LessonVersionRead",
     "GenerationRequest",
     "GenerationResponse",
     "GenerationJobRead",
+    "CacheStats",
+    "CoverageLesson",
+    "StandardChangeRead",
+    "StandardCoverage",
+    "StandardImportRowError",
     "StandardRead",
+    "StandardSearchHit",
+    "StandardSearchPage",
+    "StandardsCacheStats",
+    "StandardsCoverageReport",
     "StandardsFrameworkRead",
+    "StandardsImportReport",
     "ClassroomConnectRequest",
     "ClassroomConnectResponse",
     "ClassroomPushRequest",
     "ClassroomPushResponse",
     "AnalyticsSummaryResponse",
+    "StandardCoverageCountRead",
+    "StandardsCoverageSummaryResponse",
     "ShareCreateRequest",
     "ShareCreateResponse",
     "SharedLessonResponse",
     "LessonDifferentiateRequest",
+    "ExportJobRead",
+    "LessonExportJobRequest",
+    "PacketExportRequest",
 ]
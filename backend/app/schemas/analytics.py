@@ -1,6 +1,8 @@
 """Schemas for analytics endpoints."""
 from __future__ import annotations
 
+from uuid import UUID
+
 from pydantic import BaseModel, Field
 
 
@@ -12,3 +14,23 @@ class AnalyticsSummaryResponse(BaseModel):
     lms_pushes: int = Field(ge=0)
     total_lessons: int = Field(ge=0)
     estimated_time_saved_minutes: int = Field(ge=0)
+
+
+class StandardCoverageCountRead(BaseModel):
+    standard_id: UUID
+    code: str
+    grade_band: str | None
+    description: str
+    lesson_count: int = Field(ge=0)
+    by_grade: dict[str, int] = Field(default_factory=dict)
+
+    class Config:
+        from_attributes = True
+
+
+class StandardsCoverageSummaryResponse(BaseModel):
+    framework_id: UUID
+    framework_code: str
+    total_standards: int = Field(ge=0)
+    covered_standards: int = Field(ge=0)
+    standards: list[StandardCoverageCountRead] = Field(default_factory=list)
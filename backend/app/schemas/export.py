@@ -0,0 +1,37 @@
+"""Schemas for asynchronous export jobs."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+MAX_PACKET_LESSONS = 100
+
+
+class PacketExportRequest(BaseModel):
+    lesson_ids: List[UUID] = Field(min_length=1, max_length=MAX_PACKET_LESSONS)
+    title: Optional[str] = Field(default=None, max_length=200)
+
+
+class LessonExportJobRequest(BaseModel):
+    format: str = Field(description="Export format: pdf, docx, gdoc, json, html, markdown")
+
+
+class ExportJobRead(BaseModel):
+    id: UUID
+    kind: str
+    format: str
+    status: str
+    progress_done: int
+    progress_total: int
+    size_bytes: Optional[int] = None
+    error_message: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    download_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
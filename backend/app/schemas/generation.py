@@ -19,6 +19,9 @@ class GenerationRequest(BaseModel):
     teaching_style: str
     focus_keywords: List[str] = Field(default_factory=list)
     standard_codes: Optional[List[str]] = None
+    standard_framework: Optional[str] = Field(
+        default=None, max_length=50, description="Framework code to resolve standard codes in"
+    )
 
 
 class GenerationJobRead(BaseModel):
@@ -65,6 +65,24 @@ class LessonVersionRead(LessonVersionBase):
     class Config:
         from_attributes = True
 
+    @field_validator("blocks", mode="before")
+    @classmethod
+    def serialize_blocks(cls, value: Any) -> Any:
+        if value is None:
+            return []
+        return [
+            block
+            if isinstance(block, dict)
+            else {
+                "block_type": block.block_type,
+                "sequence": block.sequence,
+                "content_md": block.content_md,
+                "est_minutes": block.est_minutes,
+                "metadata": block.metadata_json,
+            }
+            for block in value
+        ]
+
 
 class LessonSummary(BaseModel):
     id: UUID
@@ -115,3 +133,18 @@ class LessonRestoreResponse(BaseModel):
 class LessonDifferentiateRequest(BaseModel):
     audience: str = Field(pattern="^(ELL|IEP|GIFTED)$", description="Differentiation audience")
     notes: Optional[str] = None
+
+
+class LessonStandardsAlignRequest(BaseModel):
+    standard_ids: List[UUID] = Field(min_length=1, max_length=50)
+
+
+class LessonImportError(BaseModel):
+    line: int
+    error: str
+
+
+class LessonImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[LessonImportError] = Field(default_factory=list)
@@ -21,6 +21,7 @@ class StandardsFrameworkRead(BaseModel):
 class StandardRead(BaseModel):
     id: UUID
     framework_id: UUID
+    parent_id: UUID | None = None
     code: str
     grade_band: str | None
     subject: str
@@ -30,3 +31,89 @@ class StandardRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class StandardSearchHit(BaseModel):
+    """Compact standard shape for typeahead dropdowns."""
+
+    id: UUID
+    code: str
+    subject: str
+    grade_band: str | None
+    description: str
+
+    class Config:
+        from_attributes = True
+
+
+class StandardSearchPage(BaseModel):
+    items: list[StandardSearchHit]
+    next_offset: int | None = None
+
+
+class StandardImportRowError(BaseModel):
+    line: int
+    error: str
+
+    class Config:
+        from_attributes = True
+
+
+class StandardChangeRead(BaseModel):
+    code: str
+    action: str
+    fields: list[str] = Field(default_factory=list)
+
+    class Config:
+        from_attributes = True
+
+
+class StandardsImportReport(BaseModel):
+    framework_id: UUID
+    framework_code: str
+    created: int
+    updated: int
+    unchanged: int
+    skipped: int
+    failed: int
+    relinked: int = 0
+    errors: list[StandardImportRowError] = Field(default_factory=list)
+    changes: list[StandardChangeRead] = Field(default_factory=list)
+
+    class Config:
+        from_attributes = True
+
+
+class CoverageLesson(BaseModel):
+    id: UUID
+    title: str
+
+
+class StandardCoverage(BaseModel):
+    standard_id: UUID
+    parent_id: UUID | None = None
+    code: str
+    grade_band: str | None
+    description: str
+    lesson_count: int
+    lessons: list[CoverageLesson] = Field(default_factory=list)
+
+
+class StandardsCoverageReport(BaseModel):
+    framework_id: UUID
+    framework_code: str
+    total_standards: int
+    covered_standards: int
+    standards: list[StandardCoverage] = Field(default_factory=list)
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    size: int
+    max_entries: int
+
+
+class StandardsCacheStats(BaseModel):
+    suggestions: CacheStats
@@ -0,0 +1,60 @@
+"""Run queued export jobs outside the API process.
+
+Start one or more of these with ``EXPORT_JOBS_IN_PROCESS=false`` set for the
+API, which then only queues jobs::
+
+    python -m app.scripts.export_worker [--once]
+
+Workers claim jobs with ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number
+can run side by side, and periodically requeue jobs whose runner died.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.export_job_service import ExportJobService
+from app.services.render_pool import shutdown_render_pool
+
+logger = logging.getLogger(__name__)
+
+
+def drain() -> int:
+    """Recover abandoned jobs, then run queued ones until none are left; returns jobs run."""
+
+    session = SessionLocal()
+    try:
+        service = ExportJobService(session)
+        service.recover_stale()
+        ran = 0
+        while service.run_next():
+            ran += 1
+        return ran
+    finally:
+        session.close()
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover - script entry point
+    parser = argparse.ArgumentParser(description="Run queued export jobs.")
+    parser.add_argument("--once", action="store_true", help="exit once the queue is empty")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        while True:
+            ran = drain()
+            if ran:
+                logger.info("Ran %d export jobs", ran)
+            if args.once:
+                break
+            time.sleep(settings.export_worker_poll_seconds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_render_pool()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,74 @@
+"""Import a standards framework from a CSV or CASE-JSON file.
+
+Usage::
+
+    python -m app.scripts.import_standards ngss.csv --framework-code NGSS \\
+        --framework-name "Next Generation Science Standards" --subject Science
+    python -m app.scripts.import_standards ccss-math.json --framework-code CCSS.MATH
+"""
+from __future__ import annotations
+
+import argparse
+import pathlib
+
+from app.db.session import SessionLocal
+from app.services.standards_import import (
+    FrameworkSpec,
+    StandardsImporter,
+    StandardsImportResult,
+)
+
+
+def _print_progress(result: StandardsImportResult) -> None:
+    print(
+        f"  {result.processed + result.failed} rows: {result.created} created,"
+        f" {result.updated} updated, {result.unchanged} unchanged, {result.failed} failed",
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover - script entry point
+    parser = argparse.ArgumentParser(description="Import a standards framework file.")
+    parser.add_argument("path", type=pathlib.Path)
+    parser.add_argument("--format", choices=("csv", "case"), help="defaults to the file extension")
+    parser.add_argument("--framework-code", required=True)
+    parser.add_argument("--framework-name", default="")
+    parser.add_argument("--jurisdiction")
+    parser.add_argument("--subject", help="subject for rows or CASE documents without one")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--show-changes", action="store_true", help="list every created/updated code")
+    args = parser.parse_args(argv)
+
+    format_name = args.format or ("case" if args.path.suffix.lower() == ".json" else "csv")
+    session = SessionLocal()
+    try:
+        with args.path.open(encoding="utf-8-sig", newline="") as stream:
+            result = StandardsImporter(session, batch_size=args.batch_size).import_file(
+                stream,
+                format_name,
+                FrameworkSpec(
+                    code=args.framework_code,
+                    name=args.framework_name,
+                    jurisdiction=args.jurisdiction,
+                ),
+                default_subject=args.subject,
+                on_progress=_print_progress,
+            )
+    finally:
+        session.close()
+
+    print(
+        f"Framework {result.framework_code}: {result.created} created, {result.updated} updated,"
+        f" {result.unchanged} unchanged, {result.skipped} duplicate, {result.failed} failed,"
+        f" {result.relinked} re-parented"
+    )
+    if args.show_changes:
+        for change in result.changes:
+            fields = f" ({', '.join(change.fields)})" if change.fields else ""
+            print(f"  {change.action:<7} {change.code}{fields}")
+    for error in result.errors:
+        print(f"  line {error.line}: {error.error}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,24 @@
+"""Delete expired export job results; intended to run periodically (e.g. from cron)."""
+from __future__ import annotations
+
+from app.db.session import SessionLocal
+from app.services.export_job_service import ExportJobService
+
+
+def purge() -> int:
+    """Remove export jobs past their TTL along with their stored files."""
+
+    session = SessionLocal()
+    try:
+        return ExportJobService(session).purge_expired()
+    finally:
+        session.close()
+
+
+def main() -> None:  # pragma: no cover - script entry point
+    removed = purge()
+    print(f"Purged {removed} expired export jobs")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,45 @@
+"""Recompute the standards hierarchy closure table from ``Standard.parent_id``.
+
+ORM writes keep the closure up to date incrementally; run this to repair it
+after manual data fixes, for every framework or just one::
+
+    python -m app.scripts.rebuild_standards_closure [--framework FRAMEWORK_ID]
+"""
+from __future__ import annotations
+
+import argparse
+import uuid
+
+from sqlalchemy import select
+
+from app.db.session import SessionLocal
+from app.models.standard import StandardsFramework
+from app.services.standards_hierarchy import rebuild_closure
+
+
+def rebuild(framework_id: uuid.UUID | None = None) -> int:
+    """Rebuild in one transaction and return the number of frameworks rebuilt."""
+
+    session = SessionLocal()
+    try:
+        if framework_id is None:
+            framework_ids = list(session.scalars(select(StandardsFramework.id)))
+        else:
+            framework_ids = [framework_id]
+        rebuild_closure(session, framework_ids)
+        session.commit()
+        return len(framework_ids)
+    finally:
+        session.close()
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover - script entry point
+    parser = argparse.ArgumentParser(description="Rebuild the standards closure table.")
+    parser.add_argument("--framework", type=uuid.UUID, help="only rebuild this framework")
+    args = parser.parse_args(argv)
+    rebuilt = rebuild(args.framework)
+    print(f"Rebuilt the standards closure for {rebuilt} frameworks")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,38 @@
+"""Recompute the standards coverage summary from lessons and their aligned standards.
+
+The summary is maintained incrementally; run this to repair it after manual
+data fixes or a failed deploy, for every tenant or just one::
+
+    python -m app.scripts.rebuild_standards_coverage [--tenant TENANT_ID]
+"""
+from __future__ import annotations
+
+import argparse
+import uuid
+
+from app.db.session import SessionLocal
+from app.services.standards_coverage import StandardsCoverageService
+
+
+def rebuild(tenant_id: uuid.UUID | None = None) -> int:
+    """Rebuild the summary in one transaction and return the number of rows written."""
+
+    session = SessionLocal()
+    try:
+        written = StandardsCoverageService(session).rebuild(tenant_id)
+        session.commit()
+        return written
+    finally:
+        session.close()
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover - script entry point
+    parser = argparse.ArgumentParser(description="Rebuild the standards coverage summary.")
+    parser.add_argument("--tenant", type=uuid.UUID, help="only rebuild this tenant")
+    args = parser.parse_args(argv)
+    written = rebuild(args.tenant)
+    print(f"Rebuilt standards coverage: {written} rows")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
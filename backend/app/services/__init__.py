@@ -11,9 +11,12 @@ from .generation_service import GenerationInput, GenerationService
 from .event_service import EventService
 from .analytics_service import AnalyticsService
 from .export_service import ExportService
-from .lesson_service import LessonFilters, LessonService
+from .export_cache import ExportCacheService
+from .export_job_service import ExportJobService
+from .lesson_service import LessonFilters, LessonLoad, LessonService
 from .lms_service import LMSService
 from .share_service import ShareService
+from .standards_coverage import StandardsCoverageService
 from .standards_service import StandardsService
 from .user_service import UserService
 
@@ -28,10 +31,14 @@ __all__ = [
     "EventService",
     "AnalyticsService",
     "ExportService",
+    "ExportCacheService",
+    "ExportJobService",
     "LessonFilters",
+    "LessonLoad",
     "LessonService",
     "LMSService",
     "ShareService",
+    "StandardsCoverageService",
     "StandardsService",
     "UserService",
 ]
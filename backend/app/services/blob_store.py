@@ -0,0 +1,67 @@
+"""Pluggable storage for generated binary artifacts (rendered exports, archives)."""
+from __future__ import annotations
+
+import os
+import pathlib
+import tempfile
+from typing import BinaryIO, Protocol
+
+from app.core.config import settings
+
+
+class BlobStore(Protocol):
+    """Minimal key/value blob interface; keys are opaque, filesystem-safe strings."""
+
+    def put(self, key: str, data: bytes) -> None: ...
+
+    def open(self, key: str) -> BinaryIO | None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def local_path(self, key: str) -> pathlib.Path | None:
+        """Return a local file path for ``key`` if the store has one (for sendfile)."""
+        ...
+
+
+class LocalBlobStore:
+    """Stores blobs as files under a root directory, sharded by key prefix."""
+
+    def __init__(self, root: str | os.PathLike[str]) -> None:
+        self.root = pathlib.Path(root)
+        if not self.root.is_absolute():
+            self.root = pathlib.Path(__file__).resolve().parent.parent.parent / self.root
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.root / key[:2] / key
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file.
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            pathlib.Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def open(self, key: str) -> BinaryIO | None:
+        try:
+            return self._path(key).open("rb")
+        except FileNotFoundError:
+            return None
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def local_path(self, key: str) -> pathlib.Path | None:
+        path = self._path(key)
+        return path if path.exists() else None
+
+
+def get_blob_store(namespace: str) -> BlobStore:
+    """Return the configured blob store for ``namespace`` (e.g. ``"exports"``)."""
+
+    return LocalBlobStore(pathlib.Path(settings.blob_storage_dir) / namespace)
@@ -0,0 +1,112 @@
+"""Preloaded base template for DOCX exports.
+
+``docx.Document()`` unzips and parses the whole template package (styles,
+numbering, theme, fonts) on every call. The template is instead read once per
+process; each render gets a fresh copy of only the small main document part,
+while the parsed styles and the rest of the package are reused.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import io
+import pathlib
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from docx import Document
+from docx.document import Document as DocxDocument
+from docx.oxml.ns import qn
+
+from app.core.config import settings
+
+HEADING_LEVELS = (1, 2)
+
+
+@dataclass(slots=True)
+class DocxStyles:
+    """Paragraph style ids resolved once per template.
+
+    python-docx resolves a style passed by name *or* object by scanning every
+    style in the package on each paragraph, which dominated render time.
+    Writing the resolved id straight onto the paragraph skips that.
+    """
+
+    headings: dict[int, str]
+    list_bullet: str
+
+    @staticmethod
+    def add_paragraph(document: DocxDocument, text: str = "", style_id: str | None = None) -> Any:
+        paragraph = document.add_paragraph(text)
+        if style_id is not None:
+            paragraph._p.style = style_id
+        return paragraph
+
+
+class DocxTemplate:
+    """A .docx base template that hands out blank documents cheaply.
+
+    python-docx objects are not thread-safe, so each thread keeps its own
+    parsed copy of the template. A document returned by :meth:`new_document`
+    is valid until the next call from the same thread.
+    """
+
+    def __init__(self, source: bytes | None = None) -> None:
+        self._source = source
+        self._local = threading.local()
+        self.fingerprint = hashlib.sha256(source).hexdigest()[:16] if source else "default"
+
+    @classmethod
+    def from_path(cls, path: str | None) -> DocxTemplate:
+        """Load a template file; an empty path uses python-docx's default template."""
+
+        if not path:
+            return cls()
+        template_path = pathlib.Path(path)
+        if not template_path.is_absolute():
+            template_path = pathlib.Path(__file__).resolve().parent.parent.parent / template_path
+        return cls(template_path.read_bytes())
+
+    def _parsed(self) -> tuple[Any, Any, DocxStyles]:
+        state = getattr(self._local, "state", None)
+        if state is None:
+            base = Document(io.BytesIO(self._source) if self._source is not None else None)
+            # Start from the template's styles and section setup, not its sample text.
+            body = base.element.body
+            for child in list(body):
+                if child.tag != qn("w:sectPr"):
+                    body.remove(child)
+            try:
+                styles = DocxStyles(
+                    headings={
+                        level: base.styles[f"Heading {level}"].style_id for level in HEADING_LEVELS
+                    },
+                    list_bullet=base.styles["List Bullet"].style_id,
+                )
+            except KeyError as exc:
+                raise ValueError(f"DOCX export template is missing style {exc}") from exc
+            state = (base.part, copy.deepcopy(base.part.element), styles)
+            self._local.state = state
+        return state
+
+    def new_document(self) -> tuple[DocxDocument, DocxStyles]:
+        """Return a blank document built on the template plus its resolved styles."""
+
+        part, pristine, styles = self._parsed()
+        part._element = copy.deepcopy(pristine)
+        return part.document, styles
+
+
+_template: DocxTemplate | None = None
+_template_lock = threading.Lock()
+
+
+def get_docx_template() -> DocxTemplate:
+    """Return the process-wide template configured by ``EXPORT_DOCX_TEMPLATE``."""
+
+    global _template
+    with _template_lock:
+        if _template is None:
+            _template = DocxTemplate.from_path(settings.export_docx_template)
+        return _template
@@ -0,0 +1,223 @@
+"""Content-addressed cache of rendered lesson exports.
+
+Lesson versions are immutable, so a rendered PDF/DOCX only changes when the
+renderer or the inputs it reads (lesson title, version content, linked
+standards) change. The cache key hashes all of them; the rendered bytes live
+in a blob store and ``export_cache_entries`` indexes them for LRU eviction.
+``export_cache_usage`` keeps their running total, so writes check the size
+bound without summing the index.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import pathlib
+import uuid
+from dataclasses import asdict
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.dialect import insert_ignore, upsert
+from app.models import ExportCacheEntry, ExportCacheUsage
+from app.services.blob_store import BlobStore, get_blob_store
+from app.services.docx_template import get_docx_template
+from app.services.export_service import RENDERER_VERSION, ExportContent
+
+try:  # Optional: brotli variants are only produced when the package is installed.
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+CACHEABLE_FORMATS = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+PREVIEW_FORMATS = {
+    "html": "text/html; charset=utf-8",
+    "markdown": "text/markdown; charset=utf-8",
+}
+
+# Automatic eviction frees space down to this share of the size bound.
+EVICT_TO_RATIO = 0.9
+# Eviction candidates are read oldest first, this many at a time.
+EVICTION_BATCH_SIZE = 100
+
+# Precompressed variants stored alongside text previews, in preference order.
+PRECOMPRESSORS = {
+    **({"br": lambda data: brotli.compress(data, quality=11)} if brotli is not None else {}),
+    "gzip": lambda data: gzip.compress(data, compresslevel=9, mtime=0),
+}
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Pick the best precompressed variant the client accepts, or None for identity."""
+
+    if not accept_encoding:
+        return None
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in PRECOMPRESSORS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class ExportCacheService:
+    """Looks up, stores and evicts cached export renders."""
+
+    def __init__(self, session: Session, store: BlobStore | None = None) -> None:
+        self.session = session
+        self.store = store or get_blob_store("exports")
+
+    @staticmethod
+    def cache_key(version_id: uuid.UUID, format_name: str, content: ExportContent) -> str:
+        format_name = format_name.lower()
+        payload = json.dumps(asdict(content), sort_keys=True, ensure_ascii=False)
+        renderer = RENDERER_VERSION
+        if format_name == "docx":
+            renderer = f"{renderer}+{get_docx_template().fingerprint}"
+        digest = hashlib.sha256(
+            "|".join((renderer, format_name, str(version_id), payload)).encode("utf-8")
+        )
+        return digest.hexdigest()
+
+    @staticmethod
+    def variant_key(key: str, encoding: str | None) -> str:
+        if encoding is None:
+            return key
+        return hashlib.sha256(f"{key}:{encoding}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> pathlib.Path | None:
+        """Return the local path of a cached render and mark it recently used."""
+
+        entry = self.session.get(ExportCacheEntry, key)
+        if entry is None:
+            return None
+        path = self.store.local_path(key)
+        if path is None:
+            # The blob was removed out from under the index; treat as a miss.
+            self.session.delete(entry)
+            self._add_usage(-entry.size_bytes)
+            return None
+        self.session.execute(
+            update(ExportCacheEntry)
+            .where(ExportCacheEntry.cache_key == key)
+            .values(last_accessed_at=datetime.now(timezone.utc))
+        )
+        return path
+
+    def put(self, key: str, version_id: uuid.UUID, format_name: str, data: bytes) -> None:
+        """Store a render and evict least recently used entries beyond the size bound."""
+
+        self.store.put(key, data)
+        now = datetime.now(timezone.utc)
+        inserted = self.session.execute(
+            insert_ignore(self.session, ExportCacheEntry).values(
+                cache_key=key,
+                lesson_version_id=version_id,
+                format=format_name.lower(),
+                size_bytes=len(data),
+                created_at=now,
+                last_accessed_at=now,
+            )
+        ).rowcount
+        if not inserted:
+            return
+        total = self._add_usage(len(data))
+        if total > settings.export_cache_max_bytes:
+            # Evict below the bound so the next few writes do not trip it again.
+            self.evict(target_bytes=int(settings.export_cache_max_bytes * EVICT_TO_RATIO))
+
+    def put_variants(
+        self, key: str, version_id: uuid.UUID, format_name: str, data: bytes
+    ) -> dict[str | None, bytes]:
+        """Store ``data`` plus its precompressed variants; returns them by encoding."""
+
+        variants: dict[str | None, bytes] = {None: data}
+        for encoding, compress in PRECOMPRESSORS.items():
+            variants[encoding] = compress(data)
+        for encoding, payload in variants.items():
+            suffix = f"+{encoding}" if encoding else ""
+            self.put(self.variant_key(key, encoding), version_id, f"{format_name}{suffix}", payload)
+        return variants
+
+    def evict(
+        self, max_bytes: int | None = None, target_bytes: int | None = None
+    ) -> list[str]:
+        """Drop least recently used entries once the cache exceeds ``max_bytes``.
+
+        Entries go until the cache fits in ``target_bytes`` (default
+        ``max_bytes``). The running total is first reconciled with the real
+        sum, which also repairs drift from rows deleted by cascade; victims
+        are then read oldest first, one small batch at a time.
+        """
+
+        max_bytes = settings.export_cache_max_bytes if max_bytes is None else max_bytes
+        target_bytes = max_bytes if target_bytes is None else min(target_bytes, max_bytes)
+        total = self.session.scalar(
+            select(func.coalesce(func.sum(ExportCacheEntry.size_bytes), 0))
+        )
+        if total <= max_bytes:
+            self._set_usage(total)
+            return []
+
+        evicted: list[str] = []
+        while total > target_bytes:
+            batch = self.session.execute(
+                select(ExportCacheEntry.cache_key, ExportCacheEntry.size_bytes)
+                .order_by(ExportCacheEntry.last_accessed_at, ExportCacheEntry.cache_key)
+                .limit(EVICTION_BATCH_SIZE)
+            ).all()
+            if not batch:
+                break
+            victims: list[str] = []
+            for key, size in batch:
+                if total <= target_bytes:
+                    break
+                victims.append(key)
+                total -= size
+            self.session.execute(
+                delete(ExportCacheEntry).where(ExportCacheEntry.cache_key.in_(victims))
+            )
+            evicted.extend(victims)
+        self._set_usage(total)
+        for key in evicted:
+            self.store.delete(key)
+        return evicted
+
+    def _add_usage(self, delta: int) -> int:
+        """Add ``delta`` bytes to the running total and return the new total."""
+
+        return self.session.execute(
+            upsert(
+                self.session,
+                ExportCacheUsage,
+                index_elements=("id",),
+                increment_columns=("total_bytes",),
+            )
+            .values(id=1, total_bytes=delta)
+            .returning(ExportCacheUsage.total_bytes)
+        ).scalar_one()
+
+    def _set_usage(self, total: int) -> None:
+        self.session.execute(
+            upsert(
+                self.session,
+                ExportCacheUsage,
+                index_elements=("id",),
+                update_columns=("total_bytes",),
+            ).values(id=1, total_bytes=total)
+        )
@@ -0,0 +1,338 @@
+"""Background export jobs whose results are downloaded once ready.
+
+Jobs run either as API background tasks or, with
+``settings.export_jobs_in_process`` off, in ``app.scripts.export_worker``
+processes. Runners claim rows with ``SELECT ... FOR UPDATE SKIP LOCKED`` and
+stamp a heartbeat when claiming, between phases and while renders run;
+:meth:`ExportJobService.recover_stale` requeues or fails jobs whose runner died.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import pathlib
+import uuid
+from collections.abc import Callable, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.models import ExportJob, Lesson, LessonVersion, User
+from app.services.blob_store import BlobStore, get_blob_store
+from app.services.export_cache import CACHEABLE_FORMATS
+from app.services.export_service import (
+    MEDIA_TYPES,
+    ExportService,
+    render_export,
+    render_packet_export,
+)
+from app.services.render_pool import get_render_pool
+from app.services.version_content import preload_content
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PACKET_TITLE = "Lesson Packet"
+
+
+class ExportJobService:
+    """Creates, runs and looks up export jobs."""
+
+    def __init__(self, session: Session, store: BlobStore | None = None) -> None:
+        self.session = session
+        self.store = store or get_blob_store("export-jobs")
+
+    def create_packet_job(
+        self, user: User, lesson_ids: Sequence[uuid.UUID], title: str | None = None
+    ) -> ExportJob:
+        """Queue a multi-lesson PDF packet; raises ``LookupError`` for unknown lessons."""
+
+        found = set(
+            self.session.scalars(
+                select(Lesson.id).where(
+                    Lesson.tenant_id == user.tenant_id, Lesson.id.in_(set(lesson_ids))
+                )
+            )
+        )
+        missing = [str(lesson_id) for lesson_id in lesson_ids if lesson_id not in found]
+        if missing:
+            raise LookupError(f"Lessons not found: {', '.join(missing)}")
+
+        job = ExportJob(
+            tenant_id=user.tenant_id,
+            user_id=user.id,
+            kind="packet",
+            format="pdf",
+            status="queued",
+            params={
+                "lesson_ids": [str(lesson_id) for lesson_id in lesson_ids],
+                "title": title or DEFAULT_PACKET_TITLE,
+            },
+            progress_done=0,
+            # Two phases: content prepared (the render is then underway), then rendered.
+            # The render dominates, so per-section steps would reach ~100% before it.
+            progress_total=2,
+        )
+        self.session.add(job)
+        self.session.flush()
+        return job
+
+    def create_lesson_job(
+        self, user: User, lesson: Lesson, version: LessonVersion, format_name: str
+    ) -> ExportJob:
+        """Queue a single-lesson export of ``version``; raises ``ValueError`` for bad formats."""
+
+        format_name = format_name.lower()
+        if format_name not in MEDIA_TYPES:
+            raise ValueError("Unsupported export format")
+        job = ExportJob(
+            tenant_id=user.tenant_id,
+            user_id=user.id,
+            kind="lesson",
+            format=format_name,
+            status="queued",
+            params={"lesson_id": str(lesson.id), "version_id": str(version.id)},
+            progress_done=0,
+            progress_total=1,
+        )
+        self.session.add(job)
+        self.session.flush()
+        return job
+
+    def get_job(self, job_id: uuid.UUID, tenant_id: uuid.UUID) -> ExportJob:
+        job = self.session.execute(
+            select(ExportJob).where(ExportJob.id == job_id, ExportJob.tenant_id == tenant_id)
+        ).scalar_one_or_none()
+        if job is None:
+            raise LookupError("Export job not found")
+        return job
+
+    def result_path(self, job: ExportJob) -> pathlib.Path | None:
+        """Return the finished result file, or None if not ready or expired."""
+
+        if job.status != "completed" or job.blob_key is None:
+            return None
+        if job.expires_at is not None:
+            expires_at = job.expires_at
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            if expires_at <= datetime.now(timezone.utc):
+                return None
+        return self.store.local_path(job.blob_key)
+
+    def run_job(self, job_id: uuid.UUID) -> None:
+        """Claim and execute a queued job, recording progress and the outcome on its row.
+
+        Jobs already claimed elsewhere are left alone: the row is selected
+        ``FOR UPDATE SKIP LOCKED`` and only while it is still queued.
+        """
+
+        job = self.session.execute(
+            select(ExportJob)
+            .where(ExportJob.id == job_id, ExportJob.status == "queued")
+            .with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if job is None:
+            self.session.commit()
+            return
+        self._execute(job)
+
+    def run_next(self) -> bool:
+        """Claim and execute the oldest queued job; returns False if none was waiting."""
+
+        job = self.session.execute(
+            select(ExportJob)
+            .where(ExportJob.status == "queued")
+            .order_by(ExportJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if job is None:
+            self.session.commit()
+            return False
+        self._execute(job)
+        return True
+
+    def recover_stale(self, requeue: bool = True, now: datetime | None = None) -> int:
+        """Requeue or fail jobs abandoned by a crashed runner; returns the number touched.
+
+        A processing job whose heartbeat is older than
+        ``settings.export_job_stale_seconds`` is requeued until it has used
+        ``settings.export_job_max_attempts``, then failed. Without a worker
+        (``requeue=False``) nothing would pick requeued jobs up, so stale
+        queued and processing jobs are failed instead.
+        """
+
+        now = now or datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=settings.export_job_stale_seconds)
+        abandoned = and_(ExportJob.status == "processing", ExportJob.heartbeat_at < cutoff)
+        if not requeue:
+            abandoned = or_(
+                abandoned, and_(ExportJob.status == "queued", ExportJob.created_at < cutoff)
+            )
+        jobs = self.session.scalars(
+            select(ExportJob).where(abandoned).with_for_update(skip_locked=True)
+        ).all()
+        for job in jobs:
+            if requeue and job.attempts < settings.export_job_max_attempts:
+                logger.warning("Requeueing abandoned export job %s", job.id)
+                job.status = "queued"
+                job.progress_done = 0
+                continue
+            logger.warning("Failing abandoned export job %s", job.id)
+            job.status = "failed"
+            job.error_message = "Export was interrupted"
+            job.completed_at = now
+            job.expires_at = now + timedelta(hours=settings.export_job_ttl_hours)
+        self.session.commit()
+        return len(jobs)
+
+    def _execute(self, job: ExportJob) -> None:
+        job.status = "processing"
+        job.attempts += 1
+        job.heartbeat_at = datetime.now(timezone.utc)
+        self.session.commit()
+        runner = self._run_packet if job.kind == "packet" else self._run_lesson
+        try:
+            data = runner(job)
+        except Exception as exc:
+            self.session.rollback()
+            logger.exception("Export job %s failed", job.id)
+            job.status = "failed"
+            job.error_message = str(exc) or exc.__class__.__name__
+            self._finish(job)
+            return
+
+        job.blob_key = job.id.hex
+        self.store.put(job.blob_key, data)
+        job.size_bytes = len(data)
+        job.progress_done = job.progress_total
+        job.status = "completed"
+        self._finish(job)
+
+    def purge_expired(self, now: datetime | None = None) -> int:
+        """Delete expired jobs and their result blobs; returns the number removed."""
+
+        now = now or datetime.now(timezone.utc)
+        expired = self.session.execute(
+            select(ExportJob.id, ExportJob.blob_key).where(ExportJob.expires_at < now)
+        ).all()
+        if not expired:
+            return 0
+        for _, blob_key in expired:
+            if blob_key:
+                self.store.delete(blob_key)
+        self.session.execute(
+            delete(ExportJob).where(ExportJob.id.in_([job_id for job_id, _ in expired]))
+        )
+        self.session.commit()
+        return len(expired)
+
+    def _finish(self, job: ExportJob) -> None:
+        job.completed_at = datetime.now(timezone.utc)
+        job.expires_at = job.completed_at + timedelta(hours=settings.export_job_ttl_hours)
+        self.session.commit()
+        # Finished jobs are a natural point to sweep results nobody collected.
+        self.purge_expired()
+
+    def _heartbeat(self, job: ExportJob) -> dict[str, Any]:
+        """Render pool arguments that keep ``job`` fresh while a render runs.
+
+        A packet may render for far longer than ``export_job_stale_seconds``;
+        stamping the heartbeat a few times per window, each in its own short
+        transaction, keeps :meth:`recover_stale` from reclaiming a live job.
+        """
+
+        def beat() -> None:
+            job.heartbeat_at = datetime.now(timezone.utc)
+            self.session.commit()
+
+        return {"heartbeat": beat, "heartbeat_interval": settings.export_job_stale_seconds / 3}
+
+    def _run_lesson(self, job: ExportJob) -> bytes:
+        row = self.session.execute(
+            select(Lesson, LessonVersion)
+            .join(LessonVersion, LessonVersion.lesson_id == Lesson.id)
+            .options(selectinload(LessonVersion.standards))
+            .where(
+                Lesson.tenant_id == job.tenant_id,
+                LessonVersion.id == uuid.UUID(job.params["version_id"]),
+            )
+        ).first()
+        if row is None:
+            raise LookupError("Lesson version is no longer available")
+        content = ExportService(self.session).build_content(*row)
+
+        if job.format in CACHEABLE_FORMATS:
+            return get_render_pool().run(
+                render_export,
+                content,
+                job.format,
+                wait=settings.export_render_timeout_seconds,
+                **self._heartbeat(job),
+            )
+        output = ExportService(self.session).render(content, job.format)
+        if isinstance(output, dict):
+            return json.dumps(output, ensure_ascii=False).encode("utf-8")
+        return output
+
+    def _run_packet(self, job: ExportJob) -> bytes:
+        lesson_ids = [uuid.UUID(value) for value in job.params["lesson_ids"]]
+        rows = self.session.execute(
+            select(Lesson, LessonVersion)
+            .join(LessonVersion, LessonVersion.id == Lesson.current_version_id)
+            .options(selectinload(LessonVersion.standards))
+            .where(Lesson.tenant_id == job.tenant_id, Lesson.id.in_(set(lesson_ids)))
+        ).all()
+        by_id = {lesson.id: (lesson, version) for lesson, version in rows}
+        preload_content([version for _, version in rows], self.session)
+
+        export_service = ExportService(self.session)
+        contents = []
+        for lesson_id in lesson_ids:
+            if lesson_id not in by_id:
+                raise LookupError(f"Lesson {lesson_id} is no longer available")
+            contents.append(export_service.build_content(*by_id[lesson_id]))
+        job.progress_done = 1
+        job.heartbeat_at = datetime.now(timezone.utc)
+        self.session.commit()
+
+        # Packets scale with their length; allow each section the single-render budget.
+        return get_render_pool().run(
+            render_packet_export,
+            job.params["title"],
+            contents,
+            timeout=settings.export_render_timeout_seconds * len(contents),
+            wait=settings.export_render_timeout_seconds,
+            **self._heartbeat(job),
+        )
+
+
+def run_export_job(session_factory: Callable[[], Session], job_id: uuid.UUID) -> None:
+    session = session_factory()
+    try:
+        ExportJobService(session).run_job(job_id)
+    finally:
+        session.close()
+
+
+def recover_export_jobs() -> None:
+    """Startup hook: deal with jobs left behind when a previous process crashed."""
+
+    if not settings.export_job_recover_on_startup:
+        return
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        recovered = ExportJobService(session).recover_stale(
+            requeue=not settings.export_jobs_in_process
+        )
+        if recovered:
+            logger.info("Recovered %d abandoned export jobs", recovered)
+    except Exception:  # pragma: no cover - the worker sweeps again while it runs
+        logger.warning("Could not recover abandoned export jobs", exc_info=True)
+    finally:
+        session.close()
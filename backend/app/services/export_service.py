@@ -1,17 +1,47 @@
 """Services for exporting lessons to various formats."""
 from __future__ import annotations
 
+import html
 import io
-from dataclasses import dataclass
+import json
+import logging
+import zipfile
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from typing import Any
 
-from docx import Document
 from fpdf import FPDF
 from fpdf.enums import XPos, YPos
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.lesson import Lesson, LessonVersion
+from app.services.docx_template import get_docx_template
+from app.services.markdown_render import render_markdown
+
+ARCHIVE_FORMATS = {"pdf": "pdf", "docx": "docx", "json": "json"}
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "gdoc": "application/json",
+    "json": "application/json",
+    "html": "text/html; charset=utf-8",
+    "markdown": "text/markdown; charset=utf-8",
+}
+FILE_EXTENSIONS = {"gdoc": "json", "markdown": "md"}
+
+# Bump whenever a change to the renderers alters their output, so cached
+# renders produced by older code are no longer served.
+RENDERER_VERSION = "2"
+
+# Written last into an archive when any of its members failed to render.
+ARCHIVE_ERRORS_MEMBER = "errors.txt"
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(slots=True)
@@ -27,16 +57,22 @@ class ExportContent:
     differentiation: list[str]
     assessments: list[str]
     accommodations: list[str]
+    teacher_script_md: str | None = None
 
 
 class ExportService:
     """Handles conversion of lessons into PDF/DOCX/GDoc representations."""
 
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: Session | None) -> None:
+        # Rendering alone needs no session; worker processes pass ``None``.
         self.session = session
 
     def export(self, lesson: Lesson, version: LessonVersion, format_name: str) -> Any:
-        content = self._build_content(lesson, version)
+        return self.render(self.build_content(lesson, version), format_name)
+
+    def render(self, content: ExportContent, format_name: str) -> Any:
+        """Render already-built content; touches no ORM state, so it is thread-safe."""
+
         format_name = format_name.lower()
         if format_name == "pdf":
             return self._export_pdf(content)
@@ -44,9 +80,93 @@ class ExportService:
             return self._export_docx(content)
         if format_name == "gdoc":
             return self._export_gdoc(content)
+        if format_name == "json":
+            return self._export_json(content)
+        if format_name == "markdown":
+            return self._export_markdown(content).encode("utf-8")
+        if format_name == "html":
+            return self._export_html(content)
         raise ValueError("Unsupported export format")
 
-    def _build_content(self, lesson: Lesson, version: LessonVersion) -> ExportContent:
+    def iter_archive(
+        self,
+        members: Iterable[tuple[str, ExportContent]],
+        format_name: str,
+        window: int | None = None,
+    ) -> Iterator[bytes]:
+        """Stream a ZIP of ``(name, content)`` members rendered in ``format_name``.
+
+        Members render in the process-wide render pool but are written in input
+        order. ``members`` is consumed lazily: at most ``window`` members are in
+        flight at once, so callers can build each member's content on demand,
+        and each chunk of the archive is yielded as soon as it is written.
+
+        The response is already under way by the time members render, so a
+        member that fails (a busy pool, a render timeout, a renderer error) is
+        left out and listed in an ``errors.txt`` member instead of aborting the
+        stream part-way through the archive.
+        """
+
+        # Imported here: the render pool imports this module for its entry points.
+        from app.services.render_pool import get_render_pool
+
+        format_name = format_name.lower()
+        extension = ARCHIVE_FORMATS.get(format_name)
+        if extension is None:
+            raise ValueError("Unsupported archive format")
+        window = window or settings.export_archive_concurrency
+        pool = get_render_pool()
+
+        sink = _ZipStreamSink()
+        pending: deque[tuple[str, Future[Any] | None]] = deque()
+        errors: list[str] = []
+
+        def failed(member_name: str, exc: Exception) -> None:
+            logger.warning("Archive member %s failed to render", member_name, exc_info=exc)
+            errors.append(f"{member_name}: {str(exc) or type(exc).__name__}")
+
+        def write(archive: zipfile.ZipFile, member_name: str, future: Future[Any] | None) -> None:
+            if future is None:
+                return
+            try:
+                data = pool.result(future)
+            except Exception as exc:
+                failed(member_name, exc)
+            else:
+                archive.writestr(member_name, data)
+
+        try:
+            with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for name, content in members:
+                    member_name = f"{name}.{extension}"
+                    try:
+                        # Archives are long-running downloads: wait for a slot, as jobs do.
+                        future = pool.submit(
+                            render_export,
+                            content,
+                            format_name,
+                            wait=settings.export_render_timeout_seconds,
+                        )
+                    except Exception as exc:
+                        failed(member_name, exc)
+                        future = None
+                    pending.append((member_name, future))
+                    if len(pending) >= window:
+                        write(archive, *pending.popleft())
+                        yield sink.drain()
+                while pending:
+                    write(archive, *pending.popleft())
+                    yield sink.drain()
+                if errors:
+                    archive.writestr(ARCHIVE_ERRORS_MEMBER, "\n".join(errors) + "\n")
+        finally:
+            # An aborted download must not leave renders holding pool slots.
+            for _, future in pending:
+                if future is not None:
+                    future.cancel()
+        yield sink.drain()
+
+    def build_content(self, lesson: Lesson, version: LessonVersion) -> ExportContent:
         standards = [standard.code for standard in version.standards] if version.standards else []
         materials = [
             f"{item.get('label', 'Material')}: {item.get('value', '')}"
@@ -81,13 +201,40 @@ class ExportService:
             differentiation=differentiation,
             assessments=assessments,
             accommodations=accommodations,
+            teacher_script_md=version.teacher_script_md,
         )
 
     def _export_pdf(self, content: ExportContent) -> bytes:
         pdf = FPDF()
         pdf.set_auto_page_break(auto=True, margin=15)
         pdf.add_page()
+        self._write_pdf_lesson(pdf, content)
+        return _pdf_bytes(pdf)
+
+    def render_packet(self, title: str, contents: list[ExportContent]) -> bytes:
+        """Render several lessons as one PDF with a cover, table of contents and page numbers."""
+
+        pdf = _PacketPDF()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.set_title(title)
+        pdf.add_page()
+        pdf.set_font("Helvetica", "B", 24)
+        pdf.ln(60)
+        pdf.multi_cell(0, 12, title, align="C", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.set_font("Helvetica", size=12)
+        pdf.multi_cell(
+            0, 8, f"{len(contents)} lessons", align="C", new_x=XPos.LMARGIN, new_y=YPos.NEXT
+        )
+
+        pdf.add_page()
+        pdf.insert_toc_placeholder(_render_packet_toc, allow_extra_pages=True)
+        for content in contents:
+            pdf.add_page()
+            pdf.start_section(content.title)
+            self._write_pdf_lesson(pdf, content)
+        return _pdf_bytes(pdf)
 
+    def _write_pdf_lesson(self, pdf: FPDF, content: ExportContent) -> None:
         pdf.set_font("Helvetica", "B", 16)
         usable_width = pdf.w - pdf.l_margin - pdf.r_margin
         pdf.multi_cell(
@@ -154,31 +301,25 @@ class ExportService:
         add_section("Assessments", content.assessments)
         add_section("Accommodations", content.accommodations)
 
-        pdf_bytes = pdf.output()
-        if isinstance(pdf_bytes, bytearray):
-            return bytes(pdf_bytes)
-        if isinstance(pdf_bytes, str):
-            return pdf_bytes.encode("latin1", errors="replace")
-        return pdf_bytes
-
     def _export_docx(self, content: ExportContent) -> bytes:
-        document = Document()
-        document.add_heading(content.title, level=1)
-        document.add_paragraph(f"Subject: {content.subject}")
-        document.add_paragraph(f"Grade Level: {content.grade_level}")
+        document, styles = get_docx_template().new_document()
+        add_paragraph = styles.add_paragraph
+        add_paragraph(document, content.title, styles.headings[1])
+        add_paragraph(document, f"Subject: {content.subject}")
+        add_paragraph(document, f"Grade Level: {content.grade_level}")
         if content.duration_minutes:
-            document.add_paragraph(f"Duration: {content.duration_minutes} minutes")
-        document.add_paragraph()
+            add_paragraph(document, f"Duration: {content.duration_minutes} minutes")
+        add_paragraph(document)
 
         def add_section(title: str, values: list[str] | str | None) -> None:
             if not values:
                 return
-            document.add_heading(title, level=2)
+            add_paragraph(document, title, styles.headings[2])
             if isinstance(values, str):
-                document.add_paragraph(values)
+                add_paragraph(document, values)
             else:
                 for entry in values:
-                    document.add_paragraph(entry, style="List Bullet")
+                    add_paragraph(document, entry, styles.list_bullet)
 
         add_section("Objective", content.objective or "")
         add_section("Standards", content.standards)
@@ -192,6 +333,47 @@ class ExportService:
         document.save(buffer)
         return buffer.getvalue()
 
+    def _export_json(self, content: ExportContent) -> bytes:
+        return json.dumps(asdict(content), ensure_ascii=False, indent=2).encode("utf-8")
+
+    def _export_markdown(self, content: ExportContent) -> str:
+        lines = [
+            f"# {content.title}",
+            "",
+            f"**Subject:** {content.subject} (Grade {content.grade_level})",
+        ]
+        if content.duration_minutes:
+            lines.append(f"**Duration:** {content.duration_minutes} minutes")
+
+        def add_section(title: str, values: list[str] | str | None) -> None:
+            if not values:
+                return
+            lines.extend(["", f"## {title}", ""])
+            if isinstance(values, str):
+                lines.append(values)
+            else:
+                lines.extend(f"- {entry}" for entry in values)
+
+        add_section("Objective", content.objective or "")
+        add_section("Standards", content.standards)
+        add_section("Materials", content.materials)
+        add_section("Lesson Flow", content.flow)
+        add_section("Teacher Script", content.teacher_script_md or "")
+        add_section("Differentiation", content.differentiation)
+        add_section("Assessments", content.assessments)
+        add_section("Accommodations", content.accommodations)
+        return "\n".join(lines) + "\n"
+
+    def _export_html(self, content: ExportContent) -> bytes:
+        body = render_markdown(self._export_markdown(content))
+        document = (
+            "<!DOCTYPE html>\n"
+            '<html><head><meta charset="utf-8">'
+            f"<title>{html.escape(content.title)}</title></head>\n"
+            f"<body><article>\n{body}\n</article></body></html>\n"
+        )
+        return document.encode("utf-8")
+
     def _export_gdoc(self, content: ExportContent) -> dict[str, Any]:
         timestamp = datetime.utcnow().isoformat() + "Z"
         return {
@@ -211,3 +393,73 @@ class ExportService:
             "status": "ready",
             "message": "Stubbed Google Docs export. Upload manually to Google Docs interface.",
         }
+
+
+def render_export(content: ExportContent, format_name: str) -> Any:
+    """Module-level render entry point so it can be pickled to worker processes."""
+
+    return ExportService(None).render(content, format_name)
+
+
+def render_packet_export(title: str, contents: list[ExportContent]) -> bytes:
+    """Picklable entry point for rendering a packet in a worker process."""
+
+    return ExportService(None).render_packet(title, contents)
+
+
+def _pdf_bytes(pdf: FPDF) -> bytes:
+    pdf_bytes = pdf.output()
+    if isinstance(pdf_bytes, bytearray):
+        return bytes(pdf_bytes)
+    if isinstance(pdf_bytes, str):
+        return pdf_bytes.encode("latin1", errors="replace")
+    return pdf_bytes
+
+
+class _PacketPDF(FPDF):
+    """FPDF with a page-number footer on every page after the cover."""
+
+    def footer(self) -> None:
+        if self.page_no() == 1:
+            return
+        self.set_y(-12)
+        self.set_font("Helvetica", size=9)
+        self.cell(0, 6, f"Page {self.page_no()} of {{nb}}", align="C")
+
+
+def _render_packet_toc(pdf: FPDF, outline: list[Any]) -> None:
+    pdf.set_font("Helvetica", "B", 16)
+    pdf.cell(0, 12, "Contents", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.set_font("Helvetica", size=12)
+    for section in outline:
+        link = pdf.add_link(page=section.page_number)
+        pdf.cell(pdf.epw - 20, 8, section.name, link=link, new_x=XPos.RIGHT, new_y=YPos.TOP)
+        pdf.cell(
+            20,
+            8,
+            str(section.page_number),
+            align="R",
+            link=link,
+            new_x=XPos.LMARGIN,
+            new_y=YPos.NEXT,
+        )
+
+
+class _ZipStreamSink(io.RawIOBase):
+    """Write-only, unseekable file that lets ``zipfile`` stream into memory chunks."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
@@ -7,15 +7,13 @@ import pathlib
 import uuid
 from dataclasses import asdict, dataclass
 from datetime import datetime
-from typing import Any, Iterable, Sequence
+from typing import Any, Sequence
 
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.models.gen_job import GenerationJob
 from app.models.lesson import Lesson, LessonVersion
-from app.models.standard import Standard
 from app.models.user import User
 from app.services.lesson_service import LessonService
 from app.services.standards_service import StandardsService
@@ -32,6 +30,7 @@ class GenerationInput:
     teaching_style: str
     focus_keywords: list[str]
     standard_codes: list[str] | None = None
+    standard_framework: str | None = None
 
 
 class GenerationService:
@@ -92,8 +91,9 @@ class GenerationService:
                     "source": content.get("source", {}),
                 },
             )
-            self.session.refresh(lesson)
-            version = lesson.versions[-1]
+            version = self.lesson_service.get_current_version(lesson)
+            if version is None:  # pragma: no cover - create_lesson always sets it
+                raise RuntimeError("Generated lesson has no current version")
 
             standards = self._resolve_standards(
                 generation_input, version, content.get("suggested_standards", [])
@@ -242,22 +242,32 @@ class GenerationService:
         self,
         generation_input: GenerationInput,
         version: LessonVersion,
-        generated_codes: Sequence[str],
+        generated_codes: Sequence[Any],
     ) -> list[Any]:
-        standards: list[Any] = []
-        keywords = generation_input.focus_keywords + [generation_input.topic]
-
-        if generation_input.standard_codes:
-            standards.extend(self._fetch_standards_by_codes(generation_input.standard_codes))
-
-        if not standards:
-            standards = self.standards_service.suggest_standards(
-                subject=generation_input.subject,
-                grade_level=generation_input.grade_level,
-                keywords=keywords,
-            )
-        return standards
+        """Align to the user's codes plus the model's suggestions, else to keyword matches.
+
+        Both code lists are resolved together against the cached code map, so
+        only the matched standards are loaded.
+        """
+
+        codes = list(generation_input.standard_codes or [])
+        for suggestion in generated_codes or []:
+            code = suggestion.get("code") if isinstance(suggestion, dict) else suggestion
+            if isinstance(code, str) and code.strip():
+                codes.append(code)
+
+        standard_ids = self.standards_service.resolve_codes(
+            codes,
+            framework=generation_input.standard_framework,
+            subject=generation_input.subject,
+            grade_level=generation_input.grade_level,
+        )
+        if standard_ids:
+            return self.standards_service.get_standards_by_ids(standard_ids)
 
-    def _fetch_standards_by_codes(self, codes: Iterable[str]) -> list[Any]:
-        stmt = select(Standard).where(Standard.code.in_(list(codes)))  # type: ignore[name-defined]
-        return list(self.session.execute(stmt).scalars())
+        keywords = generation_input.focus_keywords + [generation_input.topic]
+        return self.standards_service.suggest_standards(
+            subject=generation_input.subject,
+            grade_level=generation_input.grade_level,
+            keywords=keywords,
+        )
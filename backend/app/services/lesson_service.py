@@ -1,16 +1,24 @@
 """Domain services for managing lessons and versions."""
 from __future__ import annotations
 
+import io
+import json
 import logging
 from dataclasses import dataclass
 from typing import Sequence
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import Select, func, select
-from sqlalchemy.orm import Session
+from sqlalchemy import JSON, Select, Table, func, insert, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
 
+from app.core.etag import make_etag
 from app.models.lesson import Lesson, LessonBlock, LessonVersion
+from app.models.standard import LessonStandard
 from app.models.user import User
+from app.services import version_content
+from app.services.standards_coverage import StandardsCoverageService
+from app.services.standards_hierarchy import subtree_ids
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +30,24 @@ class LessonFilters:
     subject: str | None = None
     grade_level: str | None = None
     tags: Sequence[str] | None = None
+    # Standard code aligned to the current version; a domain or cluster code
+    # also matches lessons aligned to any standard beneath it.
+    standard: str | None = None
+
+
+class LessonLoad:
+    """Loader profiles for each lesson read path.
+
+    Passing the matching profile to :meth:`LessonService.get_lesson` eager loads
+    everything the caller serializes, so no lazy load fires per version. Callers
+    that only act on the current version should not load ``versions`` at all;
+    use :meth:`LessonService.get_current_version` instead.
+    """
+
+    #: ``LessonDetail`` serialization: every version and its blocks.
+    DETAIL: tuple[ORMOption, ...] = (
+        selectinload(Lesson.versions).selectinload(LessonVersion.blocks),
+    )
 
 
 class LessonService:
@@ -43,14 +69,7 @@ class LessonService:
     def list_lessons(self, tenant_id: UUID, filters: LessonFilters | None = None) -> list[Lesson]:
         """Return lessons for a tenant applying optional filters."""
 
-        stmt = self._lesson_select().where(Lesson.tenant_id == tenant_id)
-
-        if filters:
-            if filters.subject:
-                stmt = stmt.where(Lesson.subject == filters.subject)
-            if filters.grade_level:
-                stmt = stmt.where(Lesson.grade_level == filters.grade_level)
-
+        stmt = self._apply_filters(self._lesson_select(), tenant_id, filters)
         results = list(self.session.execute(stmt).scalars())
 
         if filters and filters.tags:
@@ -63,14 +82,112 @@ class LessonService:
 
         return results
 
-    def get_lesson(self, lesson_id: UUID, tenant_id: UUID) -> Lesson:
-        """Fetch a lesson ensuring tenant scope."""
+    def list_current_versions(
+        self, tenant_id: UUID, filters: LessonFilters | None = None
+    ) -> list[tuple[Lesson, LessonVersion]]:
+        """Return filtered lessons paired with their current version, in title order.
+
+        One joined query, one batched standards load and at most one delta
+        chain load for a cold content cache, whatever the count.
+        """
+
+        stmt = self._apply_filters(
+            select(Lesson, LessonVersion)
+            .join(LessonVersion, LessonVersion.id == Lesson.current_version_id)
+            .options(selectinload(LessonVersion.standards))
+            .order_by(Lesson.title, Lesson.id),
+            tenant_id,
+            filters,
+        )
+        rows = [(lesson, version) for lesson, version in self.session.execute(stmt)]
+        if filters and filters.tags:
+            tag_set = {tag.lower() for tag in filters.tags}
+            rows = [
+                (lesson, version)
+                for lesson, version in rows
+                if tag_set.issubset({tag.lower() for tag in lesson.tags})
+            ]
+        version_content.preload_content([version for _, version in rows], self.session)
+        return rows
+
+    def list_etag(self, tenant_id: UUID, filters: LessonFilters | None = None) -> str:
+        """Return a validator for :meth:`list_lessons` without loading any lesson rows.
+
+        Every write to a lesson (including a new or restored version) bumps its
+        ``updated_at``, so the count plus the newest timestamp changes whenever
+        the filtered listing could.
+        """
+
+        stmt = self._apply_filters(
+            select(func.count(Lesson.id), func.max(Lesson.updated_at)), tenant_id, filters
+        )
+        count, last_updated = self.session.execute(stmt).one()
+        tags = sorted(tag.lower() for tag in filters.tags) if filters and filters.tags else []
+        return make_etag(
+            "lessons",
+            tenant_id,
+            filters.subject if filters else None,
+            filters.grade_level if filters else None,
+            ",".join(tags),
+            filters.standard if filters else None,
+            count,
+            last_updated.isoformat() if last_updated else None,
+        )
 
-        lesson = self.session.get(Lesson, lesson_id)
-        if lesson is None or lesson.tenant_id != tenant_id:
+    def detail_etag(self, lesson_id: UUID, tenant_id: UUID) -> str:
+        """Return a validator for a lesson detail using only the lesson row's columns."""
+
+        row = self.session.execute(
+            select(Lesson.current_version_id, Lesson.updated_at).where(
+                Lesson.id == lesson_id, Lesson.tenant_id == tenant_id
+            )
+        ).one_or_none()
+        if row is None:
+            raise LookupError("Lesson not found")
+        current_version_id, updated_at = row
+        return make_etag("lesson", lesson_id, current_version_id, updated_at.isoformat())
+
+    def get_lesson(
+        self,
+        lesson_id: UUID,
+        tenant_id: UUID,
+        options: Sequence[ORMOption] = (),
+    ) -> Lesson:
+        """Fetch a lesson ensuring tenant scope.
+
+        ``options`` should be one of the :class:`LessonLoad` profiles matching what
+        the caller reads from the lesson afterwards.
+        """
+
+        stmt = select(Lesson).where(Lesson.id == lesson_id, Lesson.tenant_id == tenant_id)
+        if options:
+            stmt = stmt.options(*options)
+        lesson = self.session.execute(stmt).scalar_one_or_none()
+        if lesson is None:
             raise LookupError("Lesson not found")
         return lesson
 
+    def get_current_version(self, lesson: Lesson) -> LessonVersion | None:
+        """Fetch the lesson's current version with its standards in one query.
+
+        Looks the row up by ``current_version_id`` (set on create, new version and
+        restore) rather than loading the whole version history.
+        """
+
+        if lesson.current_version_id is None:
+            return None
+        return self.get_version(lesson, lesson.current_version_id)
+
+    def get_version(self, lesson: Lesson, version_id: UUID) -> LessonVersion | None:
+        """Fetch one version of ``lesson`` with its standards, or None if it is not the lesson's."""
+
+        stmt = (
+            select(LessonVersion)
+            .options(joinedload(LessonVersion.standards))
+            .where(LessonVersion.id == version_id, LessonVersion.lesson_id == lesson.id)
+        )
+        return self.session.execute(stmt).unique().scalar_one_or_none()
+
     # ------------------------------------------------------------------
     # Lesson creation & versions
     # ------------------------------------------------------------------
@@ -99,6 +216,7 @@ class LessonService:
             tags=list(tags),
             visibility=visibility,
             status=status,
+            next_version_no=2,
         )
         self.session.add(lesson)
         self.session.flush()
@@ -121,16 +239,23 @@ class LessonService:
         creator: User,
         payload: dict[str, object],
     ) -> LessonVersion:
-        """Create a new immutable version for a lesson."""
+        """Create a new immutable version for a lesson.
+
+        The version number is reserved by :meth:`_allocate_version_number`, which
+        locks the lesson row, so concurrent edits serialize without retries.
+        Standards coverage moves off the replaced version first, under the same lock.
+        """
 
-        next_version = self._next_version_number(lesson.id)
+        version_id = uuid4()
+        StandardsCoverageService(self.session).version_moving(lesson.id, version_id)
+        version_no = self._allocate_version_number(lesson, version_id)
         version = self._build_version(
             lesson=lesson,
             creator=creator,
-            version_no=next_version,
+            version_no=version_no,
             payload=payload,
+            version_id=version_id,
         )
-        lesson.current_version_id = version.id
         status_override = payload.get("status")
         if isinstance(status_override, str) and status_override:
             lesson.status = status_override
@@ -141,16 +266,78 @@ class LessonService:
         )
         return version
 
+    def bulk_create_lessons(
+        self, owner: User, payloads: Sequence[dict[str, object]]
+    ) -> list[UUID]:
+        """Insert lessons with their first version and blocks in batched statements.
+
+        Used by bulk import: ids are generated client-side so lessons, versions
+        and blocks each go out as one multi-row insert (``COPY`` on Postgres)
+        without per-lesson flushes or ORM objects.
+        """
+
+        lesson_rows: list[dict[str, object]] = []
+        version_rows: list[dict[str, object]] = []
+        block_rows: list[dict[str, object]] = []
+        for payload in payloads:
+            lesson_id, version_id = uuid4(), uuid4()
+            lesson_rows.append(
+                {
+                    "id": lesson_id,
+                    "tenant_id": owner.tenant_id,
+                    "owner_user_id": owner.id,
+                    "title": payload["title"],
+                    "subject": payload["subject"],
+                    "grade_level": payload["grade_level"],
+                    "language": payload.get("language") or "en",
+                    "status": payload.get("status") or "draft",
+                    "current_version_id": version_id,
+                    "next_version_no": 2,
+                    "visibility": payload.get("visibility") or "private",
+                    "tags": list(payload.get("tags") or []),
+                    "metadata": {},
+                }
+            )
+            version_rows.append(
+                {
+                    "id": version_id,
+                    "lesson_id": lesson_id,
+                    "version_no": 1,
+                    "objective": payload.get("objective"),
+                    "duration_minutes": payload.get("duration_minutes"),
+                    "teacher_script_md": payload.get("teacher_script_md"),
+                    **{
+                        field: self._ensure_list_of_dicts(payload.get(field))
+                        for field in version_content.LIST_FIELDS
+                    },
+                    "source": dict(payload.get("source") or {}),
+                    "created_by_user_id": owner.id,
+                }
+            )
+            blocks_payload = self._ensure_list_of_dicts(payload.get("blocks"))
+            for index, block in enumerate(blocks_payload, start=1):
+                block_rows.append(
+                    {"id": uuid4(), "lesson_version_id": version_id, **self._block_values(block, index)}
+                )
+
+        self._insert_rows(Lesson.__table__, lesson_rows)
+        self._insert_rows(LessonVersion.__table__, version_rows)
+        self._insert_rows(LessonBlock.__table__, block_rows)
+        return [row["id"] for row in lesson_rows]
+
     def restore_version(self, lesson: Lesson, target_version_no: int) -> LessonVersion:
         """Mark an existing version as the lesson's current version."""
 
-        version = next(
-            (v for v in lesson.versions if v.version_no == target_version_no),
-            None,
-        )
+        version = self.session.execute(
+            select(LessonVersion).where(
+                LessonVersion.lesson_id == lesson.id,
+                LessonVersion.version_no == target_version_no,
+            )
+        ).scalar_one_or_none()
         if version is None:
             raise LookupError("Version not found")
 
+        StandardsCoverageService(self.session).version_moving(lesson.id, version.id)
         lesson.current_version_id = version.id
         self.session.flush()
         return version
@@ -159,13 +346,98 @@ class LessonService:
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _next_version_number(self, lesson_id: UUID) -> int:
-        current_max = self.session.execute(
-            select(func.max(LessonVersion.version_no)).where(LessonVersion.lesson_id == lesson_id)
-        ).scalar_one()
-        if current_max is None:
-            return 1
-        return current_max + 1
+    @staticmethod
+    def _apply_filters(
+        stmt: Select, tenant_id: UUID, filters: LessonFilters | None
+    ) -> Select:
+        stmt = stmt.where(Lesson.tenant_id == tenant_id)
+        if filters:
+            if filters.subject:
+                stmt = stmt.where(Lesson.subject == filters.subject)
+            if filters.grade_level:
+                stmt = stmt.where(Lesson.grade_level == filters.grade_level)
+            if filters.standard:
+                # Walks ix_standards_code -> the closure primary key (code to its
+                # subtree) -> ix_lesson_standards_standard_version ->
+                # ix_lessons_current_version_id; older versions never match.
+                aligned_versions = select(LessonStandard.lesson_version_id).where(
+                    LessonStandard.standard_id.in_(subtree_ids(filters.standard))
+                )
+                stmt = stmt.where(Lesson.current_version_id.in_(aligned_versions))
+        return stmt
+
+    def _allocate_version_number(self, lesson: Lesson, version_id: UUID) -> int:
+        """Reserve the next version number and make ``version_id`` current.
+
+        One ``UPDATE ... RETURNING`` bumps ``next_version_no`` and
+        ``current_version_id`` together. The row lock it takes is held until
+        commit, so a concurrent edit of the same lesson waits and then reads the
+        bumped counter instead of colliding on ``ux_lesson_versions_version_no``.
+        """
+
+        stmt = (
+            update(Lesson)
+            .where(Lesson.id == lesson.id)
+            .values(next_version_no=Lesson.next_version_no + 1, current_version_id=version_id)
+            .returning(Lesson.next_version_no)
+        )
+        return self.session.execute(stmt).scalar_one() - 1
+
+    def _insert_rows(self, table: Table, rows: list[dict[str, object]]) -> None:
+        if not rows:
+            return
+        if self.session.get_bind().dialect.name == "postgresql":
+            self._copy_rows(table, rows)
+        else:
+            self.session.execute(insert(table), rows)
+
+    def _copy_rows(self, table: Table, rows: list[dict[str, object]]) -> None:
+        """Stream rows into ``table`` with ``COPY ... FROM STDIN`` (psycopg2)."""
+
+        columns = list(rows[0])
+        buffer = self._copy_csv(table, columns, rows)
+        column_list = ", ".join(f'"{name}"' for name in columns)
+        cursor = self.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _copy_csv(table: Table, columns: list[str], rows: list[dict[str, object]]) -> io.StringIO:
+        """Serialize ``rows`` for ``COPY ... (FORMAT csv)``.
+
+        In CSV format Postgres reads an unquoted empty field as NULL and a
+        quoted one as an empty string, so ``None`` is written bare and every
+        other value quoted.
+        """
+
+        json_columns = {name for name in columns if isinstance(table.c[name].type, JSON)}
+        buffer = io.StringIO()
+        for row in rows:
+            fields = []
+            for name in columns:
+                value = row[name]
+                if value is None:
+                    fields.append("")
+                    continue
+                text = json.dumps(value) if name in json_columns else str(value)
+                fields.append('"' + text.replace('"', '""') + '"')
+            buffer.write(",".join(fields) + "\n")
+        buffer.seek(0)
+        return buffer
+
+    @staticmethod
+    def _block_values(block: dict[str, object], index: int) -> dict[str, object]:
+        return {
+            "block_type": str(block.get("block_type", "content")),
+            "sequence": block.get("sequence", index),
+            "content_md": str(block.get("content_md", "")),
+            "est_minutes": block.get("est_minutes"),
+            "metadata": dict(block.get("metadata", {})),
+        }
 
     @staticmethod
     def _ensure_list_of_dicts(value: object) -> list[dict[str, object]]:
@@ -191,37 +463,47 @@ class LessonService:
         creator: User | None,
         version_no: int,
         payload: dict[str, object],
+        version_id: UUID | None = None,
     ) -> LessonVersion:
         """Create and persist a LessonVersion entity from payload values."""
 
         version = LessonVersion(
+            id=version_id or uuid4(),
             lesson_id=lesson.id,
             version_no=version_no,
             objective=payload.get("objective"),
             duration_minutes=payload.get("duration_minutes"),
-            teacher_script_md=payload.get("teacher_script_md"),
-            materials=self._ensure_list_of_dicts(payload.get("materials")),
-            flow=self._ensure_list_of_dicts(payload.get("flow")),
-            differentiation=self._ensure_list_of_dicts(payload.get("differentiation")),
-            assessments=self._ensure_list_of_dicts(payload.get("assessments")),
-            accommodations=self._ensure_list_of_dicts(payload.get("accommodations")),
             source=dict(payload.get("source", {})),
             created_by_user_id=creator.id if creator else None,
         )
+        content = {
+            "teacher_script_md": payload.get("teacher_script_md"),
+            **{
+                field: self._ensure_list_of_dicts(payload.get(field))
+                for field in version_content.LIST_FIELDS
+            },
+        }
+        base = None
+        if not version_content.is_snapshot_position(version_no):
+            base = self.session.execute(
+                select(LessonVersion).where(
+                    LessonVersion.lesson_id == lesson.id,
+                    LessonVersion.version_no == version_no - 1,
+                )
+            ).scalar_one_or_none()
+        version_content.encode_version(
+            version, content, base, base.content if base is not None else None
+        )
         version.lesson = lesson
         self.session.add(version)
         self.session.flush()
+        version_content.content_cache.put(version.id, content)
 
         blocks_payload = self._ensure_list_of_dicts(payload.get("blocks"))
         for index, block in enumerate(blocks_payload, start=1):
-            lesson_block = LessonBlock(
-                lesson_version_id=version.id,
-                block_type=str(block.get("block_type", "content")),
-                sequence=block.get("sequence", index),
-                content_md=str(block.get("content_md", "")),
-                est_minutes=block.get("est_minutes"),
-                metadata_json=dict(block.get("metadata", {})),
-            )
+            values = self._block_values(block, index)
+            values["metadata_json"] = values.pop("metadata")
+            lesson_block = LessonBlock(lesson_version_id=version.id, **values)
             self.session.add(lesson_block)
 
         return version
@@ -0,0 +1,123 @@
+"""Small, dependency-free Markdown to HTML renderer for lesson previews.
+
+Covers the subset lesson content uses: ATX headings, paragraphs, ordered and
+unordered lists, fenced code blocks, emphasis, inline code and links. All text
+is HTML-escaped before inline markup is applied, so the output is safe to embed.
+"""
+from __future__ import annotations
+
+import html
+import re
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_UNORDERED = re.compile(r"^\s*[-*+]\s+(.*)$")
+_ORDERED = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+_CODE_SPAN = re.compile(r"`([^`]+)`")
+_STRONG = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+_EMPHASIS = re.compile(r"(?<![\w*])([*_])(?=\S)(.+?)(?<=\S)\1(?![\w*])")
+# Site-relative paths only: "//host" is protocol-relative and would leave the site.
+_LINK = re.compile(r"\[([^\]]+)\]\(((?:https?://|mailto:|/(?!/))[^)\s]+)\)")
+_PLACEHOLDER = re.compile(r"\x00(\d+)\x00")
+
+
+def render_inline(text: str) -> str:
+    """Escape ``text`` and apply inline Markdown markup."""
+
+    # Code spans and links are swapped for placeholders as soon as they are
+    # built, so emphasis never rewrites their contents (an ``_`` in a URL).
+    spans: list[str] = []
+
+    def stash(markup: str) -> str:
+        spans.append(markup)
+        return f"\x00{len(spans) - 1}\x00"
+
+    def restore(text: str) -> str:
+        return _PLACEHOLDER.sub(lambda match: spans[int(match.group(1))], text)
+
+    def emphasize(text: str) -> str:
+        return _EMPHASIS.sub(r"<em>\2</em>", _STRONG.sub(r"<strong>\2</strong>", text))
+
+    def link(match: re.Match[str]) -> str:
+        label = restore(emphasize(match.group(1)))
+        return stash(f'<a href="{match.group(2)}">{label}</a>')
+
+    # NUL never appears in lesson text; dropping it keeps placeholders unforgeable.
+    escaped = html.escape(text.replace("\x00", ""), quote=True)
+    escaped = _CODE_SPAN.sub(lambda match: stash(f"<code>{match.group(1)}</code>"), escaped)
+    escaped = _LINK.sub(link, escaped)
+    return restore(emphasize(escaped))
+
+
+def render_markdown(source: str) -> str:
+    """Render a Markdown document to an HTML fragment."""
+
+    out: list[str] = []
+    paragraph: list[str] = []
+    list_tag: str | None = None
+    code: list[str] | None = None
+
+    def close_paragraph() -> None:
+        if paragraph:
+            out.append(f"<p>{render_inline(' '.join(paragraph))}</p>")
+            paragraph.clear()
+
+    def close_list() -> None:
+        nonlocal list_tag
+        if list_tag:
+            out.append(f"</{list_tag}>")
+            list_tag = None
+
+    for line in source.splitlines():
+        if code is not None:
+            if _FENCE.match(line):
+                out.append(f"<pre><code>{html.escape(chr(10).join(code))}</code></pre>")
+                code = None
+            else:
+                code.append(line)
+            continue
+        if _FENCE.match(line):
+            close_paragraph()
+            close_list()
+            code = []
+            continue
+        if not line.strip():
+            close_paragraph()
+            close_list()
+            continue
+
+        heading = _HEADING.match(line)
+        if heading:
+            close_paragraph()
+            close_list()
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{render_inline(heading.group(2))}</h{level}>")
+            continue
+
+        item = _UNORDERED.match(line)
+        tag = "ul"
+        if item is None:
+            item = _ORDERED.match(line)
+            tag = "ol"
+        if item is not None:
+            close_paragraph()
+            if list_tag != tag:
+                close_list()
+                out.append(f"<{tag}>")
+                list_tag = tag
+            out.append(f"<li>{render_inline(item.group(1))}</li>")
+            continue
+
+        if list_tag and line.startswith((" ", "\t")):
+            # Lazy continuation of the previous list item.
+            out[-1] = out[-1][: -len("</li>")] + " " + render_inline(line.strip()) + "</li>"
+            continue
+        close_list()
+        paragraph.append(line.strip())
+
+    if code is not None:
+        out.append(f"<pre><code>{html.escape(chr(10).join(code))}</code></pre>")
+    close_paragraph()
+    close_list()
+    return "\n".join(out)
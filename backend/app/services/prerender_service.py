@@ -0,0 +1,109 @@
+"""Warm the export render cache for freshly created lesson versions.
+
+Teachers usually export right after generating or differentiating a lesson.
+When ``EXPORT_PRERENDER_ENABLED`` is set, the formats a tenant exports most
+(learned from its ``lesson_exported`` events) are rendered into the export
+cache in the background so the first download is a file send.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from fastapi import BackgroundTasks
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Event, ExportCacheEntry, Lesson, LessonVersion
+from app.services.export_cache import CACHEABLE_FORMATS, ExportCacheService
+from app.services.export_service import ExportService
+from app.services.render_pool import RenderPoolBusy, RenderTimeout, get_render_pool
+
+logger = logging.getLogger(__name__)
+
+
+class PrerenderService:
+    """Chooses formats per tenant and renders them into the export cache."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def preferred_formats(self, tenant_id: uuid.UUID) -> list[str]:
+        """Return the tenant's most exported cacheable formats, most used first."""
+
+        since = datetime.now(timezone.utc) - timedelta(days=settings.export_prerender_lookback_days)
+        format_column = Event.metadata_json["format"].as_string()
+        rows = self.session.execute(
+            select(format_column, func.count())
+            .where(
+                Event.tenant_id == tenant_id,
+                Event.action == "lesson_exported",
+                Event.created_at >= since,
+                format_column.in_(list(CACHEABLE_FORMATS)),
+            )
+            .group_by(format_column)
+            .order_by(func.count().desc(), format_column)
+            .limit(settings.export_prerender_max_formats)
+        ).all()
+        return [format_name for format_name, _ in rows]
+
+    def prerender(self, tenant_id: uuid.UUID, version_id: uuid.UUID) -> list[str]:
+        """Render the tenant's preferred formats for a version; returns formats rendered."""
+
+        formats = self.preferred_formats(tenant_id)
+        if not formats:
+            return []
+        row = self.session.execute(
+            select(Lesson, LessonVersion)
+            .join(LessonVersion, LessonVersion.lesson_id == Lesson.id)
+            .where(LessonVersion.id == version_id, Lesson.tenant_id == tenant_id)
+        ).first()
+        if row is None:
+            return []
+        lesson, version = row
+
+        content = ExportService(self.session).build_content(lesson, version)
+        cache = ExportCacheService(self.session)
+        rendered: list[str] = []
+        for format_name in formats:
+            key = cache.cache_key(version.id, format_name, content)
+            if self.session.get(ExportCacheEntry, key) is not None:
+                continue
+            try:
+                payload = get_render_pool().render(content, format_name)
+            except (RenderPoolBusy, RenderTimeout):
+                # Interactive exports take priority; the click will render on demand.
+                logger.info("Skipping export pre-render for %s: render pool busy", version.id)
+                break
+            cache.put(key, version.id, format_name, payload)
+            self.session.commit()
+            rendered.append(format_name)
+        return rendered
+
+
+def run_prerender(
+    session_factory: Callable[[], Session], tenant_id: uuid.UUID, version_id: uuid.UUID
+) -> None:
+    session = session_factory()
+    try:
+        PrerenderService(session).prerender(tenant_id, version_id)
+    except Exception:  # pragma: no cover - best effort; never surfaces to the user
+        session.rollback()
+        logger.exception("Export pre-render failed for lesson version %s", version_id)
+    finally:
+        session.close()
+
+
+def schedule_prerender(
+    background_tasks: BackgroundTasks,
+    session_factory: Callable[[], Session],
+    tenant_id: uuid.UUID,
+    version_id: uuid.UUID | None,
+) -> None:
+    """Queue a post-response pre-render when the feature is enabled."""
+
+    if settings.export_prerender_enabled and version_id is not None:
+        background_tasks.add_task(run_prerender, session_factory, tenant_id, version_id)
@@ -0,0 +1,252 @@
+"""Process pool that keeps CPU-bound export rendering off the request workers.
+
+fpdf2 and python-docx are pure Python and hold the GIL for the whole render,
+so rendering in the request thread stalls every other request served by the
+same worker. Renders are shipped to a dedicated process pool instead; the
+picklable :class:`~app.services.export_service.ExportContent` is the only
+thing sent across.
+"""
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.config import settings
+from app.services.export_service import ExportContent, render_export
+
+
+class RenderPoolBusy(RuntimeError):
+    """Raised when the render queue is full; callers should retry later."""
+
+
+class RenderTimeout(RuntimeError):
+    """Raised when a render does not finish within the configured timeout."""
+
+
+# Set in each worker by ``_init_worker``: task ids are reported here as they start.
+_started_queue = None
+
+
+def _init_worker(started_queue) -> None:
+    global _started_queue
+    _started_queue = started_queue
+
+
+def _call_reporting_start(task_id: int, fn, *args):
+    _started_queue.put((task_id, time.time()))
+    return fn(*args)
+
+
+class RenderPool:
+    """Bounded front for a lazily started ``ProcessPoolExecutor``.
+
+    At most ``max_workers + max_queue`` renders are admitted at once. A render
+    that times out before a worker picked it up is cancelled or simply runs
+    later. One that times out while executing has hung a worker: the executor
+    is replaced and its processes terminated, so hung renders cannot hold
+    slots forever. Workers report the tasks they start, because the executor
+    marks queued calls as running before any worker takes them.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_queue: int | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        self.max_workers = max_workers or settings.export_render_processes or os.cpu_count() or 1
+        self.max_queue = settings.export_render_queue_depth if max_queue is None else max_queue
+        self.timeout = timeout or settings.export_render_timeout_seconds
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._executor: ProcessPoolExecutor | None = None
+        self._started_queue = None
+        # Task id -> wall-clock start, for tasks a worker has picked up.
+        self._started: dict[int, float] = {}
+        # Task id -> (future, timeout) for renders whose caller gave up waiting.
+        self._abandoned: dict[int, tuple[Future, float]] = {}
+        self._task_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # "spawn" avoids forking a process that is running server threads.
+                context = multiprocessing.get_context("spawn")
+                self._started_queue = context.SimpleQueue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self._started_queue,),
+                )
+            return self._executor
+
+    def submit(self, fn, *args, wait: float | None = None) -> Future:
+        """Queue ``fn(*args)`` on the pool, raising :class:`RenderPoolBusy` when full.
+
+        Interactive callers fail fast; background jobs may ``wait`` up to that
+        many seconds for a free slot.
+        """
+
+        if self._abandoned:
+            self._recycle_if_hung()
+        admitted = (
+            self._slots.acquire(timeout=wait) if wait else self._slots.acquire(blocking=False)
+        )
+        if not admitted:
+            raise RenderPoolBusy("Export render queue is full")
+        task_id = next(self._task_ids)
+        try:
+            future = self._get_executor().submit(_call_reporting_start, task_id, fn, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._reset()
+            raise RenderPoolBusy("Export render pool is restarting") from None
+        except BaseException:
+            self._slots.release()
+            raise
+        future.task_id = task_id
+
+        def finished(_: Future) -> None:
+            self._slots.release()
+            self._started.pop(task_id, None)
+            self._abandoned.pop(task_id, None)
+
+        future.add_done_callback(finished)
+        return future
+
+    def render(self, content: ExportContent, format_name: str) -> bytes:
+        """Render ``content`` in a worker process and wait for the result."""
+
+        return self.run(render_export, content, format_name)
+
+    def run(
+        self,
+        fn,
+        *args,
+        timeout: float | None = None,
+        wait: float | None = None,
+        heartbeat: Callable[[], None] | None = None,
+        heartbeat_interval: float = 10.0,
+    ):
+        """Run ``fn(*args)`` in a worker process and wait for its result."""
+
+        future = self.submit(fn, *args, wait=wait)
+        return self.result(
+            future, timeout=timeout, heartbeat=heartbeat, heartbeat_interval=heartbeat_interval
+        )
+
+    def result(
+        self,
+        future: Future,
+        timeout: float | None = None,
+        heartbeat: Callable[[], None] | None = None,
+        heartbeat_interval: float = 10.0,
+    ):
+        """Wait for a submitted render, enforcing ``timeout``.
+
+        Long waits can call ``heartbeat`` every ``heartbeat_interval`` seconds
+        so callers can show they are still alive while the worker renders.
+        """
+
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                step = remaining if heartbeat is None else min(remaining, heartbeat_interval)
+                try:
+                    return future.result(timeout=max(step, 0))
+                except FutureTimeoutError:
+                    if time.monotonic() >= deadline:
+                        raise
+                    heartbeat()
+        except FutureTimeoutError:
+            if not future.cancel():
+                self._abandoned[future.task_id] = (future, timeout)
+                self._recycle_if_hung()
+            raise RenderTimeout(f"Export render exceeded {timeout:g}s") from None
+        except BrokenProcessPool:
+            self._reset()
+            raise RenderPoolBusy("Export render pool is restarting") from None
+
+    def _recycle_if_hung(self) -> None:
+        """Recycle the executor if an abandoned render has run past its timeout.
+
+        Abandoned renders that have not started yet, or started too recently to
+        have used up their timeout, are left to finish on their own.
+        """
+
+        now = time.time()
+        with self._lock:
+            queue = self._started_queue
+            if queue is not None:
+                while not queue.empty():
+                    task_id, started_at = queue.get()
+                    self._started[task_id] = started_at
+            hung = any(
+                not future.done()
+                and task_id in self._started
+                and now - self._started[task_id] >= timeout
+                for task_id, (future, timeout) in list(self._abandoned.items())
+            )
+        if hung:
+            self._recycle()
+
+    def _recycle(self) -> None:
+        """Replace the executor and terminate its workers after a render hangs.
+
+        Other renders on the old executor fail as a broken pool, which releases
+        their slots; the next submit starts fresh workers.
+        """
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._abandoned.clear()
+        if executor is None:
+            return
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def _reset(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_render_pool: RenderPool | None = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> RenderPool:
+    """Return the process-wide render pool, creating it on first use."""
+
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = RenderPool()
+        return _render_pool
+
+
+def shutdown_render_pool() -> None:
+    global _render_pool
+    with _render_pool_lock:
+        pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown()
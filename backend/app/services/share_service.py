@@ -7,9 +7,9 @@ import uuid
 from datetime import datetime, timedelta
 
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.models import Share
+from app.models import LessonVersion, Share
 
 
 class ShareService:
@@ -44,7 +44,11 @@ class ShareService:
         return share
 
     def get_share(self, token: str) -> Share:
-        stmt = select(Share).where(Share.token == token)
+        stmt = (
+            select(Share)
+            .options(joinedload(Share.lesson_version).selectinload(LessonVersion.blocks))
+            .where(Share.token == token)
+        )
         share = self.session.execute(stmt).scalar_one_or_none()
         if share is None:
             raise ValueError("Share not found")
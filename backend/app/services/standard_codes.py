@@ -0,0 +1,196 @@
+"""Process-wide resolver from standard codes to standard ids.
+
+Codes reach us from users and from the model in many spellings: ``5-LS2-1``,
+``5.ls2.1``, ``NGSS 5-LS2-1`` or ``CCSS.MATH.CONTENT.6.RP.A.1`` for a stored
+``6.RP.A.1``. Codes are compared by their alphanumeric segments, so case and
+punctuation do not matter, and a code also answers to its trailing segments
+(at least :data:`MIN_ALIAS_SEGMENTS`) so framework prefixes can be dropped on
+either side. Exact matches always win over such aliases. A suffix can drop
+the grade (``EE.A.1`` is in both ``6.EE.A.1`` and ``8.EE.A.1``), so ties are
+broken by subject and then by grade, and an alias that is still ambiguous
+resolves to nothing rather than to an arbitrary standard.
+
+The map is loaded on first use and reloaded when :func:`catalog_version`
+moves or the standards index TTL passes, like the standards index itself.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Sequence
+from typing import NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.standard import Standard, StandardsFramework
+from app.services.standards_index import catalog_version
+
+_SEPARATOR = re.compile(r"[^0-9A-Z]+")
+MIN_ALIAS_SEGMENTS = 3
+GRADE_ORDER = ["PK", "K", *(str(grade) for grade in range(1, 13))]
+
+
+def code_keys(code: str) -> list[str]:
+    """Return the lookup keys for ``code``: the full normalized code, then its suffixes."""
+
+    segments = [segment for segment in _SEPARATOR.split(code.upper()) if segment]
+    # Joined with a separator so RL.1.10 and RL.11.0 stay distinct.
+    keys = [".".join(segments)] if segments else []
+    for start in range(1, len(segments) - MIN_ALIAS_SEGMENTS + 1):
+        keys.append(".".join(segments[start:]))
+    return keys
+
+
+def grade_in_band(grade_level: str, grade_band: str | None) -> bool:
+    """Whether ``grade_level`` (``6``, ``K``) falls in a band like ``6``, ``6-8`` or ``K-2``."""
+
+    if not grade_band:
+        return False
+    grade = grade_level.strip().upper()
+    grade = str(int(grade)) if grade.isdigit() else grade
+    low, _, high = grade_band.strip().upper().partition("-")
+    if not high:
+        return grade == low
+    if grade not in GRADE_ORDER or low not in GRADE_ORDER or high not in GRADE_ORDER:
+        return False
+    return GRADE_ORDER.index(low) <= GRADE_ORDER.index(grade) <= GRADE_ORDER.index(high)
+
+
+class _Entry(NamedTuple):
+    standard_id: uuid.UUID
+    framework_id: uuid.UUID
+    subject: str
+    grade_band: str | None
+
+
+class StandardCodeMap:
+    """Immutable normalized-code lookup, partitioned by framework."""
+
+    def __init__(
+        self, rows: Iterable[tuple[uuid.UUID, uuid.UUID, str, str, str, str | None]]
+    ) -> None:
+        # Rows are (standard id, framework id, framework code, code, subject, grade band).
+        self._frameworks: dict[str, set[uuid.UUID]] = defaultdict(set)
+        self._exact: dict[str, list[_Entry]] = defaultdict(list)
+        self._alias: dict[str, list[_Entry]] = defaultdict(list)
+        for standard_id, framework_id, framework_code, code, subject, grade_band in sorted(
+            rows, key=lambda row: (row[3], str(row[0]))
+        ):
+            self._frameworks[framework_code.upper()].add(framework_id)
+            entry = _Entry(standard_id, framework_id, subject.lower(), grade_band)
+            keys = code_keys(code)
+            if not keys:
+                continue
+            self._exact[keys[0]].append(entry)
+            for key in keys[1:]:
+                self._alias[key].append(entry)
+
+    @classmethod
+    def from_session(cls, session: Session) -> StandardCodeMap:
+        rows = session.execute(
+            select(
+                Standard.id,
+                Standard.framework_id,
+                StandardsFramework.code,
+                Standard.code,
+                Standard.subject,
+                Standard.grade_band,
+            ).join(StandardsFramework, StandardsFramework.id == Standard.framework_id)
+        ).all()
+        return cls(rows)
+
+    def resolve(
+        self,
+        codes: Sequence[str],
+        framework: str | None = None,
+        subject: str | None = None,
+        grade_level: str | None = None,
+    ) -> list[uuid.UUID]:
+        """Map ``codes`` to standard ids in order, dropping unknown codes and repeats.
+
+        ``framework`` (a framework code) restricts matches to that framework;
+        ``subject`` and then ``grade_level`` break ties between matches.
+        Aliases that stay ambiguous are dropped.
+        """
+
+        framework_ids = (
+            None if framework is None else self._frameworks.get(framework.upper(), set())
+        )
+        subject = subject.lower() if subject else None
+        resolved: list[uuid.UUID] = []
+        for code in codes:
+            standard_id = self._resolve_one(code, framework_ids, subject, grade_level)
+            if standard_id is not None and standard_id not in resolved:
+                resolved.append(standard_id)
+        return resolved
+
+    def _resolve_one(
+        self,
+        code: str,
+        framework_ids: set[uuid.UUID] | None,
+        subject: str | None,
+        grade_level: str | None,
+    ) -> uuid.UUID | None:
+        keys = code_keys(code)
+        for table in (self._exact, self._alias):
+            for key in keys:
+                entries = [
+                    entry
+                    for entry in table.get(key, ())
+                    if framework_ids is None or entry.framework_id in framework_ids
+                ]
+                if not entries:
+                    continue
+                entries = _narrow(entries, lambda e: e.subject == subject)
+                if grade_level:
+                    entries = _narrow(entries, lambda e: grade_in_band(grade_level, e.grade_band))
+                if len(entries) == 1 or table is self._exact:
+                    return entries[0].standard_id
+                return None
+        return None
+
+
+def _narrow(entries: list[_Entry], keep: Callable[[_Entry], bool]) -> list[_Entry]:
+    """Keep the entries matching ``keep``, or all of them if none match."""
+
+    return [entry for entry in entries if keep(entry)] or entries
+
+
+_code_map: StandardCodeMap | None = None
+_code_map_version = -1
+_code_map_loaded_at = 0.0
+_code_map_lock = threading.Lock()
+
+
+def _is_fresh(version: int) -> bool:
+    return (
+        _code_map is not None
+        and _code_map_version == version
+        and time.monotonic() - _code_map_loaded_at < settings.standards_index_ttl_seconds
+    )
+
+
+def get_standard_code_map(session: Session) -> StandardCodeMap:
+    """Return the process-wide code map, reloading it if the catalog changed or it aged out."""
+
+    global _code_map, _code_map_version, _code_map_loaded_at
+    version = catalog_version()
+    if _is_fresh(version):
+        return _code_map  # type: ignore[return-value]
+    with _code_map_lock:
+        if not _is_fresh(version):
+            _code_map = StandardCodeMap.from_session(session)
+            _code_map_version = version
+            _code_map_loaded_at = time.monotonic()
+        return _code_map  # type: ignore[return-value]
+
+
+def invalidate_standard_code_map() -> None:
+    global _code_map
+    with _code_map_lock:
+        _code_map = None
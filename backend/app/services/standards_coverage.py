@@ -0,0 +1,317 @@
+"""Incrementally maintained standards coverage counts.
+
+``standards_coverage`` holds, per tenant, standard and lesson grade, how many
+lessons have the standard aligned to their current version. Reports read that
+table instead of joining lessons, versions, links and standards per request.
+
+Counts are adjusted with ``INSERT ... SELECT ... ON CONFLICT DO UPDATE`` at
+the places coverage can change: links being added to a version
+(:meth:`StandardsCoverageService.links_added`), a lesson's
+``current_version_id`` moving (:meth:`StandardsCoverageService.version_moving`),
+a lesson's ``grade_level`` changing
+(:meth:`StandardsCoverageService.grade_changing`, called from a
+``before_flush`` listener for ORM updates) and lessons, versions or owners
+being deleted, whose links the database then removes by cascade. Deletes
+reach :meth:`StandardsCoverageService.lessons_removing` both from
+``session.delete`` (the ``before_flush`` listener) and from bulk
+``delete()`` statements run through a session (a ``do_orm_execute``
+listener). All of them join through the lesson row, so links on versions
+that are not current count for nothing. Bulk ``update()`` statements and
+writes on a raw connection bypass the listeners and must call the service
+themselves.
+:meth:`StandardsCoverageService.rebuild` recomputes the table from scratch to
+repair drift (see ``app.scripts.rebuild_standards_coverage``).
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    and_,
+    delete,
+    event,
+    func,
+    inspect,
+    literal,
+    or_,
+    select,
+)
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.db.dialect import upsert
+from app.models.lesson import Lesson, LessonVersion
+from app.models.metrics import StandardsCoverage
+from app.models.standard import LessonStandard, Standard
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = ["tenant_id", "standard_id", "grade_level", "lesson_count"]
+
+
+@dataclass(slots=True)
+class StandardCoverageCount:
+    standard_id: uuid.UUID
+    code: str
+    grade_band: str | None
+    description: str
+    lesson_count: int = 0
+    by_grade: dict[str, int] = field(default_factory=dict)
+
+
+class StandardsCoverageService:
+    """Maintains and reads the per-tenant standards coverage summary."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+
+    def links_added(self, lesson_version_id: uuid.UUID, standard_ids: Sequence[uuid.UUID]) -> None:
+        """Count links about to be inserted on ``lesson_version_id``.
+
+        Call before inserting, in the transaction that inserts: standards
+        already linked to the version are not counted again, and nothing is
+        counted unless the version is some lesson's current version. The
+        lesson row stays locked until commit.
+        """
+
+        if not standard_ids:
+            return
+        # Lock the owning lesson so concurrent aligns of this version (and moves of
+        # the lesson) wait for this transaction's links before they count theirs.
+        self.session.execute(
+            select(Lesson.id)
+            .where(
+                Lesson.id
+                == select(LessonVersion.lesson_id)
+                .where(LessonVersion.id == lesson_version_id)
+                .scalar_subquery()
+            )
+            .with_for_update()
+        )
+        already_linked = select(LessonStandard.standard_id).where(
+            LessonStandard.lesson_version_id == lesson_version_id
+        )
+        self._apply(
+            select(Lesson.tenant_id, Standard.id, Lesson.grade_level, literal(1))
+            .select_from(Lesson)
+            .join(
+                Standard,
+                and_(Standard.id.in_(standard_ids), Standard.id.not_in(already_linked)),
+            )
+            .where(Lesson.current_version_id == lesson_version_id)
+        )
+
+    def version_moving(self, lesson_id: uuid.UUID, version_id: uuid.UUID) -> None:
+        """Move a lesson's counts from its current version to ``version_id``.
+
+        Call before pointing ``current_version_id`` at ``version_id``. The
+        lesson row is locked first (``SELECT ... FOR UPDATE`` on Postgres), so
+        concurrent moves of the same lesson apply one after the other.
+        """
+
+        previous_id = self.session.execute(
+            select(Lesson.current_version_id).where(Lesson.id == lesson_id).with_for_update()
+        ).scalar_one()
+        if previous_id == version_id:
+            return
+        if previous_id is not None:
+            self._apply(self._version_links(lesson_id, previous_id, version_id, -1))
+        self._apply(self._version_links(lesson_id, version_id, previous_id, 1))
+
+    def grade_changing(self, lesson_id: uuid.UUID, grade_level: str) -> None:
+        """Move a lesson's counts from its stored grade to ``grade_level``.
+
+        Call before writing the new grade. The lesson row is locked first, as
+        in :meth:`version_moving`.
+        """
+
+        previous = self.session.execute(
+            select(Lesson.grade_level).where(Lesson.id == lesson_id).with_for_update()
+        ).scalar_one_or_none()
+        if previous is None or previous == grade_level:
+            return
+        self.lessons_removing(Lesson.id == lesson_id)
+        self._apply(
+            select(Lesson.tenant_id, LessonStandard.standard_id, literal(grade_level), literal(1))
+            .join(LessonStandard, LessonStandard.lesson_version_id == Lesson.current_version_id)
+            .where(Lesson.id == lesson_id)
+        )
+
+    @staticmethod
+    def _version_links(
+        lesson_id: uuid.UUID,
+        version_id: uuid.UUID,
+        other_version_id: uuid.UUID | None,
+        delta: int,
+    ) -> Select:
+        """Select ``delta`` for standards on ``version_id`` but not on ``other_version_id``."""
+
+        stmt = (
+            select(Lesson.tenant_id, LessonStandard.standard_id, Lesson.grade_level, literal(delta))
+            .select_from(LessonStandard)
+            .join(Lesson, Lesson.id == lesson_id)
+            .where(LessonStandard.lesson_version_id == version_id)
+        )
+        if other_version_id is not None:
+            stmt = stmt.where(
+                LessonStandard.standard_id.not_in(
+                    select(LessonStandard.standard_id).where(
+                        LessonStandard.lesson_version_id == other_version_id
+                    )
+                )
+            )
+        return stmt
+
+    def lessons_removing(self, *criteria: ColumnElement[bool]) -> None:
+        """Uncount the current versions of lessons matching ``criteria``.
+
+        Call before deleting the lessons, or anything their current version's
+        links cascade from.
+        """
+
+        self._apply(
+            select(Lesson.tenant_id, LessonStandard.standard_id, Lesson.grade_level, literal(-1))
+            .join(LessonStandard, LessonStandard.lesson_version_id == Lesson.current_version_id)
+            .where(*criteria)
+        )
+
+    def _apply(self, rows: Select) -> None:
+        self.session.execute(
+            upsert(
+                self.session,
+                StandardsCoverage,
+                index_elements=("tenant_id", "standard_id", "grade_level"),
+                increment_columns=("lesson_count",),
+            ).from_select(_COLUMNS, rows)
+        )
+
+    def rebuild(self, tenant_id: uuid.UUID | None = None) -> int:
+        """Recompute the summary from lessons and links; returns the rows written."""
+
+        cleared = delete(StandardsCoverage)
+        counts = (
+            select(
+                Lesson.tenant_id,
+                LessonStandard.standard_id,
+                Lesson.grade_level,
+                func.count(),
+            )
+            .join(LessonStandard, LessonStandard.lesson_version_id == Lesson.current_version_id)
+            .group_by(Lesson.tenant_id, LessonStandard.standard_id, Lesson.grade_level)
+        )
+        if tenant_id is not None:
+            cleared = cleared.where(StandardsCoverage.tenant_id == tenant_id)
+            counts = counts.where(Lesson.tenant_id == tenant_id)
+        self.session.execute(cleared)
+        written = self.session.execute(
+            StandardsCoverage.__table__.insert().from_select(_COLUMNS, counts)
+        ).rowcount
+        logger.info("Rebuilt standards coverage (%s rows)", written)
+        return written
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def report(
+        self,
+        tenant_id: uuid.UUID,
+        framework_id: uuid.UUID,
+        grade_level: str | None = None,
+    ) -> list[StandardCoverageCount]:
+        """Lesson counts per standard of a framework, split by lesson grade.
+
+        One query over the framework's standards left-joined to the summary
+        by its primary key; uncovered standards come back with zero counts.
+        """
+
+        summary_join = and_(
+            StandardsCoverage.tenant_id == tenant_id,
+            StandardsCoverage.standard_id == Standard.id,
+            StandardsCoverage.lesson_count > 0,
+        )
+        if grade_level is not None:
+            summary_join = and_(summary_join, StandardsCoverage.grade_level == grade_level)
+        rows = self.session.execute(
+            select(
+                Standard.id,
+                Standard.code,
+                Standard.grade_band,
+                Standard.description,
+                StandardsCoverage.grade_level,
+                StandardsCoverage.lesson_count,
+            )
+            .outerjoin(StandardsCoverage, summary_join)
+            .where(Standard.framework_id == framework_id)
+            .order_by(Standard.code, StandardsCoverage.grade_level)
+        )
+        report: dict[uuid.UUID, StandardCoverageCount] = {}
+        for standard_id, code, grade_band, description, grade, count in rows:
+            entry = report.get(standard_id)
+            if entry is None:
+                entry = report[standard_id] = StandardCoverageCount(
+                    standard_id, code, grade_band, description
+                )
+            if grade is not None:
+                entry.by_grade[grade] = count
+                entry.lesson_count += count
+        return list(report.values())
+
+
+@event.listens_for(Session, "before_flush")
+def _uncount_deleted_lessons(session: Session, _flush_context, _instances) -> None:
+    lesson_ids: list[uuid.UUID] = []
+    version_ids: list[uuid.UUID] = []
+    owner_ids: list[uuid.UUID] = []
+    for obj in session.deleted:
+        if isinstance(obj, Lesson):
+            lesson_ids.append(obj.id)
+        elif isinstance(obj, LessonVersion):
+            version_ids.append(obj.id)
+        elif isinstance(obj, User):
+            owner_ids.append(obj.id)
+    service = StandardsCoverageService(session)
+    for obj in session.dirty:
+        if (
+            isinstance(obj, Lesson)
+            and obj.id not in lesson_ids
+            and inspect(obj).attrs.grade_level.history.has_changes()
+        ):
+            service.grade_changing(obj.id, obj.grade_level)
+    criteria = []
+    if lesson_ids:
+        criteria.append(Lesson.id.in_(lesson_ids))
+    if version_ids:
+        criteria.append(Lesson.current_version_id.in_(version_ids))
+    if owner_ids:
+        criteria.append(Lesson.owner_user_id.in_(owner_ids))
+    if criteria:
+        # One statement over the lessons, so a lesson reached several ways counts once.
+        service.lessons_removing(or_(*criteria))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _uncount_bulk_deletes(state: ORMExecuteState) -> None:
+    if not state.is_delete:
+        return
+    # ORM statements carry an annotated copy of the table, so compare by name.
+    table = state.statement.table.name
+    where = [state.statement.whereclause] if state.statement.whereclause is not None else []
+    if table == Lesson.__tablename__:
+        criteria = where
+    elif table == LessonVersion.__tablename__:
+        criteria = [Lesson.current_version_id.in_(select(LessonVersion.id).where(*where))]
+    elif table == User.__tablename__:
+        criteria = [Lesson.owner_user_id.in_(select(User.id).where(*where))]
+    else:
+        return
+    StandardsCoverageService(state.session).lessons_removing(*criteria)
@@ -0,0 +1,214 @@
+"""Maintenance of the standards hierarchy closure table.
+
+Standards point at their domain or cluster through ``Standard.parent_id``;
+``standard_closure`` stores every (ancestor, descendant, depth) pair, each
+standard included as its own ancestor at depth 0. Queries that expand a code
+to its whole subtree then need one indexed join instead of a recursive walk.
+
+ORM flushes maintain the closure incrementally: an inserted standard copies
+its parent's ancestor rows, a re-parented one has only its own subtree's paths
+replaced, and a deleted one has the paths through it removed. Bulk importers
+and ``app.scripts.rebuild_standards_closure`` instead call
+:func:`rebuild_closure`, which recomputes whole frameworks with a single
+recursive ``INSERT ... SELECT``.
+"""
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterable
+
+from sqlalchemy import Select, delete, event, func, insert, inspect, literal, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from app.models.standard import Standard, StandardClosure
+
+# Deeper chains are cut off; this also bounds the walk should parents form a cycle.
+MAX_HIERARCHY_DEPTH = 16
+
+
+def rebuild_closure(session: Session, framework_ids: Iterable[uuid.UUID]) -> None:
+    """Recompute the closure rows of every standard in ``framework_ids``."""
+
+    framework_ids = list(dict.fromkeys(framework_ids))
+    if not framework_ids:
+        return
+    members = select(Standard.id).where(Standard.framework_id.in_(framework_ids))
+    connection = session.connection()
+    connection.execute(
+        delete(StandardClosure).where(
+            or_(
+                StandardClosure.descendant_id.in_(members),
+                StandardClosure.ancestor_id.in_(members),
+            )
+        )
+    )
+
+    tree = (
+        select(
+            Standard.id.label("ancestor_id"),
+            Standard.id.label("descendant_id"),
+            literal(0).label("depth"),
+        )
+        .where(Standard.framework_id.in_(framework_ids))
+        .cte("tree", recursive=True)
+    )
+    child = aliased(Standard)
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, child.id, tree.c.depth + 1)
+        .join(child, child.parent_id == tree.c.descendant_id)
+        .where(tree.c.depth < MAX_HIERARCHY_DEPTH)
+    )
+    connection.execute(
+        insert(StandardClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            # A cycle revisits pairs at greater depths; keep the shortest path.
+            select(tree.c.ancestor_id, tree.c.descendant_id, func.min(tree.c.depth)).group_by(
+                tree.c.ancestor_id, tree.c.descendant_id
+            ),
+        )
+    )
+
+
+def subtree_ids(code: str, framework_id: uuid.UUID | None = None) -> Select:
+    """Select the ids of every standard coded ``code`` and of all their descendants."""
+
+    root = aliased(Standard)
+    stmt = (
+        select(StandardClosure.descendant_id)
+        .join(root, root.id == StandardClosure.ancestor_id)
+        .where(root.code == code)
+    )
+    if framework_id is not None:
+        stmt = stmt.where(root.framework_id == framework_id)
+    return stmt
+
+
+def _subtree(root_id: uuid.UUID) -> Select:
+    return select(StandardClosure.descendant_id).where(StandardClosure.ancestor_id == root_id)
+
+
+def _detach_subtree(connection, root_id: uuid.UUID) -> None:
+    """Delete the paths that lead into ``root_id``'s subtree from outside it."""
+
+    # Materialized first: some databases refuse a DELETE that reads its own table.
+    subtree = list(connection.execute(_subtree(root_id)).scalars())
+    connection.execute(
+        delete(StandardClosure).where(
+            StandardClosure.descendant_id.in_(subtree),
+            StandardClosure.ancestor_id.not_in(subtree),
+        )
+    )
+
+
+def _attach_subtree(connection, root_id: uuid.UUID, parent_id: uuid.UUID) -> None:
+    """Add paths from ``parent_id`` and its ancestors to ``root_id``'s subtree."""
+
+    above = aliased(StandardClosure)
+    below = aliased(StandardClosure)
+    depth = above.depth + below.depth + 1
+    connection.execute(
+        insert(StandardClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(above.ancestor_id, below.descendant_id, depth)
+            .join(below, below.ancestor_id == root_id)
+            .where(above.descendant_id == parent_id, depth <= MAX_HIERARCHY_DEPTH),
+        )
+    )
+
+
+def _insert_node(connection, standard_id: uuid.UUID, parent_id: uuid.UUID | None) -> None:
+    connection.execute(
+        insert(StandardClosure).values(ancestor_id=standard_id, descendant_id=standard_id, depth=0)
+    )
+    if parent_id is not None:
+        _attach_subtree(connection, standard_id, parent_id)
+
+
+def _moves_into_own_subtree(connection, standard_id: uuid.UUID, parent_id: uuid.UUID) -> bool:
+    return (
+        connection.execute(
+            select(StandardClosure.depth).where(
+                StandardClosure.ancestor_id == standard_id,
+                StandardClosure.descendant_id == parent_id,
+            )
+        ).first()
+        is not None
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _detach_deleted(session: Session, _flush_context, _instances) -> None:
+    # Before the delete: on cascading databases the closure rows that tell us
+    # the subtree disappear with the standard. Children become roots (the
+    # parent_id foreign key is SET NULL) and keep their own subtrees.
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Standard)]
+    if not deleted:
+        return
+    connection = session.connection()
+    for standard_id in deleted:
+        _detach_subtree(connection, standard_id)
+    connection.execute(
+        delete(StandardClosure).where(
+            or_(
+                StandardClosure.ancestor_id.in_(deleted),
+                StandardClosure.descendant_id.in_(deleted),
+            )
+        )
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_closure(session: Session, _flush_context) -> None:
+    """Apply this flush's inserts and re-parents to the closure, path by path.
+
+    Inserted standards get their self row plus one row per ancestor of their
+    parent; a re-parented standard has its subtree detached and re-attached
+    under the new parent. Only a framework change, or a move that would form a
+    cycle, falls back to rebuilding the affected frameworks.
+    """
+
+    connection = session.connection()
+    rebuild: list[uuid.UUID] = []
+
+    # Parents before children, so a new child finds its new parent's rows.
+    pending = [obj for obj in session.new if isinstance(obj, Standard)]
+    inserted: set[uuid.UUID] = set()
+    new_ids = {obj.id for obj in pending}
+    while pending:
+        ready = [
+            obj
+            for obj in pending
+            if obj.parent_id not in new_ids or obj.parent_id in inserted
+        ]
+        if not ready:  # new standards parented on each other in a cycle
+            rebuild.extend(obj.framework_id for obj in pending)
+            break
+        for obj in ready:
+            _insert_node(connection, obj.id, obj.parent_id)
+            inserted.add(obj.id)
+        pending = [obj for obj in pending if obj.id not in inserted]
+
+    for obj in session.dirty:
+        if not isinstance(obj, Standard):
+            continue
+        state = inspect(obj)
+        framework_history = state.attrs.framework_id.history
+        if framework_history.has_changes():
+            rebuild.extend(
+                value
+                for value in (obj.framework_id, *framework_history.deleted)
+                if value is not None
+            )
+            continue
+        if not state.attrs.parent_id.history.has_changes():
+            continue
+        if obj.parent_id is not None and _moves_into_own_subtree(
+            connection, obj.id, obj.parent_id
+        ):
+            rebuild.append(obj.framework_id)
+            continue
+        _detach_subtree(connection, obj.id)
+        if obj.parent_id is not None:
+            _attach_subtree(connection, obj.id, obj.parent_id)
+
+    rebuild_closure(session, rebuild)
@@ -0,0 +1,471 @@
+"""Bulk import of standards frameworks from CSV or CASE-JSON files.
+
+Rows are read lazily and written in batches with a single ``INSERT ... ON
+CONFLICT (framework_id, code) DO UPDATE`` per batch, so a framework with
+thousands of standards costs a handful of statements instead of one round trip
+per row. Each batch is diffed against the stored rows first; unchanged
+standards are not rewritten and the differences are reported back.
+
+Parents (domains, clusters) may appear anywhere in a file, so parent links are
+resolved by code in one pass after the last batch, and the hierarchy closure
+is rebuilt once.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, TextIO
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.dialect import upsert
+from app.models.standard import Standard
+from app.services.standard_codes import GRADE_ORDER
+from app.services.standards_hierarchy import rebuild_closure
+from app.services.standards_index import bump_catalog_version, rebuild_standards_index
+from app.services.standards_service import StandardsService
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "case")
+# Fields compared to decide whether an existing standard changed.
+STANDARD_FIELDS = ("subject", "grade_band", "description", "tags")
+# Only the first errors and changes are echoed back so large imports keep small reports.
+MAX_REPORTED_IMPORT_ROWS = 1000
+
+
+class StandardsImportError(ValueError):
+    """Raised when an import file cannot be read at all (bad header, not CASE)."""
+
+
+@dataclass(slots=True)
+class StandardRecord:
+    """One standard parsed from an import file; ``line`` locates it for error reports."""
+
+    line: int
+    code: str
+    subject: str
+    grade_band: str | None
+    description: str
+    tags: list[str] = field(default_factory=list)
+    # Code of the parent standard; "" for a top-level standard, None when the
+    # file carries no hierarchy and stored parent links should be left alone.
+    parent_code: str | None = None
+
+    def values(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in STANDARD_FIELDS}
+
+
+@dataclass(slots=True)
+class RowError:
+    line: int
+    error: str
+
+
+@dataclass(slots=True)
+class FrameworkSpec:
+    code: str
+    name: str
+    jurisdiction: str | None = None
+
+
+@dataclass(slots=True)
+class StandardChange:
+    code: str
+    action: str  # "created" or "updated"
+    fields: list[str] = field(default_factory=list)
+
+
+@dataclass
+class StandardsImportResult:
+    framework_id: uuid.UUID | None = None
+    framework_code: str = ""
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0  # repeated codes; the first occurrence wins
+    failed: int = 0
+    relinked: int = 0  # standards whose parent changed
+    errors: list[RowError] = field(default_factory=list)
+    changes: list[StandardChange] = field(default_factory=list)
+
+    @property
+    def processed(self) -> int:
+        return self.created + self.updated + self.unchanged
+
+    def record_error(self, error: RowError) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_IMPORT_ROWS:
+            self.errors.append(error)
+
+    def record_warning(self, error: RowError) -> None:
+        """Report a problem with a row that was still imported."""
+
+        if len(self.errors) < MAX_REPORTED_IMPORT_ROWS:
+            self.errors.append(error)
+
+    def record_change(self, change: StandardChange) -> None:
+        if change.action == "created":
+            self.created += 1
+        else:
+            self.updated += 1
+        if len(self.changes) < MAX_REPORTED_IMPORT_ROWS:
+            self.changes.append(change)
+
+
+ParsedRow = StandardRecord | RowError
+
+
+# ----------------------------------------------------------------------
+# Readers
+# ----------------------------------------------------------------------
+
+
+def _split_tags(value: str | None) -> list[str]:
+    if not value:
+        return []
+    separator = ";" if ";" in value else "|" if "|" in value else ","
+    return [tag.strip() for tag in value.split(separator) if tag.strip()]
+
+
+def read_csv(stream: TextIO, default_subject: str | None = None) -> Iterator[ParsedRow]:
+    """Yield standards from a CSV with a header row.
+
+    Required columns are ``code`` and ``description``; ``subject`` may be
+    omitted when ``default_subject`` is given. ``grade_band``, ``tags``
+    (separated by ``;``, ``|`` or ``,``) and ``parent_code`` are optional.
+    """
+
+    reader = csv.DictReader(stream)
+    columns = {name.strip().lower() for name in reader.fieldnames or []}
+    missing = {"code", "description"} - columns
+    if "subject" not in columns and not default_subject:
+        missing.add("subject")
+    if missing:
+        raise StandardsImportError(f"CSV is missing columns: {', '.join(sorted(missing))}")
+    has_parents = "parent_code" in columns
+
+    for row in reader:
+        # Extra trailing fields land under the ``None`` key; ignore them.
+        row = {
+            key.strip().lower(): (value or "").strip()
+            for key, value in row.items()
+            if key is not None
+        }
+        code, description = row.get("code"), row.get("description")
+        subject = row.get("subject") or default_subject
+        if not code or not description or not subject:
+            yield RowError(reader.line_num, "code, description and subject are required")
+            continue
+        if len(code) > 100:
+            yield RowError(reader.line_num, "code is longer than 100 characters")
+            continue
+        yield StandardRecord(
+            line=reader.line_num,
+            code=code,
+            subject=subject,
+            grade_band=row.get("grade_band") or None,
+            description=description,
+            tags=_split_tags(row.get("tags")),
+            parent_code=row.get("parent_code", "") if has_parents else None,
+        )
+
+
+def _grade_band(levels: Iterable[str] | None) -> str | None:
+    """Collapse CASE ``educationLevel`` codes (``KG``, ``01``...) into a band like ``6-8``."""
+
+    grades = []
+    for level in levels or ():
+        level = level.strip().upper()
+        level = "K" if level == "KG" else str(int(level)) if level.isdigit() else level
+        if level in GRADE_ORDER:
+            grades.append(level)
+    if not grades:
+        return None
+    grades.sort(key=GRADE_ORDER.index)
+    return grades[0] if grades[0] == grades[-1] else f"{grades[0]}-{grades[-1]}"
+
+
+def read_case(
+    stream: TextIO, default_subject: str | None = None
+) -> tuple[dict[str, Any], Iterator[ParsedRow]]:
+    """Parse a CASE (1EdTech Competencies and Academic Standards Exchange) package.
+
+    Returns the ``CFDocument`` and an iterator over its ``CFItems``. Items with
+    no ``humanCodingScheme`` are grouping nodes and are skipped by the
+    importer. Parents come from ``isChildOf`` associations; a standard under a
+    skipped node is linked to the nearest coded ancestor. ``line`` is the
+    item's 1-based position.
+    """
+
+    try:
+        package = json.load(stream)
+    except json.JSONDecodeError as exc:
+        raise StandardsImportError(f"Invalid JSON: {exc}") from exc
+    document = package.get("CFDocument") if isinstance(package, dict) else None
+    if not isinstance(document, dict) or not isinstance(package.get("CFItems"), list):
+        raise StandardsImportError("Not a CASE package: CFDocument and CFItems are required")
+
+    subjects = document.get("subject") or []
+    subject = default_subject or (subjects[0] if subjects else None)
+
+    codes = {
+        item.get("identifier"): (item.get("humanCodingScheme") or "").strip()[:100]
+        for item in package["CFItems"]
+        if isinstance(item, dict)
+    }
+    parents: dict[str, str] = {}
+    for association in package.get("CFAssociations") or []:
+        if not isinstance(association, dict) or association.get("associationType") != "isChildOf":
+            continue
+        child = (association.get("originNodeURI") or {}).get("identifier")
+        parent = (association.get("destinationNodeURI") or {}).get("identifier")
+        if child and parent:
+            parents.setdefault(child, parent)
+
+    def parent_code(identifier: str | None) -> str:
+        seen = {identifier}
+        node = parents.get(identifier)  # type: ignore[arg-type]
+        while node is not None and node not in seen:
+            if codes.get(node):
+                return codes[node]
+            seen.add(node)
+            node = parents.get(node)
+        return ""
+
+    def items() -> Iterator[ParsedRow]:
+        for position, item in enumerate(package["CFItems"], start=1):
+            code = (item.get("humanCodingScheme") or "").strip()
+            if not code:
+                continue
+            description = (item.get("fullStatement") or "").strip()
+            if not description or not subject:
+                yield RowError(position, "fullStatement and a document subject are required")
+                continue
+            keywords = item.get("conceptKeywords") or []
+            yield StandardRecord(
+                line=position,
+                code=code[:100],
+                subject=subject,
+                grade_band=_grade_band(item.get("educationLevel")),
+                description=description,
+                tags=_split_tags(keywords) if isinstance(keywords, str) else list(keywords),
+                parent_code=parent_code(item.get("identifier")),
+            )
+
+    return document, items()
+
+
+# ----------------------------------------------------------------------
+# Importer
+# ----------------------------------------------------------------------
+
+
+class StandardsImporter:
+    """Upserts a framework and its standards in batches, committing after each."""
+
+    def __init__(self, session: Session, batch_size: int | None = None) -> None:
+        self.session = session
+        self.batch_size = batch_size or settings.standards_import_batch_size
+
+    def import_file(
+        self,
+        stream: TextIO,
+        format_name: str,
+        framework: FrameworkSpec,
+        default_subject: str | None = None,
+        on_progress: Callable[[StandardsImportResult], None] | None = None,
+    ) -> StandardsImportResult:
+        """Import a CSV or CASE-JSON file; CASE metadata fills in a blank framework name."""
+
+        if format_name == "csv":
+            rows: Iterator[ParsedRow] = read_csv(stream, default_subject)
+        elif format_name == "case":
+            document, rows = read_case(stream, default_subject)
+            framework = FrameworkSpec(
+                code=framework.code,
+                name=framework.name or document.get("title") or framework.code,
+                jurisdiction=framework.jurisdiction or document.get("creator"),
+            )
+        else:
+            raise StandardsImportError(f"Unsupported import format: {format_name}")
+        return self.import_records(framework, rows, on_progress=on_progress)
+
+    def import_records(
+        self,
+        framework: FrameworkSpec,
+        rows: Iterable[ParsedRow],
+        on_progress: Callable[[StandardsImportResult], None] | None = None,
+    ) -> StandardsImportResult:
+        framework_row = StandardsService(self.session).ensure_framework(
+            code=framework.code,
+            name=framework.name or framework.code,
+            jurisdiction=framework.jurisdiction,
+        )
+        if framework.name and framework_row.name != framework.name:
+            framework_row.name = framework.name
+        self.session.commit()
+
+        result = StandardsImportResult(
+            framework_id=framework_row.id, framework_code=framework_row.code
+        )
+        batch: dict[str, StandardRecord] = {}
+        seen: set[str] = set()
+        # code -> (line, parent code) for rows that carry hierarchy
+        parents: dict[str, tuple[int, str]] = {}
+        for row in rows:
+            if isinstance(row, RowError):
+                result.record_error(row)
+                continue
+            if row.code in seen:
+                # A repeated code would make one upsert touch the same row twice.
+                result.skipped += 1
+                continue
+            seen.add(row.code)
+            if row.parent_code is not None:
+                parents[row.code] = (row.line, row.parent_code)
+            batch[row.code] = row
+            if len(batch) >= self.batch_size:
+                self._write_batch(framework_row.id, batch, result)
+                batch = {}
+                if on_progress is not None:
+                    on_progress(result)
+        if batch:
+            self._write_batch(framework_row.id, batch, result)
+            if on_progress is not None:
+                on_progress(result)
+
+        if parents:
+            self._link_parents(framework_row.id, parents, result)
+        rebuild_closure(self.session, [framework_row.id])
+        self.session.commit()
+
+        # Core upserts bypass the ORM change tracking, so refresh search structures once here.
+        bump_catalog_version()
+        rebuild_standards_index(self.session)
+        logger.info(
+            "Imported framework %s: %d created, %d updated, %d unchanged, %d failed",
+            framework_row.code,
+            result.created,
+            result.updated,
+            result.unchanged,
+            result.failed,
+        )
+        return result
+
+    def _link_parents(
+        self,
+        framework_id: uuid.UUID,
+        parents: dict[str, tuple[int, str]],
+        result: StandardsImportResult,
+    ) -> None:
+        """Point each imported standard at its parent by code, in one executemany."""
+
+        stored = self.session.execute(
+            select(Standard.id, Standard.code, Standard.parent_id).where(
+                Standard.framework_id == framework_id
+            )
+        ).all()
+        ids = {row.code: row.id for row in stored}
+        parent_of = {row.id: row.parent_id for row in stored}
+
+        updates: list[dict[str, Any]] = []
+        for code, (line, parent_code) in parents.items():
+            standard_id = ids.get(code)
+            if standard_id is None:
+                continue
+            parent_id = ids.get(parent_code) if parent_code else None
+            if parent_code and parent_id is None:
+                result.record_warning(RowError(line, f"parent_code {parent_code} not found"))
+            elif parent_id is not None and self._is_ancestor(standard_id, parent_id, parent_of):
+                result.record_warning(
+                    RowError(line, f"parent_code {parent_code} would form a cycle")
+                )
+                continue
+            if parent_of[standard_id] != parent_id:
+                parent_of[standard_id] = parent_id
+                updates.append({"b_id": standard_id, "b_parent_id": parent_id})
+
+        if updates:
+            table = Standard.__table__
+            self.session.execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(parent_id=bindparam("b_parent_id")),
+                updates,
+            )
+            result.relinked += len(updates)
+
+    @staticmethod
+    def _is_ancestor(
+        standard_id: uuid.UUID,
+        candidate_id: uuid.UUID,
+        parent_of: dict[uuid.UUID, uuid.UUID | None],
+    ) -> bool:
+        """Whether ``standard_id`` is ``candidate_id`` or one of its ancestors."""
+
+        node: uuid.UUID | None = candidate_id
+        for _ in range(len(parent_of) + 1):
+            if node is None:
+                return False
+            if node == standard_id:
+                return True
+            node = parent_of.get(node)
+        return True
+
+    def _write_batch(
+        self,
+        framework_id: uuid.UUID,
+        batch: dict[str, StandardRecord],
+        result: StandardsImportResult,
+    ) -> None:
+        existing = {
+            row.code: row
+            for row in self.session.execute(
+                select(Standard.code, *(getattr(Standard, name) for name in STANDARD_FIELDS)).where(
+                    Standard.framework_id == framework_id, Standard.code.in_(list(batch))
+                )
+            )
+        }
+
+        now = datetime.now(timezone.utc)
+        pending: list[dict[str, Any]] = []
+        for code, record in batch.items():
+            values = record.values()
+            stored = existing.get(code)
+            if stored is None:
+                result.record_change(StandardChange(code=code, action="created"))
+            else:
+                changed = [name for name in STANDARD_FIELDS if getattr(stored, name) != values[name]]
+                if not changed:
+                    result.unchanged += 1
+                    continue
+                result.record_change(StandardChange(code=code, action="updated", fields=changed))
+            pending.append(
+                {
+                    "id": uuid.uuid4(),
+                    "framework_id": framework_id,
+                    "code": code,
+                    "updated_at": now,
+                    **values,
+                }
+            )
+
+        if pending:
+            self.session.execute(
+                upsert(
+                    self.session,
+                    Standard.__table__,
+                    index_elements=("framework_id", "code"),
+                    update_columns=(*STANDARD_FIELDS, "updated_at"),
+                ),
+                pending,
+            )
+        self.session.commit()
@@ -0,0 +1,594 @@
+"""Process-wide in-memory search index over the standards catalog.
+
+Standards are tokenized once into an inverted index partitioned by subject
+and grade band, so suggestions score only the postings of the query terms
+(BM25) instead of scanning and re-lowercasing every standard per request.
+
+The index is rebuilt lazily when the catalog changes. ORM writes to standards
+bump :func:`catalog_version` on commit; bulk Core writes must call
+:func:`bump_catalog_version` themselves. A TTL bounds staleness across worker
+processes, which cannot see each other's commits. Built indexes are published
+as an mmap-able snapshot in the blob store so other workers can map them
+instead of rebuilding.
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import uuid
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.standard import Standard, StandardsFramework
+from app.services.blob_store import get_blob_store
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is of on or that the their this to with".split()
+)
+
+# BM25 parameters (standard Okapi defaults).
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SNAPSHOT_NAMESPACE = "standards-index"
+_SNAPSHOT_MAGIC = b"LPSTDIX2"
+_TERM_SEPARATOR = "\x1f"
+# Blob naming the most recently published snapshot.
+_CURRENT_SNAPSHOT = "current"
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase ``text`` and split it into index terms, dropping stopwords."""
+
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+# ----------------------------------------------------------------------
+# Catalog change tracking
+# ----------------------------------------------------------------------
+
+_catalog_version = 0
+_catalog_lock = threading.Lock()
+
+
+def catalog_version() -> int:
+    return _catalog_version
+
+
+def bump_catalog_version() -> None:
+    """Mark every in-process standards cache as stale."""
+
+    global _catalog_version
+    with _catalog_lock:
+        _catalog_version += 1
+
+
+_CATALOG_MODELS = (Standard, StandardsFramework)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_standards_writes(session: Session, _flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _CATALOG_MODELS):
+            session.info["standards_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    if session.info.pop("standards_changed", False):
+        bump_catalog_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop("standards_changed", None)
+
+
+# ----------------------------------------------------------------------
+# Index
+# ----------------------------------------------------------------------
+
+
+# (id, code, subject, grade_band, description, tags)
+StandardRow = tuple[uuid.UUID, str, str, "str | None", str, Sequence[str]]
+
+# Postings for one term: parallel document numbers and precomputed BM25 weights.
+Postings = tuple[Sequence[int], Sequence[float]]
+
+
+@dataclass(slots=True)
+class _Partition:
+    """Weighted postings for one (subject, grade band) slice of the catalog."""
+
+    ids: list[uuid.UUID] = field(default_factory=list)
+    codes: list[str] = field(default_factory=list)
+    postings: Mapping[str, Postings] = field(default_factory=dict)
+    sorted_terms: list[str] | None = None
+
+    def terms_with_prefix(self, prefix: str) -> list[str]:
+        if self.sorted_terms is None:
+            self.sorted_terms = sorted(self.postings)
+        start = bisect.bisect_left(self.sorted_terms, prefix)
+        stop = bisect.bisect_left(self.sorted_terms, prefix + "\uffff")
+        return self.sorted_terms[start:stop]
+
+
+def _document_terms(code: str, description: str, tags: Sequence[str] | None) -> list[str]:
+    terms = tokenize(f"{code} {description} {' '.join(tags or [])}")
+    # The whole code is a term too, so "5-ls2-1" matches exactly.
+    terms.append(code.lower())
+    return terms
+
+
+class StandardsIndex:
+    """Immutable BM25 index; build a new one rather than mutating.
+
+    Each posting stores its document's full BM25 term weight, computed once at
+    build time, so scoring a query is a sparse sum over the postings of its
+    terms with no per-request arithmetic on document statistics.
+    """
+
+    def __init__(self, subjects: dict[str, dict[str | None, _Partition]]) -> None:
+        self._subjects = subjects
+        self.size = sum(
+            len(partition.ids) for bands in subjects.values() for partition in bands.values()
+        )
+
+    @classmethod
+    def build(cls, rows: Iterable[StandardRow]) -> StandardsIndex:
+        # (id, code, term counts, length) per document, grouped by subject then band
+        grouped: dict[str, dict[str | None, list[tuple[uuid.UUID, str, Counter[str], int]]]] = (
+            defaultdict(lambda: defaultdict(list))
+        )
+        for standard_id, code, subject, grade_band, description, tags in sorted(
+            rows, key=lambda row: (row[1], str(row[0]))
+        ):
+            terms = _document_terms(code, description, tags)
+            grouped[subject.lower()][grade_band].append(
+                (standard_id, code, Counter(terms), len(terms))
+            )
+
+        subjects: dict[str, dict[str | None, _Partition]] = {}
+        for subject, bands in grouped.items():
+            # IDF and average length are subject-wide so scores compare across bands.
+            documents = [doc for docs in bands.values() for doc in docs]
+            frequency: Counter[str] = Counter()
+            for _, _, counts, _ in documents:
+                frequency.update(counts.keys())
+            average_length = sum(length for *_, length in documents) / len(documents) or 1.0
+            idf = {
+                term: math.log(1 + (len(documents) - count + 0.5) / (count + 0.5))
+                for term, count in frequency.items()
+            }
+
+            partitions: dict[str | None, _Partition] = {}
+            for band, docs in bands.items():
+                partition = partitions[band] = _Partition()
+                postings: dict[str, tuple[array, array]] = {}
+                for doc, (standard_id, code, counts, length) in enumerate(docs):
+                    partition.ids.append(standard_id)
+                    partition.codes.append(code)
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                    for term, tf in counts.items():
+                        docs_array, weights = postings.setdefault(
+                            term, (array("I"), array("f"))
+                        )
+                        docs_array.append(doc)
+                        weights.append(idf[term] * tf * (BM25_K1 + 1) / (tf + norm))
+                partition.postings = dict(postings)
+            subjects[subject] = partitions
+        return cls(subjects)
+
+    @classmethod
+    def from_session(cls, session: Session) -> StandardsIndex:
+        rows = session.execute(
+            select(
+                Standard.id,
+                Standard.code,
+                Standard.subject,
+                Standard.grade_band,
+                Standard.description,
+                Standard.tags,
+            )
+        ).all()
+        return cls.build(rows)
+
+    def search(
+        self,
+        subject: str,
+        grade_level: str | None,
+        keywords: Sequence[str] | None,
+        limit: int,
+    ) -> list[uuid.UUID]:
+        """Return up to ``limit`` standard ids, best BM25 match first.
+
+        Candidates are the subject's standards for ``grade_level`` plus those
+        without a grade band. When fewer than ``limit`` standards match any
+        keyword, the rest are filled in code order.
+        """
+
+        bands = self._subjects.get(subject.lower())
+        if bands is None or limit <= 0:
+            return []
+        if grade_level:
+            partitions = [bands[band] for band in (grade_level, None) if band in bands]
+        else:
+            partitions = list(bands.values())
+
+        terms = {term for keyword in keywords or () for term in tokenize(keyword)}
+        terms.update(keyword.lower() for keyword in keywords or () if keyword)
+        scores: dict[tuple[int, int], float] = defaultdict(float)
+        for slot, partition in enumerate(partitions):
+            for term in terms:
+                postings = partition.postings.get(term)
+                if postings is None:
+                    continue
+                for doc, weight in zip(*postings):
+                    scores[(slot, doc)] += weight
+
+        # Highest score first; ties go to the lower code, as in the fill below.
+        best = heapq.nsmallest(
+            limit,
+            scores.items(),
+            key=lambda item: (-item[1], partitions[item[0][0]].codes[item[0][1]]),
+        )
+        result = [partitions[slot].ids[doc] for (slot, doc), _ in best]
+        if len(result) < limit:
+            seen = set(result)
+            fill = heapq.merge(
+                *(zip(partition.codes, partition.ids) for partition in partitions)
+            )
+            for _, standard_id in fill:
+                if standard_id not in seen:
+                    result.append(standard_id)
+                    if len(result) == limit:
+                        break
+        return result
+
+    def typeahead(
+        self,
+        query: str,
+        subject: str | None,
+        grade_level: str | None,
+        limit: int,
+        offset: int = 0,
+    ) -> list[uuid.UUID]:
+        """Match a partially typed query against codes and descriptions.
+
+        Codes match on exact value, prefix or substring, in that order of
+        preference. Descriptions match when every query word is a term of the
+        standard and the last word may be a prefix ("decomp" finds
+        "decomposers"); those rank below code matches by BM25 weight.
+        """
+
+        needle = query.strip().lower()
+        if not needle:
+            return []
+        words = tokenize(needle)
+        if subject is None:
+            subjects = list(self._subjects.values())
+        else:
+            subjects = [self._subjects[subject.lower()]] if subject.lower() in self._subjects else []
+        partitions = [
+            partition
+            for bands in subjects
+            for band, partition in bands.items()
+            if not grade_level or band in (grade_level, None)
+        ]
+
+        # (tier, -score, code, id): lower sorts first.
+        matches: list[tuple[int, float, str, uuid.UUID]] = []
+        for partition in partitions:
+            matched: set[int] = set()
+            for doc, code in enumerate(partition.codes):
+                lowered = code.lower()
+                if needle in lowered:
+                    tier = 0 if lowered == needle else 1 if lowered.startswith(needle) else 2
+                    matches.append((tier, 0.0, code, partition.ids[doc]))
+                    matched.add(doc)
+            if not words:
+                continue
+
+            scores: dict[int, float] | None = None
+            for position, word in enumerate(words):
+                last = position == len(words) - 1
+                expansions = partition.terms_with_prefix(word) if last else [word]
+                word_scores: dict[int, float] = defaultdict(float)
+                for term in expansions:
+                    postings = partition.postings.get(term)
+                    if postings is None:
+                        continue
+                    for doc, weight in zip(*postings):
+                        word_scores[doc] += weight
+                if scores is None:
+                    scores = word_scores
+                else:
+                    scores = {
+                        doc: score + word_scores[doc]
+                        for doc, score in scores.items()
+                        if doc in word_scores
+                    }
+                if not scores:
+                    break
+            for doc, score in (scores or {}).items():
+                if doc not in matched:
+                    matches.append((3, -score, partition.codes[doc], partition.ids[doc]))
+
+        return [match[3] for match in heapq.nsmallest(offset + limit, matches)][offset:]
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def dumps(self) -> bytes:
+        """Serialize to the snapshot format read by :meth:`load`.
+
+        Layout: magic, a length-prefixed JSON header (ids, codes and each
+        partition's term list), then three native arrays: uint32 posting bounds
+        per term, uint32 document numbers and float32 weights. :meth:`load`
+        maps the arrays without copying, so worker processes share page cache.
+        """
+
+        bounds, docs, weights = array("I"), array("I"), array("f")
+        subjects: dict[str, list[dict[str, Any]]] = {}
+        for subject, bands in self._subjects.items():
+            entries = subjects[subject] = []
+            for band, partition in bands.items():
+                entries.append(
+                    {
+                        "band": band,
+                        "ids": [standard_id.hex for standard_id in partition.ids],
+                        "codes": partition.codes,
+                        "terms": _TERM_SEPARATOR.join(partition.postings),
+                        "bounds": len(bounds),
+                    }
+                )
+                for term_docs, term_weights in partition.postings.values():
+                    bounds.append(len(docs))
+                    docs.extend(term_docs)
+                    weights.extend(term_weights)
+                bounds.append(len(docs))
+
+        header = json.dumps(
+            {
+                "byteorder": sys.byteorder,
+                "bounds": len(bounds),
+                "postings": len(docs),
+                "subjects": subjects,
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        header += b" " * (-len(header) % 4)  # keep the arrays 4-byte aligned
+        return b"".join(
+            (
+                _SNAPSHOT_MAGIC,
+                struct.pack("<Q", len(header)),
+                header,
+                bounds.tobytes(),
+                docs.tobytes(),
+                weights.tobytes(),
+            )
+        )
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> StandardsIndex | None:
+        """Map a snapshot written by :meth:`dumps`; ``None`` if it is unusable."""
+
+        with open(path, "rb") as handle:
+            try:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return None
+        view = memoryview(mapped)
+        offset = len(_SNAPSHOT_MAGIC)
+        if bytes(view[:offset]) != _SNAPSHOT_MAGIC:
+            return None
+        (header_length,) = struct.unpack_from("<Q", view, offset)
+        offset += 8
+        header = json.loads(bytes(view[offset : offset + header_length]))
+        if header["byteorder"] != sys.byteorder:
+            return None
+        offset += header_length
+
+        regions = []
+        for typecode, count in (
+            ("I", header["bounds"]),
+            ("I", header["postings"]),
+            ("f", header["postings"]),
+        ):
+            regions.append(view[offset : offset + count * 4].cast(typecode))
+            offset += count * 4
+        bounds, docs, weights = regions
+
+        subjects: dict[str, dict[str | None, _Partition]] = {}
+        for subject, entries in header["subjects"].items():
+            partitions = subjects[subject] = {}
+            for entry in entries:
+                terms = entry["terms"].split(_TERM_SEPARATOR) if entry["terms"] else []
+                partitions[entry["band"]] = _Partition(
+                    ids=[uuid.UUID(hex=value) for value in entry["ids"]],
+                    codes=entry["codes"],
+                    postings=_MappedPostings(
+                        {term: entry["bounds"] + slot for slot, term in enumerate(terms)},
+                        bounds,
+                        docs,
+                        weights,
+                    ),
+                )
+        return cls(subjects)
+
+
+class _MappedPostings(Mapping[str, Postings]):
+    """Postings read from a mapped snapshot, sliced on lookup rather than up front."""
+
+    __slots__ = ("_terms", "_bounds", "_docs", "_weights")
+
+    def __init__(
+        self,
+        terms: dict[str, int],
+        bounds: Sequence[int],
+        docs: Sequence[int],
+        weights: Sequence[float],
+    ) -> None:
+        self._terms = terms
+        self._bounds = bounds
+        self._docs = docs
+        self._weights = weights
+
+    def __getitem__(self, term: str) -> Postings:
+        slot = self._terms[term]
+        start, stop = self._bounds[slot], self._bounds[slot + 1]
+        return self._docs[start:stop], self._weights[start:stop]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._terms)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+
+def _snapshot_key(session: Session) -> str:
+    """Name the snapshot after the catalog's size and latest write.
+
+    Every insert and update (ORM or the importer's upsert) moves
+    ``max(updated_at)`` and every delete moves the count, so any change made
+    by any process yields a new key.
+    """
+
+    count, latest = session.execute(
+        select(func.count(Standard.id), func.max(Standard.updated_at))
+    ).one()
+    digest = hashlib.sha256(f"{_SNAPSHOT_MAGIC!r}|{count}|{latest}".encode("utf-8"))
+    return f"{digest.hexdigest()[:32]}.idx"
+
+
+def _load_snapshot(key: str) -> StandardsIndex | None:
+    path = get_blob_store(SNAPSHOT_NAMESPACE).local_path(key)
+    if path is None:
+        return None
+    try:
+        return StandardsIndex.load(path)
+    except (OSError, ValueError, KeyError):
+        logger.warning("Ignoring unreadable standards index snapshot %s", path, exc_info=True)
+        return None
+
+
+def _save_snapshot(index: StandardsIndex, key: str) -> None:
+    """Publish ``index`` under ``key`` and delete the snapshot it supersedes.
+
+    The current key is recorded under :data:`_CURRENT_SNAPSHOT`. Workers that
+    still map a deleted file keep their mapping; POSIX frees it on unmap.
+    """
+
+    store = get_blob_store(SNAPSHOT_NAMESPACE)
+    try:
+        previous = None
+        handle = store.open(_CURRENT_SNAPSHOT)
+        if handle is not None:
+            with handle:
+                previous = handle.read().decode("utf-8").strip() or None
+        store.put(key, index.dumps())
+        store.put(_CURRENT_SNAPSHOT, key.encode("utf-8"))
+        if previous is not None and previous != key:
+            store.delete(previous)
+    except OSError:
+        logger.warning("Could not write standards index snapshot", exc_info=True)
+
+
+_index: StandardsIndex | None = None
+_index_version = -1
+_index_built_at = 0.0
+_index_lock = threading.Lock()
+
+
+def _is_fresh(version: int) -> bool:
+    return (
+        _index is not None
+        and _index_version == version
+        and time.monotonic() - _index_built_at < settings.standards_index_ttl_seconds
+    )
+
+
+def get_standards_index(session: Session) -> StandardsIndex:
+    """Return the process-wide index, reloading it if the catalog changed or it aged out.
+
+    A process that has not written standards itself maps the shared snapshot
+    when one matches the catalog; otherwise it rebuilds and publishes one.
+    """
+
+    global _index, _index_version, _index_built_at
+    version = catalog_version()
+    if _is_fresh(version):
+        return _index  # type: ignore[return-value]
+    with _index_lock:
+        if not _is_fresh(version):
+            key = _snapshot_key(session)
+            index = None
+            if _index is None or _index_version == version:
+                index = _load_snapshot(key)
+            if index is None:
+                index = StandardsIndex.from_session(session)
+                _save_snapshot(index, key)
+            _index = index
+            _index_version = version
+            _index_built_at = time.monotonic()
+        return _index  # type: ignore[return-value]
+
+
+def rebuild_standards_index(session: Session) -> StandardsIndex:
+    """Rebuild from the database and republish the snapshot, e.g. after a bulk import."""
+
+    global _index, _index_version, _index_built_at
+    with _index_lock:
+        version = catalog_version()
+        index = StandardsIndex.from_session(session)
+        _save_snapshot(index, _snapshot_key(session))
+        _index = index
+        _index_version = version
+        _index_built_at = time.monotonic()
+        return index
+
+
+def invalidate_standards_index() -> None:
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def warm_standards_index() -> None:
+    """Build the index at startup so the first suggestion request does not pay for it."""
+
+    if not settings.standards_index_warm_on_startup:
+        return
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        index = get_standards_index(session)
+        logger.info("Standards index built with %d standards", index.size)
+    except Exception:  # pragma: no cover - the index is rebuilt lazily on first use
+        logger.warning("Could not warm the standards index at startup", exc_info=True)
+    finally:
+        session.close()
@@ -2,16 +2,96 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Hashable
 from typing import Iterable, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import and_, func, literal, or_, select
 from sqlalchemy.orm import Session
 
-from app.models.standard import LessonStandard, Standard, StandardsFramework
+from app.core.config import settings
+from app.db.dialect import insert_ignore
+from app.models.lesson import Lesson, LessonVersion
+from app.models.standard import LessonStandard, Standard, StandardClosure, StandardsFramework
+from app.services.standard_codes import get_standard_code_map
+from app.services.standards_coverage import StandardsCoverageService
+from app.services.standards_hierarchy import subtree_ids
+from app.services.standards_index import catalog_version, get_standards_index
 
 logger = logging.getLogger(__name__)
 
 
+class SuggestionCache:
+    """Process-wide LRU of suggestion results, holding standard ids only.
+
+    Entries expire after a TTL and are also dropped once :func:`catalog_version`
+    moves, so any committed write to standards invalidates them in this
+    process; the TTL bounds staleness from writes made by other processes.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[int, float, list[uuid.UUID]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> list[uuid.UUID] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, stored_at, ids = entry
+                if version == catalog_version() and time.monotonic() - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return ids
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, ids: list[uuid.UUID], version: int) -> None:
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), ids)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+suggestion_cache = SuggestionCache(
+    settings.standards_suggestion_cache_size, settings.standards_suggestion_cache_ttl_seconds
+)
+
+
+def suggestion_key(
+    subject: str, grade_level: str | None, keywords: Sequence[str] | None, limit: int
+) -> tuple[str, str, tuple[str, ...], int]:
+    """Normalize a suggestion request so equivalent ones share a cache entry."""
+
+    normalized = {" ".join(keyword.lower().split()) for keyword in keywords or ()}
+    normalized.discard("")
+    return (subject.strip().lower(), (grade_level or "").strip(), tuple(sorted(normalized)), limit)
+
+
 class StandardsService:
     """Provides lookup and alignment helpers for standards."""
 
@@ -29,56 +109,201 @@ class StandardsService:
         keywords: Sequence[str] | None = None,
         limit: int = 5,
     ) -> list[Standard]:
-        """Return standards matching the provided filters."""
+        """Return the standards that best match the keywords for a subject and grade.
+
+        Ranking runs against the process-wide :mod:`standards index
+        <app.services.standards_index>` and the resulting ids are memoized in
+        :data:`suggestion_cache`; only the winning rows are loaded.
+        """
+
+        key = suggestion_key(subject, grade_level, keywords, limit)
+        ids = suggestion_cache.get(key)
+        if ids is None:
+            version = catalog_version()
+            ids = get_standards_index(self.session).search(subject, grade_level, keywords, limit)
+            suggestion_cache.put(key, ids, version)
+        return self.get_standards_by_ids(ids)
+
+    def search_standards(
+        self,
+        query: str,
+        subject: str | None = None,
+        grade_level: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> list[Standard]:
+        """Typeahead search over standard codes and descriptions.
+
+        Postgres matches with ``pg_trgm`` (prefix, substring and fuzzy) backed
+        by the trigram GIN indexes; other databases use the in-memory index,
+        which matches prefixes and substrings but not misspellings.
+        """
 
-        stmt = select(Standard).join(Standard.framework).where(Standard.subject.ilike(subject))
+        if self.session.get_bind().dialect.name == "postgresql":
+            return self._search_trigram(query, subject, grade_level, limit, offset)
+        ids = get_standards_index(self.session).typeahead(
+            query, subject, grade_level, limit=limit, offset=offset
+        )
+        return self.get_standards_by_ids(ids)
 
+    def _search_trigram(
+        self,
+        query: str,
+        subject: str | None,
+        grade_level: str | None,
+        limit: int,
+        offset: int,
+    ) -> list[Standard]:
+        needle = query.strip()
+        if not needle:
+            return []
+        escaped = needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        code_prefix = Standard.code.ilike(f"{escaped}%", escape="\\")
+        stmt = select(Standard).where(
+            or_(
+                Standard.code.ilike(f"%{escaped}%", escape="\\"),
+                Standard.code.op("%")(needle),
+                literal(needle).op("<%")(Standard.description),
+            )
+        )
+        if subject:
+            stmt = stmt.where(func.lower(Standard.subject) == subject.lower())
         if grade_level:
             stmt = stmt.where(
-                (Standard.grade_band == grade_level)
-                | (Standard.grade_band.is_(None))
+                or_(Standard.grade_band == grade_level, Standard.grade_band.is_(None))
+            )
+        stmt = (
+            stmt.order_by(
+                (func.lower(Standard.code) == needle.lower()).desc(),
+                code_prefix.desc(),
+                func.greatest(
+                    func.similarity(Standard.code, needle),
+                    func.word_similarity(needle, Standard.description),
+                ).desc(),
+                Standard.code,
             )
+            .limit(limit)
+            .offset(offset)
+        )
+        return list(self.session.execute(stmt).scalars())
+
+    def resolve_codes(
+        self,
+        codes: Sequence[str],
+        framework: str | None = None,
+        subject: str | None = None,
+        grade_level: str | None = None,
+    ) -> list[uuid.UUID]:
+        """Resolve loosely spelled standard codes to ids from the cached code map."""
+
+        if not codes:
+            return []
+        code_map = get_standard_code_map(self.session)
+        return code_map.resolve(
+            codes, framework=framework, subject=subject, grade_level=grade_level
+        )
+
+    def get_standards_by_ids(self, ids: Sequence[uuid.UUID]) -> list[Standard]:
+        """Load standards by id, preserving the order of ``ids``."""
 
-        standards = list(self.session.execute(stmt).scalars())
-
-        if keywords:
-            lowered = {kw.lower() for kw in keywords if kw}
-            if lowered:
-                standards.sort(
-                    key=lambda std: -self._keyword_score(std, lowered)
-                )
-
-        return standards[:limit]
-
-    def _keyword_score(self, standard: Standard, keywords: set[str]) -> int:
-        score = 0
-        search_text = f"{standard.code} {standard.description} {' '.join(standard.tags)}".lower()
-        for keyword in keywords:
-            if keyword in search_text:
-                score += 2
-            elif any(keyword in tag.lower() for tag in standard.tags):
-                score += 1
-        return score
-
-    def attach_standards(self, lesson_version_id: str, standards: Iterable[Standard]) -> None:
-        """Associate the provided standards with a lesson version."""
-
-        existing = {
-            link.standard_id
-            for link in self.session.execute(
-                select(LessonStandard).where(LessonStandard.lesson_version_id == lesson_version_id)
-            ).scalars()
-        }
-
-        for standard in standards:
-            if standard.id in existing:
-                continue
-            self.session.add(
-                LessonStandard(
-                    lesson_version_id=lesson_version_id,
-                    standard_id=standard.id,
-                )
+        if not ids:
+            return []
+        rows = self.session.execute(select(Standard).where(Standard.id.in_(ids))).scalars()
+        by_id = {standard.id: standard for standard in rows}
+        return [by_id[standard_id] for standard_id in ids if standard_id in by_id]
+
+    def attach_standards(
+        self,
+        lesson_version_id: uuid.UUID,
+        standards: Iterable[Standard | uuid.UUID],
+    ) -> None:
+        """Align a lesson version to standards, given as ids or loaded rows.
+
+        One ``INSERT ... SELECT ... ON CONFLICT DO NOTHING``: links that
+        already exist are skipped and ids that match no standard are dropped,
+        without loading either first. The coverage summary is bumped first.
+        """
+
+        standard_ids = list(
+            dict.fromkeys(
+                item.id if isinstance(item, Standard) else item for item in standards
+            )
+        )
+        if not standard_ids:
+            return
+        StandardsCoverageService(self.session).links_added(lesson_version_id, standard_ids)
+        self.session.execute(
+            insert_ignore(self.session, LessonStandard).from_select(
+                ["lesson_version_id", "standard_id"],
+                select(
+                    literal(lesson_version_id, LessonStandard.lesson_version_id.type),
+                    Standard.id,
+                ).where(Standard.id.in_(standard_ids)),
             )
+        )
+        # The bulk insert bypasses the unit of work; drop stale loaded collections.
+        version = self.session.identity_map.get(
+            self.session.identity_key(LessonVersion, lesson_version_id)
+        )
+        if version is not None:
+            self.session.expire(version, ["standards", "standards_links"])
+
+    # ------------------------------------------------------------------
+    # Coverage
+    # ------------------------------------------------------------------
+
+    def get_framework(self, code: str, jurisdiction: str | None = None) -> StandardsFramework:
+        stmt = select(StandardsFramework).where(StandardsFramework.code == code)
+        if jurisdiction is not None:
+            stmt = stmt.where(StandardsFramework.jurisdiction == jurisdiction)
+        framework = (
+            self.session.execute(stmt.order_by(StandardsFramework.created_at)).scalars().first()
+        )
+        if framework is None:
+            raise LookupError("Standards framework not found")
+        return framework
+
+    def coverage(
+        self,
+        framework_id: uuid.UUID,
+        tenant_id: uuid.UUID,
+        root: str | None = None,
+        rollup: bool = False,
+    ) -> list[tuple[Standard, list[tuple[uuid.UUID, str]]]]:
+        """Return every standard of a framework with the tenant lessons aligned to it.
+
+        Only each lesson's current version counts. One query: the framework's
+        standards left-joined through ``ix_lesson_standards_standard_version``
+        to lessons whose ``current_version_id`` is the aligned version, so
+        uncovered standards come back with no lessons. ``root`` limits the
+        report to a domain or cluster code and its descendants; with
+        ``rollup`` a standard also counts lessons aligned beneath it, joined
+        through the closure table.
+        """
+
+        lesson_join = and_(
+            Lesson.current_version_id == LessonStandard.lesson_version_id,
+            Lesson.tenant_id == tenant_id,
+        )
+        stmt = select(Standard, Lesson.id, Lesson.title)
+        if rollup:
+            stmt = stmt.outerjoin(
+                StandardClosure, StandardClosure.ancestor_id == Standard.id
+            ).outerjoin(LessonStandard, LessonStandard.standard_id == StandardClosure.descendant_id)
+        else:
+            stmt = stmt.outerjoin(LessonStandard, LessonStandard.standard_id == Standard.id)
+        stmt = stmt.outerjoin(Lesson, lesson_join).where(Standard.framework_id == framework_id)
+        if root is not None:
+            stmt = stmt.where(Standard.id.in_(subtree_ids(root, framework_id)))
+        rows = self.session.execute(stmt.order_by(Standard.code, Lesson.title, Lesson.id))
+
+        coverage: dict[uuid.UUID, tuple[Standard, list[tuple[uuid.UUID, str]]]] = {}
+        for standard, lesson_id, title in rows:
+            _, lessons = coverage.setdefault(standard.id, (standard, []))
+            # Rolled up, a lesson aligned to two standards of a subtree arrives twice.
+            if lesson_id is not None and (not lessons or lessons[-1][0] != lesson_id):
+                lessons.append((lesson_id, title))
+        return list(coverage.values())
 
     # ------------------------------------------------------------------
     # Utility helpers for seeding/tests
@@ -95,7 +320,9 @@ class StandardsService:
         framework = self.session.execute(
             select(StandardsFramework).where(
                 StandardsFramework.code == code,
-                StandardsFramework.jurisdiction.is_(jurisdiction),
+                StandardsFramework.jurisdiction == jurisdiction
+                if jurisdiction is not None
+                else StandardsFramework.jurisdiction.is_(None),
             )
         ).scalar_one_or_none()
 
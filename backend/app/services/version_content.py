@@ -0,0 +1,257 @@
+"""Delta encoding and cached reconstruction of lesson version content.
+
+Most versions differ from their predecessor by a handful of list items (e.g. a
+differentiation strategy appended), so only every Nth version stores its content
+in full. The rest store a structural delta against ``version_no - 1`` in
+``LessonVersion.content_delta`` (``{"base_version_id": ..., "fields": ...}``) and
+are rebuilt on read.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Mapping, Sequence
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session, aliased, object_session
+
+from app.core.config import settings
+from app.models.lesson import LessonVersion
+
+LIST_FIELDS = ("materials", "flow", "differentiation", "assessments", "accommodations")
+TEXT_FIELDS = ("teacher_script_md",)
+CONTENT_FIELDS = TEXT_FIELDS + LIST_FIELDS
+
+VersionContent = dict[str, Any]
+
+
+# ----------------------------------------------------------------------
+# Delta encoding
+# ----------------------------------------------------------------------
+
+
+def is_snapshot_position(version_no: int, interval: int | None = None) -> bool:
+    """Return True when ``version_no`` should store its content in full."""
+
+    interval = interval or settings.lesson_version_snapshot_interval
+    return interval <= 1 or version_no % interval == 1
+
+
+def diff_content(base: Mapping[str, Any], target: Mapping[str, Any]) -> dict[str, Any]:
+    """Return a delta that turns ``base`` into ``target``; unchanged fields are omitted."""
+
+    delta: dict[str, Any] = {}
+    for field in LIST_FIELDS:
+        old, new = list(base.get(field) or []), list(target.get(field) or [])
+        if old == new:
+            continue
+        keep = 0
+        for old_item, new_item in zip(old, new):
+            if old_item != new_item:
+                break
+            keep += 1
+        delta[field] = {"keep": keep, "extend": new[keep:]} if keep else {"set": new}
+
+    for field in TEXT_FIELDS:
+        old_text, new_text = base.get(field), target.get(field)
+        if old_text == new_text:
+            continue
+        if not old_text or not new_text:
+            delta[field] = {"set": new_text}
+            continue
+        head = len(os.path.commonprefix([old_text, new_text]))
+        tail = len(os.path.commonprefix([old_text[head:][::-1], new_text[head:][::-1]]))
+        delta[field] = {
+            "keep_head": head,
+            "keep_tail": tail,
+            "insert": new_text[head : len(new_text) - tail],
+        }
+    return delta
+
+
+def apply_delta(base: Mapping[str, Any], delta: Mapping[str, Any]) -> VersionContent:
+    """Apply a :func:`diff_content` delta to ``base`` and return the new content."""
+
+    content: VersionContent = {field: base.get(field) for field in CONTENT_FIELDS}
+    for field, change in delta.items():
+        if "set" in change:
+            content[field] = change["set"]
+        elif field in LIST_FIELDS:
+            content[field] = list(base.get(field) or [])[: change["keep"]] + change["extend"]
+        else:
+            old_text = base.get(field) or ""
+            tail = old_text[len(old_text) - change["keep_tail"] :] if change["keep_tail"] else ""
+            content[field] = old_text[: change["keep_head"]] + change["insert"] + tail
+    for field in LIST_FIELDS:
+        content[field] = content[field] or []
+    return content
+
+
+def stored_content(version: LessonVersion) -> VersionContent:
+    """Return the content held in a snapshot row's own columns."""
+
+    return {
+        "teacher_script_md": version.stored_teacher_script_md,
+        **{field: list(getattr(version, f"stored_{field}") or []) for field in LIST_FIELDS},
+    }
+
+
+def encode_version(
+    version: LessonVersion,
+    content: Mapping[str, Any],
+    base: LessonVersion | None,
+    base_content: Mapping[str, Any] | None = None,
+) -> None:
+    """Populate a new version's storage columns as a snapshot or a delta.
+
+    ``base`` is the version numbered ``version_no - 1`` and ``base_content`` its
+    reconstructed content; pass ``None`` to force a full snapshot.
+    """
+
+    if base is None or base_content is None or is_snapshot_position(version.version_no):
+        version.content_delta = None
+        version.stored_teacher_script_md = content.get("teacher_script_md")
+        for field in LIST_FIELDS:
+            setattr(version, f"stored_{field}", list(content.get(field) or []))
+        return
+
+    version.content_delta = {
+        "base_version_id": str(base.id),
+        "fields": diff_content(base_content, content),
+    }
+    version.stored_teacher_script_md = None
+    for field in LIST_FIELDS:
+        setattr(version, f"stored_{field}", [])
+
+
+# ----------------------------------------------------------------------
+# Reconstruction cache
+# ----------------------------------------------------------------------
+
+
+class VersionContentCache:
+    """Thread-safe LRU of reconstructed content keyed by version id.
+
+    Versions are immutable, so entries never need invalidation; the bound only
+    caps memory.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Any, VersionContent] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version_id: Any) -> VersionContent | None:
+        with self._lock:
+            content = self._entries.get(version_id)
+            if content is not None:
+                self._entries.move_to_end(version_id)
+            return content
+
+    def put(self, version_id: Any, content: VersionContent) -> None:
+        with self._lock:
+            self._entries[version_id] = content
+            self._entries.move_to_end(version_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+content_cache = VersionContentCache(settings.lesson_version_cache_size)
+
+
+def resolve_content(version: LessonVersion, session: Session | None = None) -> VersionContent:
+    """Return the full content of ``version``, rebuilding delta rows as needed.
+
+    A cache miss on a delta row loads the chain back to its nearest snapshot in
+    a single query and caches every version it rebuilds along the way. Callers
+    reading many versions should call :func:`preload_content` first.
+    """
+
+    cached = content_cache.get(version.id)
+    if cached is not None:
+        return cached
+
+    if version.content_delta is None:
+        content = stored_content(version)
+        content_cache.put(version.id, content)
+        return content
+
+    base = content_cache.get(uuid.UUID(version.content_delta["base_version_id"]))
+    if base is None:
+        _load_chains([version], session)
+        base = content_cache.get(uuid.UUID(version.content_delta["base_version_id"]))
+        if base is None:  # pragma: no cover - chain always starts at a snapshot
+            raise RuntimeError(f"Lesson version {version.id} has no snapshot to rebuild from")
+    content = apply_delta(base, version.content_delta["fields"])
+    content_cache.put(version.id, content)
+    return content
+
+
+def preload_content(versions: Sequence[LessonVersion], session: Session | None = None) -> None:
+    """Warm the cache for ``versions`` with at most one query, however many there are.
+
+    Bulk readers (listings, archives, packets) call this before touching
+    ``version.content`` so a cold cache does not cost one chain query per version.
+    """
+
+    missing = [
+        version
+        for version in versions
+        if version.content_delta is not None
+        and content_cache.get(version.id) is None
+        and content_cache.get(uuid.UUID(version.content_delta["base_version_id"])) is None
+    ]
+    if missing:
+        _load_chains(missing, session)
+    for version in versions:
+        resolve_content(version, session)
+
+
+def _load_chains(versions: Sequence[LessonVersion], session: Session | None) -> None:
+    """Rebuild and cache every version between each of ``versions`` and its snapshot."""
+
+    session = session or object_session(versions[0])
+    if session is None:
+        raise RuntimeError("Delta-encoded lesson version is detached from its session")
+
+    snapshot = aliased(LessonVersion)
+    ranges = []
+    for version in versions:
+        snapshot_no = (
+            select(func.max(snapshot.version_no))
+            .where(
+                snapshot.lesson_id == version.lesson_id,
+                snapshot.content_delta.is_(None),
+                snapshot.version_no < version.version_no,
+            )
+            .scalar_subquery()
+        )
+        ranges.append(
+            and_(
+                LessonVersion.lesson_id == version.lesson_id,
+                LessonVersion.version_no >= snapshot_no,
+                LessonVersion.version_no < version.version_no,
+            )
+        )
+    links = session.execute(
+        select(LessonVersion)
+        .where(or_(*ranges))
+        .order_by(LessonVersion.lesson_id, LessonVersion.version_no)
+    ).scalars()
+
+    # Every range starts at a snapshot, so each lesson's rows replay in order.
+    content: VersionContent | None = None
+    for link in links:
+        if link.content_delta is None:
+            content = stored_content(link)
+        elif content is None:  # pragma: no cover - ranges always start at a snapshot
+            raise RuntimeError(f"Lesson version {link.id} has no snapshot to rebuild from")
+        else:
+            content = apply_delta(content, link.content_delta["fields"])
+        content_cache.put(link.id, content)
@@ -0,0 +1,97 @@
+"""Compare DOCX export cost with and without the preloaded base template.
+
+Usage::
+
+    python -m benchmarks.docx_template [--iterations 200]
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import statistics
+import time
+from collections.abc import Callable
+
+from docx import Document
+
+from app.services.export_service import ExportContent, ExportService
+
+
+def sample_content() -> ExportContent:
+    return ExportContent(
+        title="Ratios and Proportional Reasoning",
+        subject="Math",
+        grade_level="6",
+        objective="Use ratio language to describe relationships between quantities.",
+        duration_minutes=50,
+        standards=["6.RP.A.1", "6.RP.A.2", "6.RP.A.3"],
+        materials=[f"Handout {index}: Ratio tables" for index in range(5)],
+        flow=[f"Phase {index} (10 min): Work through ratio problems." for index in range(6)],
+        differentiation=["ELL: Sentence frames.", "IEP: Chunked tasks.", "Gifted: Extension."],
+        assessments=["Exit ticket: Three ratio questions."],
+        accommodations=["Extended time: 1.5x"],
+    )
+
+
+def export_docx_per_call(content: ExportContent) -> bytes:
+    """The previous implementation: parse the default template on every export."""
+
+    document = Document()
+    document.add_heading(content.title, level=1)
+    document.add_paragraph(f"Subject: {content.subject}")
+    document.add_paragraph(f"Grade Level: {content.grade_level}")
+    if content.duration_minutes:
+        document.add_paragraph(f"Duration: {content.duration_minutes} minutes")
+    document.add_paragraph()
+    for title, values in (
+        ("Objective", content.objective),
+        ("Standards", content.standards),
+        ("Materials", content.materials),
+        ("Lesson Flow", content.flow),
+        ("Differentiation", content.differentiation),
+        ("Assessments", content.assessments),
+        ("Accommodations", content.accommodations),
+    ):
+        if not values:
+            continue
+        document.add_heading(title, level=2)
+        if isinstance(values, str):
+            document.add_paragraph(values)
+        else:
+            for entry in values:
+                document.add_paragraph(entry, style="List Bullet")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _time(render: Callable[[ExportContent], bytes], content: ExportContent, iterations: int) -> list[float]:
+    render(content)  # warm-up, includes one-time template load
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render(content)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    content = sample_content()
+    service = ExportService(None)
+    results = {
+        "Document() per export": _time(export_docx_per_call, content, args.iterations),
+        "preloaded template": _time(service._export_docx, content, args.iterations),
+    }
+    for label, samples in results.items():
+        print(
+            f"{label:>24}: median {statistics.median(samples):7.2f} ms"
+            f"  p95 {statistics.quantiles(samples, n=20)[-1]:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
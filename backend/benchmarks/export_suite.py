@@ -0,0 +1,359 @@
+"""Export performance suite across lesson sizes and formats.
+
+Each (size, case) pair runs in a fresh spawned process so peak RSS is
+attributable to that case alone. Endpoint cases render in the render pool's
+worker processes, so two peaks are reported: the case process itself
+(``peak_rss_kb``) and its render workers combined (``peak_worker_rss_kb``).
+Results are written as JSON so runs from different commits can be compared::
+
+    python -m benchmarks.export_suite --output before.json
+    python -m benchmarks.export_suite --output after.json --compare before.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+# Synthetic lesson shapes, from a short mini-lesson to an outsized unit plan.
+SIZES: dict[str, dict[str, int]] = {
+    "small": {"flow": 3, "script_chars": 1_000, "standards": 2, "list_items": 2},
+    "medium": {"flow": 12, "script_chars": 10_000, "standards": 10, "list_items": 8},
+    "large": {"flow": 50, "script_chars": 50_000, "standards": 40, "list_items": 25},
+    "huge": {"flow": 200, "script_chars": 200_000, "standards": 150, "list_items": 80},
+}
+RENDER_CASES = ("pdf", "docx", "gdoc")
+ENDPOINT_CASES = ("endpoint_pdf_cold", "endpoint_pdf_warm", "endpoint_docx_cold")
+CASES = RENDER_CASES + ENDPOINT_CASES
+
+
+@dataclass(slots=True)
+class CaseResult:
+    size: str
+    case: str
+    iterations: int
+    wall_ms_median: float
+    wall_ms_p95: float
+    wall_ms_min: float
+    output_bytes: int
+    # Peak RSS of the case process itself (API code, or the in-process renderer).
+    peak_rss_kb: int
+    rss_growth_kb: int
+    # Summed peak RSS of the render pool workers; 0 for cases that render in-process.
+    peak_worker_rss_kb: int
+
+
+def _peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _worker_peak_rss_kb() -> int:
+    """Sum the peak RSS (``VmHWM``) of the live render pool workers.
+
+    ``RUSAGE_CHILDREN`` is no substitute: it only covers reaped children and
+    reports the single largest one, which can be an unrelated helper process.
+    Reads ``/proc``, so it is 0 off Linux.
+    """
+
+    from app.services import render_pool
+
+    pool = render_pool._render_pool
+    executor = pool._executor if pool is not None else None
+    if executor is None:
+        return 0
+    total = 0
+    for pid in list(executor._processes or {}):
+        try:
+            with open(f"/proc/{pid}/status", encoding="ascii") as handle:
+                total += next(
+                    (int(line.split()[1]) for line in handle if line.startswith("VmHWM:")), 0
+                )
+        except OSError:
+            continue
+    return total
+
+
+def _version_payload(shape: dict[str, int]) -> dict[str, Any]:
+    paragraph = "Students discuss the phenomenon in pairs and record observations. "
+    script = (paragraph * (shape["script_chars"] // len(paragraph) + 1))[: shape["script_chars"]]
+    items = shape["list_items"]
+    return {
+        "objective": "Students will construct an explanation from evidence.",
+        "duration_minutes": 5 * shape["flow"],
+        "teacher_script_md": script,
+        "flow": [
+            {"phase": f"Phase {index}", "minutes": 5, "content_md": paragraph * 3}
+            for index in range(shape["flow"])
+        ],
+        "materials": [{"label": f"Material {index}", "value": "Printed handout"} for index in range(items)],
+        "differentiation": [
+            {"strategy": f"Strategy {index}", "description": paragraph} for index in range(items)
+        ],
+        "assessments": [{"type": "Exit ticket", "description": paragraph} for _ in range(items)],
+        "accommodations": [{"type": "Supports", "description": paragraph} for _ in range(items)],
+    }
+
+
+def _seed(session_factory, shape: dict[str, int]):
+    """Create a user and a lesson of the given shape; returns ``(user_id, lesson_id)``."""
+
+    from app.models import LessonStandard, Standard, StandardsFramework
+    from app.services import LessonService, UserService
+
+    session = session_factory()
+    user = UserService(session).invite_user(email="bench@example.edu", role="teacher")
+    lesson = LessonService(session).create_lesson(
+        owner=user,
+        title="Benchmark Lesson",
+        subject="Science",
+        grade_level="7",
+        language="en",
+        tags=[],
+        visibility="private",
+        status="draft",
+        version_payload=_version_payload(shape),
+    )
+    framework = StandardsFramework(code="BENCH", name="Benchmark Standards")
+    session.add(framework)
+    session.flush()
+    for index in range(shape["standards"]):
+        standard = Standard(
+            framework_id=framework.id,
+            code=f"BENCH.{index:04d}",
+            subject="Science",
+            description="Synthetic standard for benchmarking.",
+        )
+        session.add(standard)
+        session.flush()
+        session.add(LessonStandard(lesson_version_id=lesson.current_version_id, standard_id=standard.id))
+    session.commit()
+    ids = (user.id, lesson.id)
+    session.close()
+    return ids
+
+
+def run_case(size: str, case: str, iterations: int) -> dict[str, Any]:
+    """Run one benchmark case; executed inside a fresh worker process."""
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session, sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.core.config import settings
+    from app.db.base import Base
+
+    blob_dir = tempfile.TemporaryDirectory()
+    settings.blob_storage_dir = blob_dir.name
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, class_=Session, expire_on_commit=False)
+    user_id, lesson_id = _seed(session_factory, SIZES[size])
+
+    if case in RENDER_CASES:
+        run_once, teardown = _render_runner(session_factory, lesson_id, case)
+    else:
+        run_once, teardown = _endpoint_runner(session_factory, user_id, lesson_id, case)
+
+    try:
+        output_bytes = run_once()  # warm-up: imports, template load, worker spawn
+        baseline_rss = _peak_rss_kb()
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            run_once()
+            samples.append((time.perf_counter() - start) * 1000)
+        peak_worker = _worker_peak_rss_kb()
+    finally:
+        teardown()
+        blob_dir.cleanup()
+
+    peak = _peak_rss_kb()
+    return asdict(
+        CaseResult(
+            size=size,
+            case=case,
+            iterations=iterations,
+            wall_ms_median=round(statistics.median(samples), 3),
+            wall_ms_p95=round(_percentile(samples, 95), 3),
+            wall_ms_min=round(min(samples), 3),
+            output_bytes=output_bytes,
+            peak_rss_kb=peak,
+            rss_growth_kb=peak - baseline_rss,
+            peak_worker_rss_kb=peak_worker,
+        )
+    )
+
+
+def _render_runner(session_factory, lesson_id, format_name: str):
+    from app.models import Lesson
+    from app.services import ExportService, LessonService
+
+    session = session_factory()
+    lesson = session.get(Lesson, lesson_id)
+    version = LessonService(session).get_current_version(lesson)
+    service = ExportService(session)
+    content = service.build_content(lesson, version)
+    renderer = {
+        "pdf": service._export_pdf,
+        "docx": service._export_docx,
+        "gdoc": service._export_gdoc,
+    }[format_name]
+
+    def run_once() -> int:
+        output = renderer(content)
+        if isinstance(output, dict):
+            output = json.dumps(output).encode("utf-8")
+        return len(output)
+
+    return run_once, session.close
+
+
+def _endpoint_runner(session_factory, user_id, lesson_id, case: str):
+    from fastapi.testclient import TestClient
+
+    from app.core.security import get_current_active_user
+    from app.db.session import get_session
+    from app.main import app
+    from app.models import User
+    from app.services import ExportCacheService
+
+    format_name = case.split("_")[1]
+    cold = case.endswith("_cold")
+
+    def override_session():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def override_user():
+        session = session_factory()
+        try:
+            return session.get(User, user_id)
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_current_active_user] = override_user
+    client = TestClient(app)
+    client.__enter__()
+
+    def run_once() -> int:
+        if cold:
+            session = session_factory()
+            ExportCacheService(session).evict(max_bytes=0)
+            session.commit()
+            session.close()
+        response = client.get(f"/lessons/{lesson_id}/export", params={"format": format_name})
+        response.raise_for_status()
+        return len(response.content)
+
+    def teardown() -> None:
+        client.__exit__(None, None, None)
+        app.dependency_overrides.clear()
+
+    return run_once, teardown
+
+
+def _percentile(samples: list[float], percent: int) -> float:
+    if len(samples) < 2:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[percent - 1]
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> list[str]:
+    """Return one line per case shared by both runs with the median wall-time change."""
+
+    previous = {(row["size"], row["case"]): row for row in baseline["results"]}
+    lines = []
+    for row in current["results"]:
+        before = previous.get((row["size"], row["case"]))
+        if before is None:
+            continue
+        change = (row["wall_ms_median"] - before["wall_ms_median"]) / before["wall_ms_median"] * 100
+        lines.append(
+            f"{row['size']:>6} {row['case']:<20} {before['wall_ms_median']:9.2f} ms"
+            f" -> {row['wall_ms_median']:9.2f} ms ({change:+6.1f}%)"
+        )
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark lesson exports.")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--output", help="Write JSON results to this path (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run to diff against")
+    args = parser.parse_args()
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for size in args.sizes:
+        for case in args.cases:
+            # One process per case so peak RSS is not inherited from earlier cases.
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_case, size, case, args.iterations).result()
+            print(
+                f"{size:>6} {case:<20} median {result['wall_ms_median']:9.2f} ms"
+                f"  peak RSS self {result['peak_rss_kb'] / 1024:7.1f} MiB"
+                f" / workers {result['peak_worker_rss_kb'] / 1024:7.1f} MiB"
+                f"  {result['output_bytes']:>9} bytes",
+                file=sys.stderr,
+            )
+            results.append(result)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "sizes": {size: SIZES[size] for size in args.sizes},
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        for line in compare(report, baseline):
+            print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Measure standards suggestion latency against a large synthetic catalog.
+
+Usage::
+
+    python -m benchmarks.standards_index [--standards 50000] [--queries 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from app.services.standards_index import StandardsIndex, StandardRow
+
+SUBJECTS = ("Math", "Science", "ELA", "Social Studies")
+GRADES = ("K", "1", "2", "3", "4", "5", "6", "7", "8", "9-12", None)
+
+
+def synthetic_rows(count: int, vocabulary: list[str], rng: random.Random) -> list[StandardRow]:
+    return [
+        (
+            uuid.uuid4(),
+            f"STD-{index:06d}",
+            rng.choice(SUBJECTS),
+            rng.choice(GRADES),
+            " ".join(rng.choices(vocabulary, k=rng.randint(12, 30))),
+            rng.choices(vocabulary, k=3),
+        )
+        for index in range(count)
+    ]
+
+
+def time_queries(
+    index: StandardsIndex, vocabulary: list[str], queries: int, rng: random.Random
+) -> list[float]:
+    samples = []
+    for _ in range(queries):
+        keywords = rng.choices(vocabulary, k=4)
+        started = time.perf_counter()
+        index.search(rng.choice(SUBJECTS), rng.choice(GRADES[:-1]), keywords, limit=5)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def time_typeahead(
+    index: StandardsIndex, vocabulary: list[str], queries: int, rng: random.Random
+) -> list[float]:
+    samples = []
+    for _ in range(queries):
+        word = rng.choice(vocabulary)
+        query = rng.choice((f"STD-0{rng.randint(0, 4)}", f"{rng.choice(vocabulary)} {word[:5]}"))
+        started = time.perf_counter()
+        index.typeahead(query, rng.choice(SUBJECTS), rng.choice(GRADES[:-1]), limit=21)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--standards", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"term{index}" for index in range(8_000)]
+    rows = synthetic_rows(args.standards, vocabulary, rng)
+
+    started = time.perf_counter()
+    built = StandardsIndex.build(rows)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "standards.idx"
+        path.write_bytes(built.dumps())
+        started = time.perf_counter()
+        mapped = StandardsIndex.load(path)
+        load_ms = (time.perf_counter() - started) * 1000
+        assert mapped is not None
+
+        print(f"{args.standards} standards: build {build_ms:.0f} ms, map snapshot {load_ms:.0f} ms")
+        for label, index in (("built", built), ("mapped", mapped)):
+            for kind, timer in (("suggest", time_queries), ("typeahead", time_typeahead)):
+                samples = sorted(timer(index, vocabulary, args.queries, rng))
+                p95 = samples[int(len(samples) * 0.95) - 1]
+                print(
+                    f"{label:>7} {kind:>9}: median {statistics.median(samples):.3f} ms,"
+                    f" p95 {p95:.3f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Store lesson version content as deltas with periodic full snapshots."""
+from __future__ import annotations
+
+import os
+from typing import Any, Iterator, Mapping, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_lesson_version_deltas"
+down_revision: Union[str, None] = "0006_analytics_and_shares"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The encoder is frozen here as it was when this revision was written, so later
+# changes to app.services.version_content cannot change what this migration does.
+LIST_FIELDS = ("materials", "flow", "differentiation", "assessments", "accommodations")
+TEXT_FIELDS = ("teacher_script_md",)
+CONTENT_FIELDS = TEXT_FIELDS + LIST_FIELDS
+SNAPSHOT_INTERVAL = 10
+# Lessons whose versions are loaded and rewritten per round trip.
+LESSON_BATCH_SIZE = 500
+
+
+def is_snapshot_position(version_no: int) -> bool:
+    return version_no % SNAPSHOT_INTERVAL == 1
+
+
+def diff_content(base: Mapping[str, Any], target: Mapping[str, Any]) -> dict[str, Any]:
+    delta: dict[str, Any] = {}
+    for field in LIST_FIELDS:
+        old, new = list(base.get(field) or []), list(target.get(field) or [])
+        if old == new:
+            continue
+        keep = 0
+        for old_item, new_item in zip(old, new):
+            if old_item != new_item:
+                break
+            keep += 1
+        delta[field] = {"keep": keep, "extend": new[keep:]} if keep else {"set": new}
+
+    for field in TEXT_FIELDS:
+        old_text, new_text = base.get(field), target.get(field)
+        if old_text == new_text:
+            continue
+        if not old_text or not new_text:
+            delta[field] = {"set": new_text}
+            continue
+        head = len(os.path.commonprefix([old_text, new_text]))
+        tail = len(os.path.commonprefix([old_text[head:][::-1], new_text[head:][::-1]]))
+        delta[field] = {
+            "keep_head": head,
+            "keep_tail": tail,
+            "insert": new_text[head : len(new_text) - tail],
+        }
+    return delta
+
+
+def apply_delta(base: Mapping[str, Any], delta: Mapping[str, Any]) -> dict[str, Any]:
+    content: dict[str, Any] = {field: base.get(field) for field in CONTENT_FIELDS}
+    for field, change in delta.items():
+        if "set" in change:
+            content[field] = change["set"]
+        elif field in LIST_FIELDS:
+            content[field] = list(base.get(field) or [])[: change["keep"]] + change["extend"]
+        else:
+            old_text = base.get(field) or ""
+            tail = old_text[len(old_text) - change["keep_tail"] :] if change["keep_tail"] else ""
+            content[field] = old_text[: change["keep_head"]] + change["insert"] + tail
+    for field in LIST_FIELDS:
+        content[field] = content[field] or []
+    return content
+
+
+lesson_versions = sa.table(
+    "lesson_versions",
+    sa.column("id"),
+    sa.column("lesson_id"),
+    sa.column("version_no", sa.Integer()),
+    sa.column("teacher_script_md", sa.Text()),
+    *(sa.column(field, sa.JSON()) for field in LIST_FIELDS),
+    sa.column("content_delta", sa.JSON(none_as_null=True)),
+)
+
+_EMPTY_CONTENT: dict[str, Any] = {
+    "teacher_script_md": None,
+    **{field: [] for field in LIST_FIELDS},
+}
+
+
+def _versions_by_lesson(bind) -> Iterator[list[Any]]:
+    """Yield each lesson's versions in order, loading ``LESSON_BATCH_SIZE`` lessons at a time."""
+
+    last_lesson_id = None
+    while True:
+        stmt = sa.select(lesson_versions.c.lesson_id).distinct().order_by(
+            lesson_versions.c.lesson_id
+        )
+        if last_lesson_id is not None:
+            stmt = stmt.where(lesson_versions.c.lesson_id > last_lesson_id)
+        lesson_ids = bind.execute(stmt.limit(LESSON_BATCH_SIZE)).scalars().all()
+        if not lesson_ids:
+            return
+        rows = bind.execute(
+            sa.select(lesson_versions)
+            .where(lesson_versions.c.lesson_id.in_(lesson_ids))
+            .order_by(lesson_versions.c.lesson_id, lesson_versions.c.version_no)
+        ).mappings()
+        grouped: dict[Any, list[Any]] = {}
+        for row in rows:
+            grouped.setdefault(row["lesson_id"], []).append(row)
+        yield from grouped.values()
+        last_lesson_id = lesson_ids[-1]
+
+
+def upgrade() -> None:
+    op.add_column(
+        "lesson_versions",
+        sa.Column("content_delta", sa.JSON(none_as_null=True), nullable=True),
+    )
+
+    bind = op.get_bind()
+    for rows in _versions_by_lesson(bind):
+        previous = None
+        for row in rows:
+            content = {field: row[field] for field in CONTENT_FIELDS}
+            if (
+                previous is not None
+                and previous["version_no"] == row["version_no"] - 1
+                and not is_snapshot_position(row["version_no"])
+            ):
+                delta = {
+                    "base_version_id": str(previous["id"]),
+                    "fields": diff_content(previous["content"], content),
+                }
+                bind.execute(
+                    lesson_versions.update()
+                    .where(lesson_versions.c.id == row["id"])
+                    .values(content_delta=delta, **_EMPTY_CONTENT)
+                )
+            previous = {"id": row["id"], "version_no": row["version_no"], "content": content}
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for rows in _versions_by_lesson(bind):
+        content: dict[str, Any] | None = None
+        for row in rows:
+            if row["content_delta"] is None or content is None:
+                content = {field: row[field] for field in CONTENT_FIELDS}
+                continue
+            content = apply_delta(content, row["content_delta"]["fields"])
+            bind.execute(
+                lesson_versions.update()
+                .where(lesson_versions.c.id == row["id"])
+                .values(**content)
+            )
+
+    op.drop_column("lesson_versions", "content_delta")
@@ -0,0 +1,34 @@
+"""Add an atomic per-lesson version counter."""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_lesson_version_counter"
+down_revision: Union[str, None] = "0007_lesson_version_deltas"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "lessons",
+        sa.Column("next_version_no", sa.Integer(), nullable=False, server_default="1"),
+    )
+    op.execute(
+        """
+        UPDATE lessons
+        SET next_version_no = COALESCE(
+            (SELECT MAX(version_no) FROM lesson_versions WHERE lesson_versions.lesson_id = lessons.id),
+            0
+        ) + 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("lessons", "next_version_no")
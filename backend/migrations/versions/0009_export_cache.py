@@ -0,0 +1,47 @@
+"""Add the export render cache index table."""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_export_cache"
+down_revision: Union[str, None] = "0008_lesson_version_counter"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "export_cache_entries",
+        sa.Column("cache_key", sa.String(length=64), primary_key=True, nullable=False),
+        sa.Column("lesson_version_id", sa.dialects.postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("format", sa.String(length=20), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.Column(
+            "last_accessed_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.ForeignKeyConstraint(["lesson_version_id"], ["lesson_versions.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        "ix_export_cache_entries_last_accessed_at",
+        "export_cache_entries",
+        ["last_accessed_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_cache_entries_last_accessed_at", table_name="export_cache_entries")
+    op.drop_table("export_cache_entries")
@@ -0,0 +1,47 @@
+"""Add asynchronous export jobs."""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_export_jobs"
+down_revision: Union[str, None] = "0009_export_cache"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "export_jobs",
+        sa.Column("id", sa.dialects.postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("tenant_id", sa.dialects.postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", sa.dialects.postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("format", sa.String(length=20), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="queued"),
+        sa.Column("params", sa.JSON(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("progress_done", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("progress_total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("blob_key", sa.String(length=64), nullable=True),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("now()"),
+        ),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="SET NULL"),
+    )
+    op.create_index("ix_export_jobs_tenant_id", "export_jobs", ["tenant_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_jobs_tenant_id", table_name="export_jobs")
+    op.drop_table("export_jobs")
@@ -0,0 +1,24 @@
+"""Add result expiry to export jobs."""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_export_job_expiry"
+down_revision: Union[str, None] = "0010_export_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("export_jobs", sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_export_jobs_expires_at", "export_jobs", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_jobs_expires_at", table_name="export_jobs")
+    op.drop_column("export_jobs", "expires_at")
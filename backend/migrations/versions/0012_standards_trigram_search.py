@@ -0,0 +1,40 @@
+"""Trigram indexes for standards typeahead search (Postgres only)."""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012_standards_trigram_search"
+down_revision: Union[str, None] = "0011_export_job_expiry"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_standards_code_trgm",
+        "standards",
+        ["code"],
+        postgresql_using="gin",
+        postgresql_ops={"code": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_standards_description_trgm",
+        "standards",
+        ["description"],
+        postgresql_using="gin",
+        postgresql_ops={"description": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_standards_description_trgm", table_name="standards")
+    op.drop_index("ix_standards_code_trgm", table_name="standards")
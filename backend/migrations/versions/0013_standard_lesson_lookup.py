@@ -0,0 +1,29 @@
+"""Indexes for looking up lessons by standard."""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0013_standard_lesson_lookup"
+down_revision: Union[str, None] = "0012_standards_trigram_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_standards_code", "standards", ["code"])
+    op.create_index(
+        "ix_lesson_standards_standard_version",
+        "lesson_standards",
+        ["standard_id", "lesson_version_id"],
+    )
+    op.create_index("ix_lessons_current_version_id", "lessons", ["current_version_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lessons_current_version_id", table_name="lessons")
+    op.drop_index("ix_lesson_standards_standard_version", table_name="lesson_standards")
+    op.drop_index("ix_standards_code", table_name="standards")
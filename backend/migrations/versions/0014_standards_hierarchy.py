@@ -0,0 +1,60 @@
+"""Standards hierarchy: parent links plus a closure table for subtree lookups."""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0014_standards_hierarchy"
+down_revision: Union[str, None] = "0013_standard_lesson_lookup"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "standards",
+        sa.Column(
+            "parent_id",
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("standards.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_standards_parent_id", "standards", ["parent_id"])
+
+    op.create_table(
+        "standard_closure",
+        sa.Column(
+            "ancestor_id",
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("standards.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "descendant_id",
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("standards.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("depth", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "ix_standard_closure_descendant", "standard_closure", ["descendant_id", "ancestor_id"]
+    )
+
+    # Existing standards have no parents yet: each is only its own ancestor.
+    op.execute(
+        "INSERT INTO standard_closure (ancestor_id, descendant_id, depth) "
+        "SELECT id, id, 0 FROM standards"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_standard_closure_descendant", table_name="standard_closure")
+    op.drop_table("standard_closure")
+    op.drop_index("ix_standards_parent_id", table_name="standards")
+    op.drop_column("standards", "parent_id")
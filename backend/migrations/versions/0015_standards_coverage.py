@@ -0,0 +1,47 @@
+"""Per-tenant standards coverage summary, maintained incrementally."""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0015_standards_coverage"
+down_revision: Union[str, None] = "0014_standards_hierarchy"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "standards_coverage",
+        sa.Column(
+            "tenant_id",
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("tenants.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "standard_id",
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("standards.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("grade_level", sa.String(length=20), primary_key=True),
+        sa.Column("lesson_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    # Same aggregate as StandardsCoverageService.rebuild.
+    op.execute(
+        "INSERT INTO standards_coverage (tenant_id, standard_id, grade_level, lesson_count) "
+        "SELECT lessons.tenant_id, lesson_standards.standard_id, lessons.grade_level, count(*) "
+        "FROM lessons JOIN lesson_standards "
+        "ON lesson_standards.lesson_version_id = lessons.current_version_id "
+        "GROUP BY lessons.tenant_id, lesson_standards.standard_id, lessons.grade_level"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("standards_coverage")
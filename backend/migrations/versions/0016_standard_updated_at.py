@@ -0,0 +1,31 @@
+"""Track when each standard last changed so index snapshots notice edits."""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0016_standard_updated_at"
+down_revision: Union[str, None] = "0015_standards_coverage"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "standards",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+    op.execute("UPDATE standards SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    op.drop_column("standards", "updated_at")
@@ -0,0 +1,33 @@
+"""Let export workers claim jobs and detect ones abandoned by a crashed process."""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0017_export_job_claims"
+down_revision: Union[str, None] = "0016_standard_updated_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "export_jobs",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "export_jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index(
+        "ix_export_jobs_status_created_at", "export_jobs", ["status", "created_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_jobs_status_created_at", table_name="export_jobs")
+    op.drop_column("export_jobs", "heartbeat_at")
+    op.drop_column("export_jobs", "attempts")
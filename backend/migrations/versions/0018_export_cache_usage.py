@@ -0,0 +1,30 @@
+"""Keep a running total of the export cache size."""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0018_export_cache_usage"
+down_revision: Union[str, None] = "0017_export_job_claims"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "export_cache_usage",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("total_bytes", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        "INSERT INTO export_cache_usage (id, total_bytes) "
+        "SELECT 1, COALESCE(SUM(size_bytes), 0) FROM export_cache_entries"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("export_cache_usage")
@@ -8,8 +8,12 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.core.config import settings
 from app.db.base import Base
 from app.main import app
+from app.services.standard_codes import invalidate_standard_code_map
+from app.services.standards_index import invalidate_standards_index
+from app.services.standards_service import suggestion_cache
 from app.services.google_oauth import (
     GoogleAuthorizationRequest,
     GoogleOAuthClient,
@@ -17,6 +21,8 @@ from app.services.google_oauth import (
 )
 from app.services.google_oauth import get_google_oauth_client
 
+from .helpers import QueryCounter
+
 
 class FakeGoogleOAuthClient(GoogleOAuthClient):
     """Test double that skips external Google calls."""
@@ -70,6 +76,40 @@ def db_session(engine) -> Generator[Session, None, None]:
         connection.close()
 
 
+@pytest.fixture(autouse=True)
+def blob_storage_dir(tmp_path, monkeypatch):
+    """Keep rendered blobs out of the source tree and isolated per test."""
+
+    monkeypatch.setattr(settings, "blob_storage_dir", str(tmp_path / "blobs"))
+    return tmp_path / "blobs"
+
+
+@pytest.fixture(autouse=True)
+def export_job_recovery(monkeypatch):
+    """Startup recovery opens the configured database; tests call the sweep directly."""
+
+    monkeypatch.setattr(settings, "export_job_recover_on_startup", False)
+
+
+@pytest.fixture(autouse=True)
+def standards_caches(monkeypatch):
+    """Drop process-wide standards caches; test data is rolled back between tests."""
+
+    monkeypatch.setattr(settings, "standards_index_warm_on_startup", False)
+    invalidate_standards_index()
+    invalidate_standard_code_map()
+    suggestion_cache.clear()
+    yield
+    invalidate_standards_index()
+    invalidate_standard_code_map()
+    suggestion_cache.clear()
+
+
+@pytest.fixture()
+def query_counter(engine) -> QueryCounter:
+    return QueryCounter(engine)
+
+
 @pytest.fixture()
 def fake_google_oauth() -> FakeGoogleOAuthClient:
     return FakeGoogleOAuthClient()
@@ -84,9 +124,13 @@ def client(db_session: Session, fake_google_oauth: FakeGoogleOAuthClient) -> Gen
         return fake_google_oauth
 
     app.dependency_overrides[get_google_oauth_client] = override_google_oauth
-    from app.db.session import get_session  # local import to avoid circular
+    def override_get_session_factory() -> sessionmaker:
+        return sessionmaker(bind=db_session.get_bind(), expire_on_commit=False, class_=Session)
+
+    from app.db.session import get_session, get_session_factory  # local import to avoid circular
 
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_session_factory] = override_get_session_factory
 
     with TestClient(app) as test_client:
         yield test_client
@@ -1,9 +1,13 @@
 """Shared helper functions for backend API tests."""
 from __future__ import annotations
 
+from collections.abc import Iterator
+from contextlib import contextmanager
 from uuid import UUID
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
 from app.services.google_oauth import GoogleOAuthUser
@@ -36,3 +40,29 @@ def ensure_user(session: Session, email: str) -> UUID:
     session.commit()
     session.refresh(user)
     return user.id
+
+
+class QueryCounter:
+    """Record SQL statements emitted on an engine while counting is active."""
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, _conn, _cursor, statement, _params, _context, _executemany) -> None:
+        if statement.lstrip().upper().startswith(("SAVEPOINT", "RELEASE", "ROLLBACK")):
+            return
+        self.statements.append(statement)
+
+    @contextmanager
+    def counting(self) -> Iterator["QueryCounter"]:
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._record)
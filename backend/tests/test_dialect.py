@@ -0,0 +1,31 @@
+"""Tests for the dialect-specific statement helpers."""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_mock_engine
+from sqlalchemy.orm import Session
+
+from app.db.dialect import UnsupportedDialectError, insert_ignore, upsert
+from app.models import StandardsCoverage
+
+
+def test_helpers_emit_on_conflict_clauses(db_session: Session) -> None:
+    ignored = str(insert_ignore(db_session, StandardsCoverage))
+    assert "ON CONFLICT DO NOTHING" in ignored
+    counted = str(
+        upsert(
+            db_session,
+            StandardsCoverage,
+            index_elements=("tenant_id", "standard_id", "grade_level"),
+            increment_columns=("lesson_count",),
+        )
+    )
+    assert "ON CONFLICT (tenant_id, standard_id, grade_level) DO UPDATE" in counted
+
+
+def test_helpers_refuse_dialects_without_on_conflict() -> None:
+    session = Session(bind=create_mock_engine("mssql://", lambda *args, **kwargs: None))
+    with pytest.raises(UnsupportedDialectError, match="mssql"):
+        insert_ignore(session, StandardsCoverage)
+    with pytest.raises(UnsupportedDialectError, match="mssql"):
+        upsert(session, StandardsCoverage, index_elements=("tenant_id",))
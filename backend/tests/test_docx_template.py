@@ -0,0 +1,67 @@
+"""Tests for the preloaded DOCX export template."""
+from __future__ import annotations
+
+import io
+
+import pytest
+from docx import Document
+
+from app.services.docx_template import DocxTemplate
+from app.services.export_service import ExportContent, ExportService
+
+
+def _content(title: str) -> ExportContent:
+    return ExportContent(
+        title=title,
+        subject="Science",
+        grade_level="5",
+        objective="Describe the water cycle.",
+        duration_minutes=40,
+        standards=["5-ESS2-1"],
+        materials=["Slides: Water cycle"],
+        flow=["Engage (10 min): Discuss evaporation."],
+        differentiation=[],
+        assessments=[],
+        accommodations=[],
+    )
+
+
+def _paragraphs(data: bytes) -> list[tuple[str, str]]:
+    return [(p.style.name, p.text) for p in Document(io.BytesIO(data)).paragraphs]
+
+
+def _house_template() -> bytes:
+    base = Document()
+    base.add_paragraph("Sample text that should not appear in exports.")
+    base.styles["Heading 1"].font.name = "Georgia"
+    buffer = io.BytesIO()
+    base.save(buffer)
+    return buffer.getvalue()
+
+
+def test_docx_renders_are_independent_and_styled(monkeypatch) -> None:
+    template = DocxTemplate(_house_template())
+    monkeypatch.setattr("app.services.export_service.get_docx_template", lambda: template)
+    service = ExportService(None)
+
+    first = _paragraphs(service._export_docx(_content("Water Cycle")))
+    second = _paragraphs(service._export_docx(_content("Rock Cycle")))
+
+    assert first[0] == ("Heading 1", "Water Cycle")
+    assert second[0] == ("Heading 1", "Rock Cycle")
+    assert len(first) == len(second)
+    assert ("Heading 2", "Standards") in first
+    assert ("List Bullet", "5-ESS2-1") in first
+    assert all("Sample text" not in text for _, text in first)
+    rendered = Document(io.BytesIO(service._export_docx(_content("Water Cycle"))))
+    assert rendered.styles["Heading 1"].font.name == "Georgia"
+
+
+def test_template_missing_required_style_is_rejected() -> None:
+    base = Document()
+    base.styles["List Bullet"].delete()
+    buffer = io.BytesIO()
+    base.save(buffer)
+
+    with pytest.raises(ValueError, match="List Bullet"):
+        DocxTemplate(buffer.getvalue()).new_document()
@@ -0,0 +1,195 @@
+"""Tests for asynchronous export jobs."""
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import ExportJob
+from app.services import export_job_service
+from app.services.export_job_service import ExportJobService
+
+from .helpers import ensure_user, login_user
+
+
+def _create_lesson(client: TestClient, title: str) -> str:
+    response = client.post(
+        "/lessons",
+        json={
+            "title": title,
+            "subject": "Science",
+            "grade_level": "5",
+            "objective": f"Explore {title.lower()}.",
+            "flow": [{"phase": "Engage", "minutes": 10, "content_md": "Warm-up."}],
+        },
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_packet_export_job_produces_pdf(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    ensure_user(db_session, "coach@example.edu")
+    login_user(client, fake_google_oauth, "coach@example.edu")
+    lesson_ids = [_create_lesson(client, title) for title in ("Erosion", "Weathering", "Deposition")]
+
+    response = client.post("/exports/packet", json={"lesson_ids": lesson_ids, "title": "Unit 4"})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["kind"] == "packet"
+    # Prepared, then rendered: no per-section steps that finish before the render.
+    assert (job["progress_done"], job["progress_total"]) == (0, 2)
+
+    status_response = client.get(f"/exports/{job['id']}")
+    assert status_response.status_code == 200
+    job = status_response.json()
+    assert job["status"] == "completed", job
+    assert job["progress_done"] == job["progress_total"]
+    assert f"/exports/{job['id']}/file?token=" in job["download_url"]
+
+    download = client.get(f"/exports/{job['id']}/download")
+    assert download.status_code == 200
+    assert download.headers["content-type"] == "application/pdf"
+    assert download.headers["content-disposition"].endswith('unit-4.pdf"')
+    assert download.content.startswith(b"%PDF")
+    # Cover, contents and one page per lesson.
+    assert download.content.count(b"/Type /Page\n") >= len(lesson_ids) + 2
+    assert int(download.headers["content-length"]) == job["size_bytes"]
+
+
+def test_packet_export_rejects_unknown_lessons(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    ensure_user(db_session, "coach2@example.edu")
+    login_user(client, fake_google_oauth, "coach2@example.edu")
+    lesson_id = _create_lesson(client, "Erosion")
+
+    response = client.post(
+        "/exports/packet", json={"lesson_ids": [lesson_id, str(uuid.uuid4())]}
+    )
+    assert response.status_code == 404
+    assert client.get(f"/exports/{uuid.uuid4()}").status_code == 404
+
+
+def test_lesson_export_job_with_signed_download_link(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    ensure_user(db_session, "async.export@example.edu")
+    login_user(client, fake_google_oauth, "async.export@example.edu")
+    lesson_id = _create_lesson(client, "Erosion")
+
+    response = client.post(f"/lessons/{lesson_id}/exports", json={"format": "docx"})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["location"].endswith(f"/exports/{job_id}")
+
+    job = client.get(f"/exports/{job_id}").json()
+    assert job["status"] == "completed", job
+    assert job["expires_at"] is not None
+    download_url = job["download_url"]
+
+    client.cookies.clear()
+    download = client.get(download_url)
+    assert download.status_code == 200
+    assert "wordprocessingml" in download.headers["content-type"]
+    assert download.content.startswith(b"PK")
+    assert client.get(download_url.replace("token=", "token=x")).status_code == 403
+    assert client.get(f"/exports/{job_id}/file", params={"token": "forged"}).status_code == 403
+
+    # Expired results stop downloading and are swept with their blobs.
+    job_row = db_session.get(ExportJob, uuid.UUID(job_id))
+    job_row.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    db_session.commit()
+    assert client.get(download_url).status_code == 409
+
+    service = ExportJobService(db_session)
+    blob_key = job_row.blob_key
+    assert service.purge_expired() == 1
+    assert service.store.local_path(blob_key) is None
+    assert db_session.get(ExportJob, uuid.UUID(job_id)) is None
+
+
+def test_lesson_export_job_rejects_unknown_format(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    ensure_user(db_session, "async.bad@example.edu")
+    login_user(client, fake_google_oauth, "async.bad@example.edu")
+    lesson_id = _create_lesson(client, "Erosion")
+
+    response = client.post(f"/lessons/{lesson_id}/exports", json={"format": "rtf"})
+    assert response.status_code == 400
+
+
+def test_worker_runs_queued_jobs_and_recovers_abandoned_ones(
+    client: TestClient, db_session: Session, fake_google_oauth, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "export_jobs_in_process", False)
+    ensure_user(db_session, "async.worker@example.edu")
+    login_user(client, fake_google_oauth, "async.worker@example.edu")
+    lesson_id = _create_lesson(client, "Erosion")
+
+    response = client.post(f"/lessons/{lesson_id}/exports", json={"format": "markdown"})
+    job = db_session.get(ExportJob, uuid.UUID(response.json()["id"]))
+    assert job.status == "queued"
+
+    # A runner that died mid-job leaves the row processing with an old heartbeat.
+    now = datetime.now(timezone.utc)
+    stale = now - timedelta(seconds=settings.export_job_stale_seconds + 1)
+    job.status, job.attempts, job.heartbeat_at = "processing", 1, stale
+    db_session.commit()
+    service = ExportJobService(db_session)
+    assert service.recover_stale(now=now) == 1
+    assert job.status == "queued"
+
+    assert service.run_next() is True
+    assert job.status == "completed"
+    assert job.attempts == 2
+    assert service.run_next() is False
+
+    # Jobs out of attempts, and any stale job when no worker runs, are failed.
+    job.status, job.heartbeat_at = "processing", stale
+    job.attempts = settings.export_job_max_attempts
+    db_session.commit()
+    assert service.recover_stale(now=now) == 1
+    assert job.status == "failed"
+    assert job.error_message == "Export was interrupted"
+
+    job.status, job.created_at = "queued", stale
+    db_session.commit()
+    assert service.recover_stale(requeue=False, now=now) == 1
+    assert job.status == "failed"
+
+
+def test_slow_packet_render_outlives_the_stale_window(
+    client: TestClient, db_session: Session, fake_google_oauth, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "export_jobs_in_process", False)
+    monkeypatch.setattr(settings, "export_job_stale_seconds", 1)
+    ensure_user(db_session, "slow.packet@example.edu")
+    login_user(client, fake_google_oauth, "slow.packet@example.edu")
+    lesson_ids = [_create_lesson(client, title) for title in ("Erosion", "Weathering")]
+    response = client.post("/exports/packet", json={"lesson_ids": lesson_ids})
+    job = db_session.get(ExportJob, uuid.UUID(response.json()["id"]))
+    service = ExportJobService(db_session)
+    recovered: list[int] = []
+
+    class SlowPool:
+        def run(self, fn, *args, heartbeat=None, heartbeat_interval=None, **kwargs):
+            # Render for 2.5 stale windows, sweeping for abandoned jobs as another worker would.
+            deadline = time.monotonic() + 2.5
+            while time.monotonic() < deadline:
+                time.sleep(heartbeat_interval)
+                heartbeat()
+                recovered.append(ExportJobService(db_session).recover_stale())
+            return b"%PDF-slow"
+
+    monkeypatch.setattr(export_job_service, "get_render_pool", SlowPool)
+    assert service.run_next() is True
+    assert job.status == "completed"
+    assert job.attempts == 1
+    assert recovered and not any(recovered)
@@ -1,9 +1,22 @@
 """Tests for lesson export endpoints."""
 from __future__ import annotations
 
+import io
+import json
+import zipfile
+from concurrent.futures import Future
+from uuid import UUID
+
 from fastapi.testclient import TestClient
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.models import ExportCacheEntry, ExportCacheUsage
+from app.services import render_pool
+from app.services.export_cache import ExportCacheService
+from app.services.export_service import ExportContent, ExportService, render_export
+from app.services.render_pool import RenderPool, RenderPoolBusy, RenderTimeout
 from app.services.user_service import UserService
 
 from .test_lessons import login_user
@@ -73,3 +86,309 @@ def test_export_gdoc(client: TestClient, db_session: Session, fake_google_oauth)
     payload = response.json()
     assert payload["status"] == "ready"
     assert payload["title"]
+
+
+def test_export_uses_restored_current_version(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    ensure_user(db_session, "restored@example.edu")
+    login_user(client, fake_google_oauth, "restored@example.edu")
+
+    lesson_id = _create_lesson(client)
+    response = client.post(
+        f"/lessons/{lesson_id}/versions",
+        json={"objective": "Students will diagram the water cycle."},
+    )
+    assert response.status_code == 201
+    assert client.post(f"/lessons/{lesson_id}/restore/1").status_code == 200
+
+    response = client.get(f"/lessons/{lesson_id}/export", params={"format": "gdoc"})
+    assert response.status_code == 200
+    objective = response.json()["sections"]["objective"]
+    assert objective == "Students will describe the stages of the water cycle."
+
+
+def test_export_archive_streams_zip_in_stable_order(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    ensure_user(db_session, "archive@example.edu")
+    login_user(client, fake_google_oauth, "archive@example.edu")
+
+    for title, subject in (("Volcanoes", "Science"), ("Atoms", "Science"), ("Ratios", "Math")):
+        response = client.post(
+            "/lessons",
+            json={"title": title, "subject": subject, "grade_level": "6", "objective": f"Study {title}."},
+        )
+        assert response.status_code == 201
+
+    response = client.get("/lessons/export-archive", params={"format": "json", "subject": "Science"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.namelist() == ["0001-atoms.json", "0002-volcanoes.json"]
+        member = json.loads(archive.read("0002-volcanoes.json"))
+    assert member["objective"] == "Study Volcanoes."
+
+    response = client.get("/lessons/export-archive", params={"format": "pdf"})
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        names = archive.namelist()
+        assert names == ["0001-atoms.pdf", "0002-ratios.pdf", "0003-volcanoes.pdf"]
+        assert all(archive.read(name).startswith(b"%PDF") for name in names)
+
+    response = client.get("/lessons/export-archive", params={"format": "gdoc"})
+    assert response.status_code == 400
+
+
+def _archive_content(title: str) -> ExportContent:
+    return ExportContent(
+        title=title,
+        subject="Science",
+        grade_level="6",
+        objective="Observe.",
+        duration_minutes=None,
+        standards=[],
+        materials=[],
+        flow=[],
+        differentiation=[],
+        assessments=[],
+        accommodations=[],
+    )
+
+
+def test_archive_pulls_members_lazily_within_its_render_window() -> None:
+    pulled: list[int] = []
+
+    def members():
+        for index in range(5):
+            pulled.append(index)
+            yield f"{index:04d}", _archive_content(f"Lesson {index}")
+
+    chunks = ExportService(None).iter_archive(members(), "json", window=2)
+    first = next(chunks)
+    assert pulled == [0, 1]
+    with zipfile.ZipFile(io.BytesIO(first + b"".join(chunks))) as archive:
+        assert archive.namelist() == [f"{index:04d}.json" for index in range(5)]
+        assert json.loads(archive.read("0004.json"))["title"] == "Lesson 4"
+
+
+def test_archive_lists_failed_members_in_errors_file(monkeypatch) -> None:
+    class FlakyPool:
+        def submit(self, fn, content, format_name, wait=None):
+            if content.title == "Lesson 1":
+                raise RenderPoolBusy("Render pool is busy")
+            future: Future = Future()
+            if content.title == "Lesson 2":
+                future.set_exception(RenderTimeout("Render timed out"))
+            else:
+                future.set_result(fn(content, format_name))
+            return future
+
+        def result(self, future):
+            return future.result()
+
+    monkeypatch.setattr(render_pool, "get_render_pool", lambda: FlakyPool())
+
+    def members():
+        for index in range(4):
+            yield f"{index:04d}", _archive_content(f"Lesson {index}")
+
+    data = b"".join(ExportService(None).iter_archive(members(), "json", window=2))
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ["0000.json", "0003.json", "errors.txt"]
+        assert archive.read("errors.txt").decode().splitlines() == [
+            "0001.json: Render pool is busy",
+            "0002.json: Render timed out",
+        ]
+
+
+def test_repeat_export_is_served_from_render_cache(
+    client: TestClient, db_session: Session, fake_google_oauth, monkeypatch
+) -> None:
+    ensure_user(db_session, "cache@example.edu")
+    login_user(client, fake_google_oauth, "cache@example.edu")
+    lesson_id = _create_lesson(client)
+
+    renders: list[str] = []
+
+    def counting_render(self, content, format_name):
+        renders.append(format_name)
+        return render_export(content, format_name)
+
+    monkeypatch.setattr(RenderPool, "render", counting_render)
+
+    first = client.get(f"/lessons/{lesson_id}/export", params={"format": "pdf"})
+    second = client.get(f"/lessons/{lesson_id}/export", params={"format": "pdf"})
+    assert first.status_code == second.status_code == 200
+    assert renders == ["pdf"]
+    assert second.content == first.content
+    assert second.headers["content-length"] == str(len(first.content))
+    etag = second.headers["etag"]
+    assert etag == first.headers["etag"] and not etag.startswith("W/")
+
+    not_modified = client.get(
+        f"/lessons/{lesson_id}/export",
+        params={"format": "pdf"},
+        headers={"If-None-Match": etag},
+    )
+    assert not_modified.status_code == 304
+    assert renders == ["pdf"]
+
+    client.post(f"/lessons/{lesson_id}/versions", json={"objective": "Trace a raindrop."})
+    revised = client.get(f"/lessons/{lesson_id}/export", params={"format": "pdf"})
+    assert revised.headers["etag"] != etag
+    assert renders == ["pdf", "pdf"]
+
+
+def test_render_cache_evicts_least_recently_used(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    ensure_user(db_session, "evict@example.edu")
+    login_user(client, fake_google_oauth, "evict@example.edu")
+    lesson_id = _create_lesson(client)
+
+    pdf = client.get(f"/lessons/{lesson_id}/export", params={"format": "pdf"})
+    docx = client.get(f"/lessons/{lesson_id}/export", params={"format": "docx"})
+    # Touch the PDF so the DOCX becomes the least recently used entry.
+    client.get(f"/lessons/{lesson_id}/export", params={"format": "pdf"})
+    pdf_key, docx_key = pdf.headers["etag"].strip('"'), docx.headers["etag"].strip('"')
+
+    cache = ExportCacheService(db_session)
+    assert cache.evict(max_bytes=len(pdf.content) + len(docx.content)) == []
+    assert cache.evict(max_bytes=len(pdf.content)) == [docx_key]
+
+    remaining = db_session.execute(select(ExportCacheEntry.cache_key)).scalars().all()
+    assert remaining == [pdf_key]
+    assert cache.store.local_path(docx_key) is None
+    assert cache.store.local_path(pdf_key) is not None
+
+
+def test_cache_writes_track_usage_and_evict_in_small_batches(
+    client: TestClient, db_session: Session, fake_google_oauth, query_counter, monkeypatch
+) -> None:
+    ensure_user(db_session, "usage@example.edu")
+    login_user(client, fake_google_oauth, "usage@example.edu")
+    lesson_id = _create_lesson(client)
+    version_id = UUID(client.get(f"/lessons/{lesson_id}").json()["current_version_id"])
+    monkeypatch.setattr(settings, "export_cache_max_bytes", 1000)
+    cache = ExportCacheService(db_session)
+
+    with query_counter.counting():
+        for index in range(3):
+            cache.put(f"key-{index}", version_id, "pdf", b"x" * 300)
+    # Under the bound, writes only bump the running total.
+    assert not [sql for sql in query_counter.statements if "sum(" in sql.lower()]
+    assert db_session.scalar(select(ExportCacheUsage.total_bytes)) == 900
+
+    cache.put("key-3", version_id, "pdf", b"x" * 300)
+    # Over the bound: the oldest entry goes, leaving 90% of the bound.
+    keys = db_session.execute(select(ExportCacheEntry.cache_key)).scalars().all()
+    assert sorted(keys) == ["key-1", "key-2", "key-3"]
+    assert db_session.scalar(select(ExportCacheUsage.total_bytes)) == 900
+
+
+def test_export_returns_503_when_render_queue_is_full(
+    client: TestClient, db_session: Session, fake_google_oauth, monkeypatch
+) -> None:
+    ensure_user(db_session, "busy@example.edu")
+    login_user(client, fake_google_oauth, "busy@example.edu")
+    lesson_id = _create_lesson(client)
+
+    def busy_render(self, content, format_name):
+        raise RenderPoolBusy("Export render queue is full")
+
+    monkeypatch.setattr(RenderPool, "render", busy_render)
+    response = client.get(f"/lessons/{lesson_id}/export", params={"format": "docx"})
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) > 0
+
+
+def test_new_versions_prerender_tenant_preferred_formats(
+    client: TestClient, db_session: Session, fake_google_oauth, monkeypatch
+) -> None:
+    ensure_user(db_session, "prerender@example.edu")
+    login_user(client, fake_google_oauth, "prerender@example.edu")
+    lesson_id = _create_lesson(client)
+
+    renders: list[str] = []
+
+    def counting_render(self, content, format_name):
+        renders.append(format_name)
+        return render_export(content, format_name)
+
+    monkeypatch.setattr(RenderPool, "render", counting_render)
+    for format_name in ("docx", "docx", "pdf", "gdoc"):
+        client.get(f"/lessons/{lesson_id}/export", params={"format": format_name})
+    client.post(f"/lessons/{lesson_id}/versions", json={"objective": "No pre-render yet."})
+    assert renders == ["docx", "pdf"]
+
+    monkeypatch.setattr(settings, "export_prerender_enabled", True)
+    monkeypatch.setattr(settings, "export_prerender_max_formats", 1)
+    response = client.post(f"/lessons/{lesson_id}/differentiate", json={"audience": "ELL"})
+    assert response.status_code == 201
+    assert renders == ["docx", "pdf", "docx"]
+
+    cached = db_session.execute(
+        select(ExportCacheEntry.format).where(
+            ExportCacheEntry.lesson_version_id == UUID(response.json()["id"])
+        )
+    ).scalars().all()
+    assert cached == ["docx"]
+
+    download = client.get(f"/lessons/{lesson_id}/export", params={"format": "docx"})
+    assert download.status_code == 200
+    assert renders == ["docx", "pdf", "docx"]
+
+
+def test_html_preview_is_cached_with_compressed_variants(
+    client: TestClient, db_session: Session, fake_google_oauth, monkeypatch
+) -> None:
+    ensure_user(db_session, "preview@example.edu")
+    login_user(client, fake_google_oauth, "preview@example.edu")
+    lesson_id = client.post(
+        "/lessons",
+        json={
+            "title": "Fractions <Intro>",
+            "subject": "Math",
+            "grade_level": "4",
+            "teacher_script_md": "### Engage\nCompare **unlike** fractions.",
+            "flow": [{"phase": "Engage", "minutes": 10, "content_md": "Number line."}],
+        },
+    ).json()["id"]
+    version_id = client.get(f"/lessons/{lesson_id}").json()["current_version_id"]
+    url = f"/lessons/{lesson_id}/versions/{version_id}/preview"
+
+    renders: list[str] = []
+    original_render = ExportService.render
+
+    def counting_render(self, content, format_name):
+        renders.append(format_name)
+        return original_render(self, content, format_name)
+
+    monkeypatch.setattr(ExportService, "render", counting_render)
+
+    first = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["content-type"].startswith("text/html")
+    assert first.headers["content-encoding"] == "gzip"
+    # Standards alignment changes a version's preview: revalidate, never immutable.
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert "<h1>Fractions &lt;Intro&gt;</h1>" in first.text
+    assert "<strong>unlike</strong>" in first.text
+
+    identity = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.text == first.text
+    assert identity.headers["etag"] != first.headers["etag"]
+    assert renders == ["html"]
+
+    not_modified = client.get(
+        url, headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]}
+    )
+    assert not_modified.status_code == 304
+
+    markdown = client.get(url, params={"format": "markdown"})
+    assert markdown.text.startswith("# Fractions <Intro>\n")
+    assert "## Teacher Script" in markdown.text
+    assert client.get(url, params={"format": "rtf"}).status_code == 400
@@ -88,3 +88,72 @@ def test_gen_job_creates_lesson(client: TestClient, db_session: Session, fake_go
     lesson = db_session.get(Lesson, job.lesson_id)
     assert lesson is not None
     assert lesson.versions
+
+
+def test_gen_job_aligns_to_model_suggested_codes(
+    client: TestClient, db_session: Session, fake_google_oauth, monkeypatch, query_counter
+) -> None:
+    from app.services.generation_service import GenerationService
+
+    ensure_user(db_session, "generator@example.edu")
+    ensure_standard(db_session)
+    framework = db_session.query(StandardsFramework).filter_by(code="NGSS").one()
+    db_session.add(
+        Standard(
+            framework_id=framework.id,
+            code="MS-ESS1-1",
+            description="Develop and use a model of the Earth-sun-moon system.",
+            subject="Science",
+            grade_band="6-8",
+            tags=["moon"],
+        )
+    )
+    db_session.commit()
+
+    original = GenerationService._fallback_content
+
+    def model_output(self, generation_input):
+        content = original(self, generation_input)
+        # Spellings differ from the catalog in case, punctuation and prefix.
+        content["suggested_standards"] = ["ngss.ms.ess1.1", {"code": "5-ESS1-1"}, "X-UNKNOWN-9"]
+        return content
+
+    monkeypatch.setattr(GenerationService, "_fallback_content", model_output)
+
+    async def exchange(_request) -> GoogleOAuthUser:
+        return GoogleOAuthUser(
+            email="generator@example.edu",
+            full_name="Taylor Teacher",
+            subject="fake-subject",
+            picture=None,
+        )
+
+    fake_google_oauth.exchange_code = exchange  # type: ignore[assignment]
+    state = client.get("/auth/login").json()["state"]
+    client.get("/auth/callback", params={"state": state}, allow_redirects=False)
+
+    payload = {
+        "subject": "Science",
+        "grade_level": "5",
+        "topic": "Phases of the Moon",
+        "duration_minutes": 45,
+        "teaching_style": "inquiry",
+        "standard_codes": ["ms ess1 1"],
+        "standard_framework": "ngss",
+    }
+    assert client.post("/gen-jobs/", json=payload).status_code == 201
+
+    # The code map is now warm: resolving needs no catalog query.
+    db_session.expire_all()
+    with query_counter.counting():
+        response = client.post("/gen-jobs/", json=payload)
+    assert [standard["code"] for standard in response.json()["standards"]] == [
+        "MS-ESS1-1",
+        "NGSS 5-ESS1-1",
+    ]
+    catalog_reads = [
+        sql
+        for sql in query_counter.statements
+        if "standards_frameworks" in sql and "JOIN" in sql.upper()
+    ]
+    assert catalog_reads == []
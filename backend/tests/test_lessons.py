@@ -1,14 +1,17 @@
 """Tests for lesson management APIs."""
 from __future__ import annotations
 
+import json
 from uuid import UUID
 
 from fastapi.testclient import TestClient
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.models.lesson import Lesson, LessonVersion
 from app.models.metrics import MetricsDaily
+from app.services.lesson_service import LessonService
 
 from .helpers import ensure_user, login_user
 
@@ -163,3 +166,144 @@ def test_differentiate_lesson_adds_supports_and_logs_metric(
         )
     ).scalar_one()
     assert metric.value == 1
+
+
+def test_lesson_list_and_detail_support_conditional_get(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    ensure_user(db_session, "etag.teacher@example.edu")
+    login_user(client, fake_google_oauth, "etag.teacher@example.edu")
+
+    create_response = client.post(
+        "/lessons",
+        json={"title": "Plate Tectonics", "subject": "Science", "grade_level": "6"},
+    )
+    lesson_id = create_response.json()["id"]
+
+    list_response = client.get("/lessons")
+    assert list_response.status_code == 200
+    list_etag = list_response.headers["etag"]
+    cached_list = client.get("/lessons", headers={"If-None-Match": list_etag})
+    assert cached_list.status_code == 304
+    assert cached_list.headers["etag"] == list_etag
+    filtered = client.get("/lessons", params={"subject": "Math"}, headers={"If-None-Match": list_etag})
+    assert filtered.status_code == 200
+
+    detail_response = client.get(f"/lessons/{lesson_id}")
+    assert detail_response.status_code == 200
+    detail_etag = detail_response.headers["etag"]
+    cached_detail = client.get(f"/lessons/{lesson_id}", headers={"If-None-Match": detail_etag})
+    assert cached_detail.status_code == 304
+    assert cached_detail.content == b""
+
+    client.post(f"/lessons/{lesson_id}/versions", json={"objective": "Map plate boundaries."})
+    refreshed = client.get(f"/lessons/{lesson_id}", headers={"If-None-Match": detail_etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != detail_etag
+    assert len(refreshed.json()["versions"]) == 2
+
+
+def test_bulk_import_streams_ndjson_in_batches(
+    client: TestClient, db_session: Session, fake_google_oauth, monkeypatch
+) -> None:
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "lesson_import_batch_size", 2)
+    ensure_user(db_session, "import.teacher@example.edu")
+    login_user(client, fake_google_oauth, "import.teacher@example.edu")
+
+    lines = [
+        json.dumps(
+            {
+                "title": f"Imported {index}",
+                "subject": "History",
+                "grade_level": "7",
+                "objective": f"Objective {index}",
+                "flow": [{"phase": "Engage", "minutes": 5, "content_md": "Hook."}],
+                "blocks": [{"block_type": "content", "content_md": "Primary source."}],
+            }
+        )
+        for index in range(5)
+    ]
+    lines.insert(2, "{not json")
+    lines.insert(4, json.dumps({"title": "Missing subject", "grade_level": "7"}))
+    lines.insert(5, "")
+
+    def body():
+        for line in lines:
+            yield (line + "\n").encode()
+
+    response = client.post("/lessons/import", content=body())
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 5
+    assert report["failed"] == 2
+    assert [error["line"] for error in report["errors"]] == [3, 5]
+    assert "subject" in report["errors"][1]["error"]
+
+    listing = client.get("/lessons", params={"subject": "History"}).json()
+    assert sorted(lesson["title"] for lesson in listing) == [f"Imported {i}" for i in range(5)]
+    detail = client.get(f"/lessons/{listing[0]['id']}").json()
+    assert detail["current_version_id"] == detail["versions"][0]["id"]
+    assert detail["versions"][0]["flow"][0]["phase"] == "Engage"
+
+    lesson = db_session.get(Lesson, UUID(listing[0]["id"]))
+    assert lesson is not None
+    assert lesson.next_version_no == 2
+    assert len(lesson.versions[0].blocks) == 1
+
+
+def test_bulk_import_reports_a_rejected_batch_and_keeps_the_others(
+    client: TestClient, db_session: Session, fake_google_oauth, monkeypatch
+) -> None:
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "lesson_import_batch_size", 2)
+    ensure_user(db_session, "rejected.import@example.edu")
+    login_user(client, fake_google_oauth, "rejected.import@example.edu")
+
+    original = LessonService.bulk_create_lessons
+    calls: list[int] = []
+
+    def failing_second_batch(self, owner, payloads):
+        calls.append(len(payloads))
+        created = original(self, owner=owner, payloads=payloads)
+        if len(calls) == 2:
+            raise IntegrityError("INSERT INTO lessons", {}, Exception("duplicate key"))
+        return created
+
+    monkeypatch.setattr(LessonService, "bulk_create_lessons", failing_second_batch)
+    lines = [
+        json.dumps({"title": f"Batch {index}", "subject": "Geography", "grade_level": "8"})
+        for index in range(5)
+    ]
+    response = client.post("/lessons/import", content="\n".join(lines).encode())
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["imported"], report["failed"]) == (3, 2)
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    assert "IntegrityError" in report["errors"][0]["error"]
+
+    listing = client.get("/lessons", params={"subject": "Geography"}).json()
+    assert sorted(lesson["title"] for lesson in listing) == ["Batch 0", "Batch 1", "Batch 4"]
+
+
+def test_copy_csv_writes_none_as_null_and_quotes_values() -> None:
+    # Postgres COPY (FORMAT csv) reads a bare empty field as NULL and "" as an empty string.
+    columns = ["objective", "duration_minutes", "teacher_script_md", "flow"]
+    rows = [
+        {
+            "objective": 'Say "hi", then go',
+            "duration_minutes": None,
+            "teacher_script_md": None,
+            "flow": [],
+        },
+        {"objective": "", "duration_minutes": 45, "teacher_script_md": "A\nB", "flow": [{"a": 1}]},
+    ]
+
+    buffer = LessonService._copy_csv(LessonVersion.__table__, columns, rows)
+
+    assert buffer.read() == (
+        '"Say ""hi"", then go",,,"[]"\n'
+        '"","45","A\nB","[{""a"": 1}]"\n'
+    )
@@ -0,0 +1,53 @@
+"""Tests for the lesson preview Markdown renderer."""
+from __future__ import annotations
+
+from app.services.export_cache import negotiate_encoding
+from app.services.markdown_render import render_markdown
+
+
+def test_render_markdown_subset_and_escaping() -> None:
+    rendered = render_markdown(
+        "### Engage\n"
+        "Compare **unlike** fractions with `1/2 < 2/3` and *thirds*.\n"
+        "\n"
+        "- Read [the guide](https://example.edu/guide)\n"
+        "- Avoid <script>alert(1)</script>\n"
+        "1. First\n"
+        "```\n"
+        "a < b\n"
+        "```\n"
+        "snake_case_name stays plain"
+    )
+    assert rendered.splitlines() == [
+        "<h3>Engage</h3>",
+        "<p>Compare <strong>unlike</strong> fractions with <code>1/2 &lt; 2/3</code>"
+        " and <em>thirds</em>.</p>",
+        "<ul>",
+        '<li>Read <a href="https://example.edu/guide">the guide</a></li>',
+        "<li>Avoid &lt;script&gt;alert(1)&lt;/script&gt;</li>",
+        "</ul>",
+        "<ol>",
+        "<li>First</li>",
+        "</ol>",
+        "<pre><code>a &lt; b</code></pre>",
+        "<p>snake_case_name stays plain</p>",
+    ]
+    assert "<a" not in render_markdown("[x](javascript:alert(1))")
+
+
+def test_links_keep_their_hrefs_and_stay_on_site() -> None:
+    assert render_markdown("See [*the* map](https://example.edu/a_b_c/x*y*z) _now_") == (
+        '<p>See <a href="https://example.edu/a_b_c/x*y*z"><em>the</em> map</a> <em>now</em></p>'
+    )
+    assert render_markdown("[unit](/units/my_unit_1) and [`code`](/x)") == (
+        '<p><a href="/units/my_unit_1">unit</a> and <a href="/x"><code>code</code></a></p>'
+    )
+    assert "<a" not in render_markdown("[x](//evil.example/path)")
+    assert render_markdown("a\x000\x00b") == "<p>a0b</p>"
+
+
+def test_negotiate_encoding() -> None:
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("*") in {"br", "gzip"}
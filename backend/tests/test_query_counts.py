@@ -0,0 +1,187 @@
+"""Query budget tests guarding lesson read paths against N+1 regressions."""
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.version_content import content_cache
+
+from .helpers import QueryCounter, ensure_user, login_user
+
+# Maximum statements per request, including the two issued by authentication.
+QUERY_BUDGETS = {
+    "detail": 6,
+    "detail_not_modified": 3,
+    "export": 8,  # includes the delta chain load on a cold content cache
+    "share": 8,
+    "lms_push": 10,
+}
+
+
+def _create_lesson_with_versions(client: TestClient, version_count: int) -> str:
+    response = client.post(
+        "/lessons",
+        json={
+            "title": "Ecosystems",
+            "subject": "Science",
+            "grade_level": "5",
+            "objective": "Model energy flow in an ecosystem.",
+            "flow": [{"phase": "Engage", "minutes": 5, "content_md": "Food web warm-up."}],
+        },
+    )
+    assert response.status_code == 201
+    lesson_id = response.json()["id"]
+    for index in range(2, version_count + 1):
+        response = client.post(
+            f"/lessons/{lesson_id}/versions",
+            json={"objective": f"Revision {index}"},
+        )
+        assert response.status_code == 201
+    return lesson_id
+
+
+def _measure(
+    client: TestClient,
+    db_session: Session,
+    query_counter: QueryCounter,
+    method: str,
+    url: str,
+    **kwargs,
+) -> int:
+    # Mimic a fresh worker: nothing served from the identity map or the content cache.
+    db_session.expire_all()
+    content_cache.clear()
+    with query_counter.counting():
+        response = client.request(method, url, **kwargs)
+    assert response.status_code < 300, response.text
+    return query_counter.count
+
+
+@pytest.mark.parametrize("version_count", [1, 4])
+def test_lesson_detail_query_budget(
+    client: TestClient,
+    db_session: Session,
+    fake_google_oauth,
+    query_counter: QueryCounter,
+    version_count: int,
+) -> None:
+    ensure_user(db_session, "budget.detail@example.edu")
+    login_user(client, fake_google_oauth, "budget.detail@example.edu")
+    lesson_id = _create_lesson_with_versions(client, version_count)
+
+    count = _measure(client, db_session, query_counter, "GET", f"/lessons/{lesson_id}")
+    assert count <= QUERY_BUDGETS["detail"], query_counter.statements
+
+
+def test_lesson_detail_not_modified_query_budget(
+    client: TestClient,
+    db_session: Session,
+    fake_google_oauth,
+    query_counter: QueryCounter,
+) -> None:
+    ensure_user(db_session, "budget.etag@example.edu")
+    login_user(client, fake_google_oauth, "budget.etag@example.edu")
+    lesson_id = _create_lesson_with_versions(client, 3)
+    etag = client.get(f"/lessons/{lesson_id}").headers["etag"]
+
+    db_session.expire_all()
+    with query_counter.counting():
+        response = client.get(f"/lessons/{lesson_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert query_counter.count <= QUERY_BUDGETS["detail_not_modified"], query_counter.statements
+
+
+@pytest.mark.parametrize("version_count", [1, 4])
+def test_lesson_export_query_budget(
+    client: TestClient,
+    db_session: Session,
+    fake_google_oauth,
+    query_counter: QueryCounter,
+    version_count: int,
+) -> None:
+    ensure_user(db_session, "budget.export@example.edu")
+    login_user(client, fake_google_oauth, "budget.export@example.edu")
+    lesson_id = _create_lesson_with_versions(client, version_count)
+
+    count = _measure(
+        client,
+        db_session,
+        query_counter,
+        "GET",
+        f"/lessons/{lesson_id}/export",
+        params={"format": "gdoc"},
+    )
+    assert count <= QUERY_BUDGETS["export"], query_counter.statements
+
+
+@pytest.mark.parametrize("version_count", [1, 4])
+def test_lesson_share_query_budget(
+    client: TestClient,
+    db_session: Session,
+    fake_google_oauth,
+    query_counter: QueryCounter,
+    version_count: int,
+) -> None:
+    ensure_user(db_session, "budget.share@example.edu")
+    login_user(client, fake_google_oauth, "budget.share@example.edu")
+    lesson_id = _create_lesson_with_versions(client, version_count)
+
+    count = _measure(
+        client,
+        db_session,
+        query_counter,
+        "POST",
+        f"/lessons/{lesson_id}/share",
+        json={"expires_in_hours": 24},
+    )
+    assert count <= QUERY_BUDGETS["share"], query_counter.statements
+
+
+@pytest.mark.parametrize("version_count", [1, 4])
+def test_lms_push_query_budget(
+    client: TestClient,
+    db_session: Session,
+    fake_google_oauth,
+    query_counter: QueryCounter,
+    version_count: int,
+) -> None:
+    ensure_user(db_session, "budget.lms@example.edu")
+    login_user(client, fake_google_oauth, "budget.lms@example.edu")
+    connect = client.post(
+        "/lms/google-classroom/connect",
+        json={"access_token": "mock-access", "expires_in": 3600},
+    )
+    assert connect.status_code == 201
+    lesson_id = _create_lesson_with_versions(client, version_count)
+
+    count = _measure(
+        client,
+        db_session,
+        query_counter,
+        "POST",
+        "/lms/google-classroom/push",
+        json={"lesson_id": lesson_id, "course_id": "course-1"},
+    )
+    assert count <= QUERY_BUDGETS["lms_push"], query_counter.statements
+
+
+def test_archive_query_count_does_not_grow_with_lessons(
+    client: TestClient,
+    db_session: Session,
+    fake_google_oauth,
+    query_counter: QueryCounter,
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(settings, "lesson_version_snapshot_interval", 10)
+    ensure_user(db_session, "budget.archive@example.edu")
+    login_user(client, fake_google_oauth, "budget.archive@example.edu")
+
+    archive = ("GET", "/lessons/export-archive")
+    _create_lesson_with_versions(client, 4)
+    one_lesson = _measure(client, db_session, query_counter, *archive, params={"format": "json"})
+    for _ in range(3):
+        _create_lesson_with_versions(client, 4)
+    four_lessons = _measure(client, db_session, query_counter, *archive, params={"format": "json"})
+    assert four_lessons == one_lesson, query_counter.statements
@@ -0,0 +1,79 @@
+"""Tests for the export render process pool."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app.services.export_service import ExportContent
+from app.services.render_pool import RenderPool, RenderPoolBusy, RenderTimeout
+
+
+def _content() -> ExportContent:
+    return ExportContent(
+        title="Photosynthesis",
+        subject="Science",
+        grade_level="6",
+        objective="Explain how plants make food.",
+        duration_minutes=45,
+        standards=["MS-LS1-6"],
+        materials=["Slides: Leaf diagrams"],
+        flow=["Engage (5 min): Plant in the dark"],
+        differentiation=[],
+        assessments=[],
+        accommodations=[],
+    )
+
+
+@pytest.fixture()
+def pool():
+    pool = RenderPool(max_workers=1, max_queue=1, timeout=30)
+    yield pool
+    pool.shutdown()
+
+
+def test_render_runs_in_worker_process(pool: RenderPool) -> None:
+    pdf = pool.render(_content(), "pdf")
+    assert pdf.startswith(b"%PDF")
+    docx = pool.render(_content(), "docx")
+    assert docx.startswith(b"PK")
+
+
+def test_render_rejects_when_queue_is_full(pool: RenderPool) -> None:
+    running = pool.submit(time.sleep, 1)
+    queued = pool.submit(time.sleep, 0)
+    with pytest.raises(RenderPoolBusy):
+        pool.render(_content(), "pdf")
+    running.result()
+    queued.result()
+    assert pool.render(_content(), "pdf").startswith(b"%PDF")
+
+
+def test_render_times_out_behind_slow_work(pool: RenderPool) -> None:
+    pool.timeout = 0.2
+    running = pool.submit(time.sleep, 1)
+    with pytest.raises(RenderTimeout):
+        pool.render(_content(), "pdf")
+    running.result()
+
+
+def test_long_renders_call_the_heartbeat_while_waiting(pool: RenderPool) -> None:
+    beats: list[float] = []
+    pool.run(
+        time.sleep, 0.7, heartbeat=lambda: beats.append(time.monotonic()), heartbeat_interval=0.2
+    )
+    assert len(beats) >= 2
+
+
+def test_pool_recovers_after_a_running_render_hangs(pool: RenderPool) -> None:
+    pool.render(_content(), "pdf")  # start the worker
+    pool.timeout = 0.5
+    with pytest.raises(RenderTimeout):
+        pool.run(time.sleep, 30)
+    time.sleep(0.1)
+    # The hung worker is killed before the next render, freeing its slot and process.
+    pool.timeout = 30
+    started = time.monotonic()
+    assert pool.render(_content(), "pdf").startswith(b"%PDF")
+    assert pool.render(_content(), "pdf").startswith(b"%PDF")
+    assert time.monotonic() - started < 20
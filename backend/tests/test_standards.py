@@ -0,0 +1,606 @@
+"""Tests for standards suggestion and search."""
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Lesson,
+    LessonVersion,
+    Standard,
+    StandardClosure,
+    StandardsCoverage,
+    User,
+)
+from app.services.standard_codes import StandardCodeMap
+from app.services.standards_hierarchy import rebuild_closure
+from app.services.blob_store import get_blob_store
+from app.services.standards_index import (
+    SNAPSHOT_NAMESPACE,
+    StandardsIndex,
+    _snapshot_key,
+    get_standards_index,
+    invalidate_standards_index,
+    tokenize,
+)
+from app.services.standards_coverage import StandardsCoverageService
+from app.services.standards_service import StandardsService
+from app.services.user_service import UserService
+
+from .helpers import ensure_user, login_user
+
+
+def _seed_catalog(session: Session) -> None:
+    service = StandardsService(session)
+    framework = service.ensure_framework(code="NGSS", name="Next Generation Science Standards")
+    rows = [
+        ("5-LS2-1", "5", "Develop a model to describe the movement of matter among plants, animals, decomposers, and the environment.", ["ecosystems", "food webs"]),
+        ("5-PS1-1", "5", "Develop a model to describe that matter is made of particles too small to be seen.", ["matter"]),
+        ("5-ESS1-1", "5", "Support an argument that differences in the apparent brightness of the sun compared to other stars is due to their relative distances from Earth.", ["astronomy"]),
+        ("MS-LS2-3", "6-8", "Develop a model to describe the cycling of matter and flow of energy among living and nonliving parts of an ecosystem.", ["ecosystems"]),
+        ("K-2-ETS1-1", None, "Ask questions, make observations, and gather information about a situation people want to change.", ["engineering"]),
+    ]
+    for code, grade_band, description, tags in rows:
+        session.add(
+            Standard(
+                framework_id=framework.id,
+                code=code,
+                subject="Science",
+                grade_band=grade_band,
+                description=description,
+                tags=tags,
+            )
+        )
+    session.commit()
+
+
+def test_tokenize_drops_stopwords_and_punctuation() -> None:
+    assert tokenize("The flow of Energy, in an ecosystem!") == ["flow", "energy", "ecosystem"]
+
+
+def test_suggest_standards_ranks_by_keywords_within_grade(db_session: Session) -> None:
+    _seed_catalog(db_session)
+    service = StandardsService(db_session)
+
+    codes = [
+        standard.code
+        for standard in service.suggest_standards("science", "5", ["food webs", "decomposers"], limit=3)
+    ]
+    # Best match first, then grade 5 and ungraded standards in code order; never grades 6-8.
+    assert codes == ["5-LS2-1", "5-ESS1-1", "5-PS1-1"]
+
+    codes = [standard.code for standard in service.suggest_standards("Science", "5", ["engineering"])]
+    assert codes[0] == "K-2-ETS1-1"
+    assert "MS-LS2-3" not in codes
+    assert service.suggest_standards("History", "5", ["ecosystems"]) == []
+
+
+def test_index_is_rebuilt_after_standards_change(db_session: Session) -> None:
+    _seed_catalog(db_session)
+    service = StandardsService(db_session)
+    assert service.suggest_standards("Science", "5", ["volcano"], limit=1)[0].code != "5-ESS2-9"
+
+    framework_id = db_session.query(Standard).first().framework_id
+    db_session.add(
+        Standard(
+            framework_id=framework_id,
+            code="5-ESS2-9",
+            subject="Science",
+            grade_band="5",
+            description="Explain how volcanoes reshape landforms.",
+            tags=["volcano"],
+        )
+    )
+    db_session.commit()
+    assert service.suggest_standards("Science", "5", ["volcano"], limit=1)[0].code == "5-ESS2-9"
+
+
+def test_index_scores_rare_terms_higher() -> None:
+    common, rare = uuid.uuid4(), uuid.uuid4()
+    index = StandardsIndex.build(
+        [
+            (common, "A-1", "Math", "3", "fractions fractions on a number line", []),
+            (rare, "A-2", "Math", "3", "fractions and area models", ["area"]),
+            (uuid.uuid4(), "A-3", "Math", "3", "fractions as division", []),
+        ]
+    )
+    assert index.search("math", "3", ["area", "fractions"], limit=1) == [rare]
+    assert index.search("math", "3", ["fractions"], limit=1) == [common]
+
+
+def test_index_breaks_score_ties_by_ascending_code_including_prefixes() -> None:
+    longer, prefix, other = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    index = StandardsIndex.build(
+        [
+            # Codes are indexed too: one more description word evens the lengths.
+            (longer, "5-LS2-1", "Science", "5", "ecosystems", []),
+            (other, "5-LS1", "Science", "5", "ecosystems webs", []),
+            (prefix, "5-LS2", "Science", "5", "ecosystems webs", []),
+        ]
+    )
+    assert index.search("science", "5", ["ecosystems"], limit=3) == [other, prefix, longer]
+    assert index.search("science", "5", ["ecosystems"], limit=2) == [other, prefix]
+
+
+def test_index_snapshot_round_trips_through_mmap(db_session: Session, monkeypatch) -> None:
+    _seed_catalog(db_session)
+    expected = get_standards_index(db_session).search("Science", "5", ["ecosystems"], limit=3)
+
+    invalidate_standards_index()
+
+    def fail_rebuild(cls, session):  # pragma: no cover - the snapshot must be used
+        raise AssertionError("index rebuilt instead of mapped from the snapshot")
+
+    monkeypatch.setattr(StandardsIndex, "from_session", classmethod(fail_rebuild))
+    mapped = get_standards_index(db_session)
+    assert mapped.search("Science", "5", ["ecosystems"], limit=3) == expected
+    assert mapped.size == 5
+
+
+def test_index_snapshot_follows_edits_and_drops_superseded_files(db_session: Session) -> None:
+    _seed_catalog(db_session)
+    get_standards_index(db_session)
+    old_key = _snapshot_key(db_session)
+    store = get_blob_store(SNAPSHOT_NAMESPACE)
+    assert store.local_path(old_key) is not None
+
+    standard = db_session.scalars(select(Standard).where(Standard.code == "5-PS1-1")).one()
+    standard.description = "Describe how pollinators help plants reproduce."
+    db_session.flush()
+    invalidate_standards_index()
+
+    new_key = _snapshot_key(db_session)
+    assert new_key != old_key
+    hits = get_standards_index(db_session).search("Science", "5", ["pollinators"], limit=3)
+    assert hits[0] == standard.id
+    assert store.local_path(new_key) is not None
+    assert store.local_path(old_key) is None
+
+
+def test_search_endpoint_matches_codes_and_description_prefixes(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    _seed_catalog(db_session)
+    ensure_user(db_session, "search.teacher@example.edu")
+    login_user(client, fake_google_oauth, "search.teacher@example.edu")
+
+    response = client.get("/standards/search", params={"q": "5-ls"})
+    assert response.status_code == 200
+    assert [hit["code"] for hit in response.json()["items"]] == ["5-LS2-1"]
+    assert set(response.json()["items"][0]) == {"id", "code", "subject", "grade_band", "description"}
+    assert response.headers["cache-control"].startswith("private, max-age=")
+
+    # Code substrings rank ahead of description matches, which accept a trailing prefix.
+    codes = [
+        hit["code"]
+        for hit in client.get("/standards/search", params={"q": "ls2"}).json()["items"]
+    ]
+    assert codes == ["5-LS2-1", "MS-LS2-3"]
+    codes = [
+        hit["code"]
+        for hit in client.get(
+            "/standards/search", params={"q": "model of matt", "grade": "5"}
+        ).json()["items"]
+    ]
+    # 5-PS1-1 mentions matter twice (description and tag), so it scores higher.
+    assert codes == ["5-PS1-1", "5-LS2-1"]
+    assert client.get("/standards/search", params={"q": "decomp"}).json()["items"][0]["code"] == "5-LS2-1"
+    assert client.get("/standards/search", params={"q": "ecosystem", "subject": "Math"}).json() == {
+        "items": [],
+        "next_offset": None,
+    }
+
+
+def test_search_endpoint_paginates_and_revalidates(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    _seed_catalog(db_session)
+    ensure_user(db_session, "search.pages@example.edu")
+    login_user(client, fake_google_oauth, "search.pages@example.edu")
+
+    first = client.get("/standards/search", params={"q": "develop", "limit": 2})
+    assert first.json()["next_offset"] == 2
+    second = client.get("/standards/search", params={"q": "develop", "limit": 2, "offset": 2})
+    assert second.json()["next_offset"] is None
+    codes = [hit["code"] for page in (first, second) for hit in page.json()["items"]]
+    assert sorted(codes) == ["5-LS2-1", "5-PS1-1", "MS-LS2-3"]
+
+    cached = client.get(
+        "/standards/search",
+        params={"q": "develop", "limit": 2},
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert cached.status_code == 304
+
+    # Editing a hit changes the tag even though the page's ids stay the same.
+    first_hit = db_session.get(Standard, uuid.UUID(first.json()["items"][0]["id"]))
+    first_hit.description = f"{first_hit.description} Revised."
+    db_session.commit()
+    edited = client.get(
+        "/standards/search",
+        params={"q": "develop", "limit": 2},
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert edited.status_code == 200
+    assert [hit["id"] for hit in edited.json()["items"]] == [
+        hit["id"] for hit in first.json()["items"]
+    ]
+    assert edited.headers["etag"] != first.headers["etag"]
+
+
+def _create_lesson(client: TestClient, title: str) -> str:
+    response = client.post(
+        "/lessons",
+        json={"title": title, "subject": "Science", "grade_level": "5", "objective": "Model it."},
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _align(db_session: Session, lesson_id: str, code: str) -> None:
+    lesson = db_session.get(Lesson, uuid.UUID(lesson_id))
+    db_session.refresh(lesson)
+    standard_id = db_session.query(Standard.id).filter(Standard.code == code).scalar()
+    StandardsService(db_session).attach_standards(lesson.current_version_id, [standard_id])
+    db_session.commit()
+
+
+def test_lessons_filter_and_coverage_by_standard_use_current_versions(
+    client: TestClient, db_session: Session, fake_google_oauth, query_counter
+) -> None:
+    _seed_catalog(db_session)
+    ensure_user(db_session, "coverage.teacher@example.edu")
+    login_user(client, fake_google_oauth, "coverage.teacher@example.edu")
+    food_webs = _create_lesson(client, "Food Webs")
+    particles = _create_lesson(client, "Particles")
+    _align(db_session, food_webs, "5-LS2-1")
+    _align(db_session, particles, "5-LS2-1")
+    _align(db_session, particles, "5-PS1-1")
+
+    titles = [lesson["title"] for lesson in client.get("/lessons", params={"standard": "5-LS2-1"}).json()]
+    assert sorted(titles) == ["Food Webs", "Particles"]
+    etag = client.get("/lessons", params={"standard": "5-LS2-1"}).headers["etag"]
+    assert etag != client.get("/lessons", params={"standard": "5-PS1-1"}).headers["etag"]
+
+    # A new version without the alignment drops the lesson from the filter.
+    client.post(f"/lessons/{particles}/versions", json={"objective": "Revised"})
+    titles = [lesson["title"] for lesson in client.get("/lessons", params={"standard": "5-LS2-1"}).json()]
+    assert titles == ["Food Webs"]
+    assert client.get("/lessons", params={"standard": "5-PS1-1"}).json() == []
+
+    db_session.expire_all()
+    with query_counter.counting():
+        report = client.get("/standards/coverage", params={"framework": "NGSS"}).json()
+    coverage_queries = [sql for sql in query_counter.statements if "lesson_standards" in sql]
+    assert len(coverage_queries) == 1
+    assert (report["total_standards"], report["covered_standards"]) == (5, 1)
+    by_code = {entry["code"]: entry for entry in report["standards"]}
+    assert by_code["5-LS2-1"]["lessons"] == [{"id": food_webs, "title": "Food Webs"}]
+    assert by_code["5-PS1-1"]["lesson_count"] == 0
+    assert client.get("/standards/coverage", params={"framework": "CCSS"}).status_code == 404
+
+
+def test_domain_codes_expand_to_descendants_through_the_closure(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    _seed_catalog(db_session)
+    framework_id = db_session.query(Standard.framework_id).first()[0]
+    domain = Standard(
+        framework_id=framework_id,
+        code="5-LS2",
+        subject="Science",
+        grade_band="5",
+        description="Ecosystems: Interactions, Energy, and Dynamics",
+    )
+    db_session.add(domain)
+    db_session.flush()
+    leaf = db_session.query(Standard).filter_by(code="5-LS2-1").one()
+    leaf.parent_id = domain.id
+    db_session.commit()
+
+    closure = set(
+        db_session.execute(
+            select(StandardClosure.ancestor_id, StandardClosure.descendant_id, StandardClosure.depth)
+            .join(Standard, Standard.id == StandardClosure.descendant_id)
+            .where(Standard.code.in_(["5-LS2", "5-LS2-1"]))
+        ).tuples()
+    )
+    assert closure == {(domain.id, domain.id, 0), (leaf.id, leaf.id, 0), (domain.id, leaf.id, 1)}
+
+    ensure_user(db_session, "domain.teacher@example.edu")
+    login_user(client, fake_google_oauth, "domain.teacher@example.edu")
+    food_webs = _create_lesson(client, "Food Webs")
+    _create_lesson(client, "Particles")
+    _align(db_session, food_webs, "5-LS2-1")
+
+    titles = [lesson["title"] for lesson in client.get("/lessons", params={"standard": "5-LS2"}).json()]
+    assert titles == ["Food Webs"]
+
+    params = {"framework": "NGSS", "root": "5-LS2"}
+    report = client.get("/standards/coverage", params=params).json()
+    assert [entry["code"] for entry in report["standards"]] == ["5-LS2", "5-LS2-1"]
+    assert [entry["lesson_count"] for entry in report["standards"]] == [0, 1]
+    report = client.get("/standards/coverage", params={**params, "rollup": True}).json()
+    assert [entry["lesson_count"] for entry in report["standards"]] == [1, 1]
+    assert report["standards"][1]["parent_id"] == str(domain.id)
+
+
+def test_closure_is_maintained_incrementally_on_insert_move_and_delete(
+    db_session: Session, query_counter
+) -> None:
+    _seed_catalog(db_session)
+    framework_id = db_session.query(Standard.framework_id).first()[0]
+
+    def add(code: str, parent: Standard | None = None) -> Standard:
+        standard = Standard(
+            framework_id=framework_id,
+            code=code,
+            subject="Science",
+            grade_band="5",
+            description=code,
+            parent_id=parent.id if parent else None,
+        )
+        standard.id = uuid.uuid4()
+        db_session.add(standard)
+        return standard
+
+    def closure() -> set[tuple]:
+        return set(
+            db_session.execute(
+                select(
+                    StandardClosure.ancestor_id,
+                    StandardClosure.descendant_id,
+                    StandardClosure.depth,
+                )
+            ).tuples()
+        )
+
+    # Parents and children added in the same flush.
+    domain = add("5-X")
+    cluster = add("5-X-1", domain)
+    leaf = add("5-X-1-a", cluster)
+    other = add("5-Y")
+    with query_counter.counting():
+        db_session.flush()
+    # No framework-wide delete and recursive rebuild, just the new nodes' rows.
+    assert not [sql for sql in query_counter.statements if "DELETE" in sql]
+    assert not [sql for sql in query_counter.statements if "RECURSIVE" in sql.upper()]
+    rows = closure()
+    assert {(domain.id, leaf.id, 2), (cluster.id, leaf.id, 1), (domain.id, cluster.id, 1)} <= rows
+
+    # Moving the cluster moves its subtree; the result matches a full rebuild.
+    cluster.parent_id = other.id
+    db_session.flush()
+    incremental = closure()
+    assert (other.id, leaf.id, 2) in incremental
+    assert (domain.id, leaf.id, 2) not in incremental
+    rebuild_closure(db_session, [framework_id])
+    assert closure() == incremental
+
+    # Deleting the cluster cuts the paths through it; the leaf keeps its self row.
+    db_session.delete(cluster)
+    db_session.flush()
+    rows = closure()
+    assert {row for row in rows if leaf.id in row[:2]} == {(leaf.id, leaf.id, 0)}
+    assert not {row for row in rows if cluster.id in row[:2]}
+
+
+def test_coverage_summary_follows_links_and_current_versions(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    _seed_catalog(db_session)
+    ensure_user(db_session, "summary.teacher@example.edu")
+    login_user(client, fake_google_oauth, "summary.teacher@example.edu")
+    food_webs = _create_lesson(client, "Food Webs")
+    particles = _create_lesson(client, "Particles")
+    ecosystems = client.post(
+        "/lessons", json={"title": "Ecosystems", "subject": "Science", "grade_level": "6"}
+    ).json()["id"]
+    _align(db_session, food_webs, "5-LS2-1")
+    _align(db_session, particles, "5-LS2-1")
+    _align(db_session, particles, "5-PS1-1")
+    _align(db_session, ecosystems, "5-LS2-1")
+    _align(db_session, ecosystems, "5-LS2-1")  # already aligned: not counted twice
+
+    def counts(**params: object) -> dict[str, tuple[int, dict[str, int]]]:
+        params = {"framework": "NGSS", **params}
+        response = client.get("/analytics/standards-coverage", params=params)
+        assert response.status_code == 200
+        return {
+            entry["code"]: (entry["lesson_count"], entry["by_grade"])
+            for entry in response.json()["standards"]
+            if entry["lesson_count"]
+        }
+
+    assert counts() == {"5-LS2-1": (3, {"5": 2, "6": 1}), "5-PS1-1": (1, {"5": 1})}
+    assert counts(grade="6") == {"5-LS2-1": (1, {"6": 1})}
+
+    # A new version drops the lesson's alignments; restoring the old one brings them back.
+    client.post(f"/lessons/{particles}/versions", json={"objective": "Revised"})
+    assert counts() == {"5-LS2-1": (2, {"5": 1, "6": 1})}
+    uncovered = client.get(
+        "/analytics/standards-coverage", params={"framework": "NGSS", "uncovered_only": True}
+    ).json()
+    assert (uncovered["total_standards"], uncovered["covered_standards"]) == (5, 1)
+    assert len(uncovered["standards"]) == 4
+    client.post(f"/lessons/{particles}/restore/1")
+    assert counts() == {"5-LS2-1": (3, {"5": 2, "6": 1}), "5-PS1-1": (1, {"5": 1})}
+
+    def stored() -> set[tuple]:
+        return set(
+            db_session.execute(
+                select(
+                    StandardsCoverage.standard_id,
+                    StandardsCoverage.grade_level,
+                    StandardsCoverage.lesson_count,
+                ).where(StandardsCoverage.lesson_count > 0)
+            ).tuples()
+        )
+
+    incremental = stored()
+    assert StandardsCoverageService(db_session).rebuild() == 3
+    assert stored() == incremental
+
+    # Deleting a lesson, or a lesson's current version, uncounts its links.
+    db_session.delete(db_session.get(Lesson, uuid.UUID(particles)))
+    db_session.flush()
+    assert counts() == {"5-LS2-1": (2, {"5": 1, "6": 1})}
+    ecosystems_lesson = db_session.get(Lesson, uuid.UUID(ecosystems))
+    db_session.delete(db_session.get(LessonVersion, ecosystems_lesson.current_version_id))
+    db_session.flush()
+    assert counts() == {"5-LS2-1": (1, {"5": 1})}
+
+
+def test_coverage_follows_grade_changes_and_bulk_deletes(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    _seed_catalog(db_session)
+    ensure_user(db_session, "bulk.teacher@example.edu")
+    login_user(client, fake_google_oauth, "bulk.teacher@example.edu")
+    food_webs = _create_lesson(client, "Food Webs")
+    particles = _create_lesson(client, "Particles")
+    ecosystems = _create_lesson(client, "Ecosystems")
+    for lesson_id in (food_webs, particles, ecosystems):
+        _align(db_session, lesson_id, "5-LS2-1")
+    _align(db_session, particles, "5-PS1-1")
+
+    def stored() -> dict[tuple[str, str], int]:
+        rows = db_session.execute(
+            select(Standard.code, StandardsCoverage.grade_level, StandardsCoverage.lesson_count)
+            .join(Standard, Standard.id == StandardsCoverage.standard_id)
+            .where(StandardsCoverage.lesson_count > 0)
+        )
+        return {(code, grade): count for code, grade, count in rows}
+
+    assert stored() == {("5-LS2-1", "5"): 3, ("5-PS1-1", "5"): 1}
+
+    # Regrading a lesson moves its counts to the new grade's bucket.
+    db_session.get(Lesson, uuid.UUID(particles)).grade_level = "6"
+    db_session.commit()
+    assert stored() == {("5-LS2-1", "5"): 2, ("5-LS2-1", "6"): 1, ("5-PS1-1", "6"): 1}
+
+    # Bulk deletes of lessons, current versions and owners are uncounted too.
+    db_session.execute(delete(Lesson).where(Lesson.id == uuid.UUID(particles)))
+    assert stored() == {("5-LS2-1", "5"): 2}
+    current = db_session.get(Lesson, uuid.UUID(ecosystems)).current_version_id
+    db_session.execute(delete(LessonVersion).where(LessonVersion.id == current))
+    assert stored() == {("5-LS2-1", "5"): 1}
+    db_session.execute(delete(User).where(User.email == "bulk.teacher@example.edu"))
+    assert stored() == {}
+
+
+def test_align_standards_inserts_links_in_one_idempotent_statement(
+    client: TestClient, db_session: Session, fake_google_oauth, query_counter
+) -> None:
+    _seed_catalog(db_session)
+    ensure_user(db_session, "align.teacher@example.edu")
+    login_user(client, fake_google_oauth, "align.teacher@example.edu")
+    lesson_id = _create_lesson(client, "Matter Cycles")
+    etag = client.get(f"/lessons/{lesson_id}").headers["etag"]
+    ids = {
+        code: str(standard_id)
+        for code, standard_id in db_session.query(Standard.code, Standard.id)
+    }
+
+    payload = {"standard_ids": [ids["5-LS2-1"], ids["5-PS1-1"], ids["5-LS2-1"]]}
+    with query_counter.counting():
+        response = client.post(f"/lessons/{lesson_id}/standards", json=payload)
+    assert response.status_code == 200
+    assert sorted(standard["code"] for standard in response.json()) == ["5-LS2-1", "5-PS1-1"]
+    inserts = [sql for sql in query_counter.statements if "INSERT INTO lesson_standards" in sql]
+    assert len(inserts) == 1 and "ON CONFLICT DO NOTHING" in inserts[0].upper()
+
+    # Re-sending aligned ids plus an unknown one changes nothing and does not fail.
+    payload = {"standard_ids": [ids["5-PS1-1"], str(uuid.uuid4())]}
+    response = client.post(f"/lessons/{lesson_id}/standards", json=payload)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    detail = client.get(f"/lessons/{lesson_id}", headers={"If-None-Match": etag})
+    assert detail.status_code == 200
+
+
+def test_code_map_normalizes_and_scopes_codes() -> None:
+    ngss, ccss = uuid.uuid4(), uuid.uuid4()
+    ratio, count, ls2 = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    code_map = StandardCodeMap(
+        [
+            (ratio, ccss, "CCSS", "6.RP.A.1", "Math", "6"),
+            (count, ccss, "CCSS", "K.CC.A.1", "Math", "K"),
+            (ls2, ngss, "NGSS", "5-LS2-1", "Science", "5"),
+        ]
+    )
+
+    codes = ["5.ls2.1", "CCSS.MATH.CONTENT.6.RP.A.1", "6-rp-a-1", "nope"]
+    assert code_map.resolve(codes) == [ls2, ratio]
+    assert code_map.resolve(["6.RP.A.1", "5-LS2-1"], framework="ngss") == [ls2]
+    assert code_map.resolve(["k cc a 1"], framework="CCSS", subject="Math") == [count]
+
+
+def test_code_map_breaks_alias_ties_by_grade_and_drops_ambiguous_ones() -> None:
+    ccss = uuid.uuid4()
+    grade6, grade8, rl110, rl1110 = (uuid.uuid4() for _ in range(4))
+    code_map = StandardCodeMap(
+        [
+            (grade6, ccss, "CCSS", "6.EE.A.1", "Math", "6"),
+            (grade8, ccss, "CCSS", "8.EE.A.1", "Math", "8"),
+            (rl110, ccss, "CCSS", "RL.1.10", "ELA", "1"),
+            (rl1110, ccss, "CCSS", "RL.11.0", "ELA", "11-12"),
+        ]
+    )
+
+    assert code_map.resolve(["EE.A.1"], grade_level="8") == [grade8]
+    assert code_map.resolve(["EE.A.1"], grade_level="7") == []
+    assert code_map.resolve(["EE.A.1"]) == []
+    assert code_map.resolve(["RL.1.10"]) == [rl110]
+    assert code_map.resolve(["rl-11-0"]) == [rl1110]
+
+
+def test_suggestions_are_memoized_until_standards_change(
+    client: TestClient, db_session: Session, fake_google_oauth, monkeypatch
+) -> None:
+    _seed_catalog(db_session)
+    service = StandardsService(db_session)
+    searches = []
+    search = StandardsIndex.search
+
+    def counting_search(self, *args, **kwargs):
+        searches.append(args)
+        return search(self, *args, **kwargs)
+
+    monkeypatch.setattr(StandardsIndex, "search", counting_search)
+
+    first = service.suggest_standards("Science", "5", ["Food Webs", "decomposers"], limit=2)
+    # Same request modulo case, whitespace and keyword order.
+    again = service.suggest_standards("science ", "5", ["decomposers", "food  webs"], limit=2)
+    assert [standard.id for standard in again] == [standard.id for standard in first]
+    assert len(searches) == 1
+
+    framework_id = db_session.query(Standard.framework_id).first()[0]
+    db_session.add(
+        Standard(
+            framework_id=framework_id,
+            code="5-LS2-2",
+            subject="Science",
+            grade_band="5",
+            description="Decomposers in food webs recycle matter.",
+            tags=["food webs", "decomposers"],
+        )
+    )
+    db_session.commit()
+    suggested = service.suggest_standards("Science", "5", ["food webs", "decomposers"], limit=2)
+    codes = [standard.code for standard in suggested]
+    assert len(searches) == 2
+    assert "5-LS2-2" in codes
+
+    UserService(db_session).invite_user(
+        email="cache.admin@example.edu", full_name="Alex Admin", role="admin"
+    )
+    db_session.commit()
+    login_user(client, fake_google_oauth, "cache.admin@example.edu")
+    stats = client.get("/standards/cache-stats").json()["suggestions"]
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
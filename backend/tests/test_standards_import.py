@@ -0,0 +1,178 @@
+"""Tests for bulk standards framework imports."""
+from __future__ import annotations
+
+import io
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Standard, StandardClosure
+from app.services.standards_import import FrameworkSpec, StandardsImporter
+from app.services.standards_service import StandardsService
+from app.services.user_service import UserService
+
+from .helpers import login_user
+
+NGSS_CSV = """code,subject,grade_band,description,tags
+5-LS2-1,Science,5,Develop a model to describe the movement of matter among organisms.,ecosystems;food webs
+5-PS1-1,Science,5,Develop a model to describe that matter is made of particles.,matter
+MS-LS2-3,Science,6-8,Develop a model to describe the cycling of matter in an ecosystem.,ecosystems
+,Science,5,Missing code,
+"""
+
+
+def _login_admin(client: TestClient, db_session: Session, fake_google_oauth) -> None:
+    UserService(db_session).invite_user(
+        email="standards.admin@example.edu", full_name="Alex Admin", role="admin"
+    )
+    db_session.commit()
+    login_user(client, fake_google_oauth, "standards.admin@example.edu")
+
+
+def test_csv_import_upserts_in_batches_and_reports_diffs(
+    client: TestClient, db_session: Session, fake_google_oauth, query_counter
+) -> None:
+    _login_admin(client, db_session, fake_google_oauth)
+    params = {"format": "csv", "framework_code": "NGSS", "framework_name": "NGSS"}
+
+    response = client.post("/standards/import", params=params, content=NGSS_CSV)
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["created"], report["updated"], report["unchanged"], report["failed"]) == (3, 0, 0, 1)
+    assert report["errors"] == [{"line": 5, "error": "code, description and subject are required"}]
+    stored = db_session.execute(select(Standard).where(Standard.code == "5-LS2-1")).scalar_one()
+    assert stored.tags == ["ecosystems", "food webs"]
+    assert stored.grade_band == "5"
+
+    # The new rows are searchable straight away; the index was rebuilt once at the end.
+    suggested = StandardsService(db_session).suggest_standards("Science", "5", ["food webs"], limit=1)
+    assert suggested[0].code == "5-LS2-1"
+
+    revised = NGSS_CSV.replace("particles.", "particles too small to be seen.").replace(
+        ",Science,5,Missing code,\n", ""
+    ) + "5-ESS1-1,Science,5,Support an argument about the brightness of the sun.,astronomy\n"
+    db_session.expire_all()
+    with query_counter.counting():
+        response = client.post("/standards/import", params=params, content=revised)
+    report = response.json()
+    assert (report["created"], report["updated"], report["unchanged"]) == (1, 1, 2)
+    assert {"code": "5-PS1-1", "action": "updated", "fields": ["description"]} in report["changes"]
+    upserts = [sql for sql in query_counter.statements if "ON CONFLICT" in sql.upper()]
+    assert len(upserts) == 1
+    assert db_session.execute(select(Standard.id).where(Standard.code == "5-ESS1-1")).scalar_one()
+
+
+def test_import_requires_admin_and_valid_files(
+    client: TestClient, db_session: Session, fake_google_oauth
+) -> None:
+    UserService(db_session).invite_user(
+        email="standards.teacher@example.edu", full_name="Taylor Teacher", role="teacher"
+    )
+    db_session.commit()
+    login_user(client, fake_google_oauth, "standards.teacher@example.edu")
+    params = {"framework_code": "NGSS"}
+    assert client.post("/standards/import", params=params, content=NGSS_CSV).status_code == 403
+
+    _login_admin(client, db_session, fake_google_oauth)
+    response = client.post("/standards/import", params=params, content="code,title\nA,B\n")
+    assert response.status_code == 400
+    assert "description" in response.json()["detail"]
+
+
+def test_case_json_import_maps_items(db_session: Session) -> None:
+    package = {
+        "CFDocument": {
+            "identifier": "c6496676-d7cb-11e8-824f-0242ac160002",
+            "title": "Common Core State Standards for Mathematics",
+            "creator": "CCSSO",
+            "subject": ["Math"],
+        },
+        "CFItems": [
+            {"identifier": "d1", "fullStatement": "Ratios and Proportional Relationships"},
+            {
+                "identifier": "c1",
+                "humanCodingScheme": "6.RP.A",
+                "fullStatement": "Understand ratio concepts and use ratio reasoning.",
+            },
+            {
+                "identifier": "i1",
+                "humanCodingScheme": "6.RP.A.1",
+                "fullStatement": "Understand the concept of a ratio.",
+                "educationLevel": ["06"],
+                "conceptKeywords": ["ratio"],
+            },
+            {
+                "identifier": "i2",
+                "humanCodingScheme": "K.CC.A.1",
+                "fullStatement": "Count to 100 by ones and by tens.",
+                "educationLevel": ["KG", "01"],
+            },
+        ],
+        "CFAssociations": [
+            {
+                "associationType": "isChildOf",
+                "originNodeURI": {"identifier": "i1"},
+                "destinationNodeURI": {"identifier": "c1"},
+            },
+            {
+                "associationType": "isChildOf",
+                "originNodeURI": {"identifier": "c1"},
+                "destinationNodeURI": {"identifier": "d1"},
+            },
+        ],
+    }
+
+    result = StandardsImporter(db_session, batch_size=1).import_file(
+        io.StringIO(json.dumps(package)), "case", FrameworkSpec(code="CCSS.MATH", name="")
+    )
+
+    assert (result.created, result.failed, result.relinked) == (3, 0, 1)
+    rows = {
+        standard.code: standard
+        for standard in db_session.execute(
+            select(Standard).where(Standard.framework_id == result.framework_id)
+        ).scalars()
+    }
+    assert rows["6.RP.A.1"].grade_band == "6"
+    assert rows["6.RP.A.1"].tags == ["ratio"]
+    # The uncoded domain is skipped, so the cluster is top-level.
+    assert rows["6.RP.A.1"].parent_id == rows["6.RP.A"].id
+    assert rows["6.RP.A"].parent_id is None
+    assert rows["K.CC.A.1"].grade_band == "K-1"
+    assert rows["K.CC.A.1"].framework.name == "Common Core State Standards for Mathematics"
+    assert rows["K.CC.A.1"].framework.jurisdiction == "CCSSO"
+
+
+def test_csv_parent_codes_build_the_hierarchy_after_all_batches(db_session: Session) -> None:
+    rows = """code,subject,description,parent_code
+6.RP.A.1,Math,Understand the concept of a ratio.,6.RP.A
+6.RP.A.2,Math,Understand the concept of a unit rate.,6.RP.A
+6.RP.A,Math,Understand ratio concepts.,6.RP
+6.RP,Math,Ratios and Proportional Relationships.,
+6.NS.A.1,Math,Interpret quotients of fractions.,6.NS
+"""
+    importer = StandardsImporter(db_session, batch_size=2)
+    result = importer.import_file(io.StringIO(rows), "csv", FrameworkSpec(code="CCSS", name="CCSS"))
+
+    assert (result.created, result.relinked) == (5, 3)
+    assert [(error.line, error.error) for error in result.errors] == [
+        (6, "parent_code 6.NS not found")
+    ]
+    ids = dict(db_session.execute(select(Standard.code, Standard.id)).tuples().all())
+    subtree = db_session.execute(
+        select(Standard.code, StandardClosure.depth)
+        .join(StandardClosure, StandardClosure.descendant_id == Standard.id)
+        .where(StandardClosure.ancestor_id == ids["6.RP"])
+        .order_by(Standard.code)
+    ).all()
+    assert subtree == [("6.RP", 0), ("6.RP.A", 1), ("6.RP.A.1", 2), ("6.RP.A.2", 2)]
+
+    # Re-parenting the domain under its own standard is refused; unchanged links are not rewritten.
+    cyclic = rows.replace("Relationships.,\n", "Relationships.,6.RP.A.1\n")
+    result = importer.import_file(io.StringIO(cyclic), "csv", FrameworkSpec(code="CCSS", name="CCSS"))
+    assert result.relinked == 0
+    assert (5, "parent_code 6.RP.A.1 would form a cycle") in [
+        (error.line, error.error) for error in result.errors
+    ]
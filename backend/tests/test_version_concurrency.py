@@ -0,0 +1,76 @@
+"""Stress test for concurrent lesson version creation."""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.base import Base
+from app.models import Lesson, LessonVersion, Tenant, User
+from app.services.lesson_service import LessonService
+
+PARALLEL_EDITS = 12
+
+
+def test_parallel_version_creation_allocates_unique_numbers(tmp_path) -> None:
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'versions.db'}",
+        future=True,
+        connect_args={"timeout": 30, "check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionFactory = sessionmaker(bind=engine, class_=Session, expire_on_commit=False)
+
+    with SessionFactory() as session:
+        tenant = Tenant(name="Concurrency District")
+        session.add(tenant)
+        session.flush()
+        user = User(tenant_id=tenant.id, email="parallel@example.edu", full_name="Pat Parallel")
+        session.add(user)
+        session.flush()
+        lesson = LessonService(session).create_lesson(
+            owner=user,
+            title="Parallel Edits",
+            subject="Math",
+            grade_level="6",
+            language="en",
+            tags=[],
+            visibility="private",
+            status="draft",
+            version_payload={"objective": "Initial"},
+        )
+        session.commit()
+        lesson_id, tenant_id, user_id = lesson.id, tenant.id, user.id
+
+    def edit(index: int) -> int:
+        with SessionFactory() as session:
+            service = LessonService(session)
+            target = service.get_lesson(lesson_id=lesson_id, tenant_id=tenant_id)
+            creator = session.get(User, user_id)
+            version = service.create_new_version(
+                lesson=target,
+                creator=creator,
+                payload={"objective": f"Edit {index}", "flow": [{"phase": f"Step {index}"}]},
+            )
+            session.commit()
+            return version.version_no
+
+    with ThreadPoolExecutor(max_workers=PARALLEL_EDITS) as pool:
+        allocated = list(pool.map(edit, range(PARALLEL_EDITS)))
+
+    assert sorted(allocated) == list(range(2, PARALLEL_EDITS + 2))
+
+    with SessionFactory() as session:
+        lesson = session.get(Lesson, lesson_id)
+        versions = session.execute(
+            select(LessonVersion)
+            .where(LessonVersion.lesson_id == lesson_id)
+            .order_by(LessonVersion.version_no)
+        ).scalars().all()
+        assert [version.version_no for version in versions] == list(range(1, PARALLEL_EDITS + 2))
+        assert lesson.next_version_no == PARALLEL_EDITS + 2
+        assert lesson.current_version_id == versions[-1].id
+        assert versions[-1].flow
+
+    engine.dispose()
@@ -0,0 +1,87 @@
+"""Tests for delta-encoded lesson version storage."""
+from __future__ import annotations
+
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.lesson import LessonVersion
+from app.services.version_content import apply_delta, content_cache, diff_content
+
+from .helpers import ensure_user, login_user
+
+
+def test_diff_and_apply_round_trip() -> None:
+    base = {
+        "teacher_script_md": "### Engage\nWarm-up on fractions.\n\n### Explore\nGroup work.",
+        "materials": [{"label": "Slides", "value": "Fractions deck"}],
+        "flow": [{"phase": "Engage", "minutes": 5}, {"phase": "Explore", "minutes": 20}],
+        "differentiation": [{"strategy": "ELL", "description": "Sentence frames."}],
+        "assessments": [],
+        "accommodations": [],
+    }
+    target = {
+        **base,
+        "teacher_script_md": "### Engage\nWarm-up on unlike fractions.\n\n### Explore\nGroup work.",
+        "flow": [{"phase": "Engage", "minutes": 5}, {"phase": "Explore", "minutes": 25}],
+        "differentiation": base["differentiation"] + [{"strategy": "Gifted", "description": "Extension."}],
+        "materials": [],
+    }
+
+    delta = diff_content(base, target)
+
+    assert set(delta) == {"teacher_script_md", "flow", "differentiation", "materials"}
+    assert delta["differentiation"] == {"keep": 1, "extend": [target["differentiation"][1]]}
+    assert len(delta["teacher_script_md"]["insert"]) < len(target["teacher_script_md"])
+    assert apply_delta(base, delta) == target
+    assert apply_delta(base, diff_content(base, base)) == base
+
+
+def test_versions_store_deltas_and_rebuild_transparently(
+    client: TestClient, db_session: Session, fake_google_oauth, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "lesson_version_snapshot_interval", 3)
+    ensure_user(db_session, "delta.teacher@example.edu")
+    login_user(client, fake_google_oauth, "delta.teacher@example.edu")
+
+    lesson_id = client.post(
+        "/lessons",
+        json={
+            "title": "Fractions Review",
+            "subject": "Math",
+            "grade_level": "4",
+            "teacher_script_md": "### Engage\nCompare fractions.",
+            "flow": [{"phase": "Engage", "minutes": 10, "content_md": "Number line warm-up."}],
+        },
+    ).json()["id"]
+    for audience in ("ELL", "IEP", "GIFTED"):
+        response = client.post(f"/lessons/{lesson_id}/differentiate", json={"audience": audience})
+        assert response.status_code == 201
+
+    versions = db_session.execute(
+        select(LessonVersion)
+        .where(LessonVersion.lesson_id == UUID(lesson_id))
+        .order_by(LessonVersion.version_no)
+    ).scalars().all()
+    assert [version.content_delta is None for version in versions] == [True, False, False, True]
+    assert versions[1].stored_flow == []
+    assert versions[1].stored_teacher_script_md is None
+    assert versions[3].stored_flow
+
+    content_cache.clear()
+    db_session.expire_all()
+    detail = client.get(f"/lessons/{lesson_id}").json()
+    latest = detail["versions"][-1]
+    assert latest["teacher_script_md"] == "### Engage\nCompare fractions."
+    assert latest["flow"][0]["phase"] == "Engage"
+    assert [entry["strategy"] for entry in latest["differentiation"]] == ["ELL", "IEP", "Gifted"]
+    assert [entry["strategy"] for entry in detail["versions"][2]["differentiation"]] == ["ELL", "IEP"]
+
+    content_cache.clear()
+    db_session.expire_all()
+    client.post(f"/lessons/{lesson_id}/restore/3")
+    export = client.get(f"/lessons/{lesson_id}/export", params={"format": "gdoc"}).json()
+    assert [line.split(":")[0] for line in export["sections"]["differentiation"]] == ["ELL", "IEP"]